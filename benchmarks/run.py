@@ -0,0 +1,371 @@
+# benchmarks/run.py
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+GRID_SIZES = (5, 20, 100)
+PPO_CHECKPOINT = "models/pg/ppo_collection(2).zip"
+DQN_CHECKPOINT = "models/dqn/dqn_final_model.zip"
+NUMPY_CHECKPOINT = "models/numpy/ppo_collection(2).npz"
+
+# name -> (function, unit, higher_is_better, isolated); filled by @benchmark
+BENCHMARKS = {}
+
+
+def benchmark(name, unit, higher_is_better=True, isolated=False):
+    """Registers a benchmark; isolated ones run in a fresh interpreter (see run_isolated)."""
+    def register(fn):
+        BENCHMARKS[name] = (fn, unit, higher_is_better, isolated)
+        return fn
+    return register
+
+
+def best_rate(fn, n, repeats=15):
+    """
+    Calls fn() n times per repeat and returns the best calls/second. Many short repeats
+    make the best one likely to miss interference from other processes.
+    """
+    best = 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = max(best, n / (time.perf_counter() - start))
+    return best
+
+
+def best_latency_us(fn, n, repeats=15):
+    return 1e6 / best_rate(fn, n, repeats)
+
+
+def _step_rate(env, n):
+    """Steps/s with random actions; resets are included whenever an episode ends."""
+    actions = np.random.default_rng(0).integers(0, 5, size=n)
+    env.reset(seed=0)
+    best = 0.0
+    for _ in range(15):
+        start = time.perf_counter()
+        for action in actions:
+            _, _, terminated, truncated, _ = env.step(action)
+            if terminated or truncated:
+                env.reset()
+        best = max(best, n / (time.perf_counter() - start))
+    return best
+
+
+def _register_env_benchmarks():
+    from environment.custom_env import WasteCollectionEnv
+    from environment.fast_env import FastWasteCollectionEnv
+
+    for grid_size in GRID_SIZES:
+        for label, cls in (("custom", WasteCollectionEnv), ("fast", FastWasteCollectionEnv)):
+            def step(cls=cls, grid_size=grid_size):
+                return _step_rate(cls(grid_size=grid_size, max_steps=100), 5000)
+
+            def reset(cls=cls, grid_size=grid_size):
+                env = cls(grid_size=grid_size, max_steps=100)
+                return best_rate(env.reset, 2000)
+
+            benchmark(f"env/{label}/step/grid{grid_size}", "steps/s")(step)
+            benchmark(f"env/{label}/reset/grid{grid_size}", "resets/s")(reset)
+
+        def batched_step(grid_size=grid_size):
+            from environment.vec_env import BatchedWasteCollectionEnv
+            env = BatchedWasteCollectionEnv(256, grid_size=grid_size, max_steps=100)
+            env.seed(0)
+            env.reset()
+            actions = np.random.default_rng(0).integers(0, 5, size=(200, 256))
+            rows = iter(np.tile(actions, (15, 1)))
+            return 256 * best_rate(lambda: env.step(next(rows)), 200)
+
+        benchmark(f"env/batched256/step/grid{grid_size}", "steps/s")(batched_step)
+
+    # Same item density at every size: step cost should not grow with the map
+    for grid_size, n_waste, n_bins in ((100, 200, 10), (1000, 20000, 1000), (3162, 200000, 10000)):
+        def multi_step(grid_size=grid_size, n_waste=n_waste, n_bins=n_bins):
+            from environment.multi_waste_env import MultiWasteCollectionEnv
+            env = MultiWasteCollectionEnv(grid_size=grid_size, n_waste=n_waste, n_bins=n_bins, max_steps=10**9)
+            return _step_rate(env, 5000)
+
+        benchmark(f"env/multi/step/grid{grid_size}_waste{n_waste}", "steps/s")(multi_step)
+
+    # Whole-fleet step time: 64 vehicles should cost about as much as one
+    for n_agents in (1, 64):
+        def fleet_step(n_agents=n_agents):
+            from environment.fleet_env import FleetWasteCollectionEnv
+            env = FleetWasteCollectionEnv(n_agents, grid_size=32, n_waste=n_agents, max_steps=10**9)
+            env.reset_arrays(seed=0)
+            actions = np.random.default_rng(0).integers(0, 5, size=(2000, n_agents))
+            rows = iter(np.tile(actions, (15, 1)))
+            return best_latency_us(lambda: env.step_arrays(next(rows)), 2000)
+
+        benchmark(f"env/fleet/step/agents{n_agents}", "us/step", higher_is_better=False)(fleet_step)
+
+
+def _register_render_benchmarks():
+    for grid_size in GRID_SIZES:
+        def raster(grid_size=grid_size):
+            from environment.fast_env import FastWasteCollectionEnv
+            from environment.raster import render_rgb_array
+            env = FastWasteCollectionEnv(grid_size=grid_size)
+
+            def frame():
+                env.step(random.randrange(5))
+                render_rgb_array(env)
+            return best_latency_us(frame, 200)
+
+        def opengl(grid_size=grid_size):
+            if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+                os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+            import pygame
+            from environment.fast_env import FastWasteCollectionEnv
+            from environment.rendering import render_waste_env
+            pygame.init()
+            screen = pygame.display.set_mode((600, 600), pygame.OPENGL | pygame.DOUBLEBUF)
+            env = FastWasteCollectionEnv(grid_size=grid_size)
+
+            def frame():
+                env.step(random.randrange(5))
+                render_waste_env(env, screen)
+            try:
+                return best_latency_us(frame, 40)
+            finally:
+                pygame.quit()
+
+        benchmark(f"render/rgb_array/grid{grid_size}", "us/frame", higher_is_better=False)(raster)
+        # Mesa's GL driver and torch crash when loaded into the same process
+        benchmark(f"render/opengl/grid{grid_size}", "us/frame", higher_is_better=False, isolated=True)(opengl)
+
+
+_register_env_benchmarks()
+_register_render_benchmarks()
+
+
+def _predict_obs():
+    from environment.fast_env import DictObsWrapper, FastWasteCollectionEnv
+    obs, _ = DictObsWrapper(FastWasteCollectionEnv()).reset()
+    return obs
+
+
+@benchmark("predict/ppo", "us/call", higher_is_better=False)
+def predict_ppo():
+    from stable_baselines3 import PPO
+    model, obs = PPO.load(PPO_CHECKPOINT), _predict_obs()
+    return best_latency_us(lambda: model.predict(obs, deterministic=True), 500)
+
+
+@benchmark("predict/dqn", "us/call", higher_is_better=False)
+def predict_dqn():
+    from stable_baselines3 import DQN
+    model, obs = DQN.load(DQN_CHECKPOINT), _predict_obs()
+    return best_latency_us(lambda: model.predict(obs, deterministic=True), 500)
+
+
+@benchmark("predict/numpy_ppo", "us/call", higher_is_better=False)
+def predict_numpy():
+    from policies.numpy_policy import NumpyPolicy
+    policy, obs = NumpyPolicy.load(NUMPY_CHECKPOINT), _predict_obs()
+    return best_latency_us(lambda: policy.predict(obs), 2000)
+
+
+def _train_rate(module, n_envs, vec_backend, timesteps):
+    import torch
+    from training.common import make_training_env
+    torch.set_num_threads(1)
+    env = make_training_env(n_envs, vec_backend, seed=0)
+    model = module.make_model(env, n_envs, seed=0, verbose=0)
+    model.learn(total_timesteps=timesteps // 4)  # Warm-up: first rollout, DQN learning_starts
+    start = time.perf_counter()
+    model.learn(total_timesteps=timesteps, reset_num_timesteps=False)
+    return timesteps / (time.perf_counter() - start)
+
+
+@benchmark("train/ppo/dummy1", "timesteps/s")
+def train_ppo_dummy():
+    from training import pg_training
+    return _train_rate(pg_training, 1, "dummy", 8192)
+
+
+@benchmark("train/ppo/batched16", "timesteps/s")
+def train_ppo_batched():
+    from training import pg_training
+    return _train_rate(pg_training, 16, "batched", 16384)
+
+
+@benchmark("train/dqn/dummy1", "timesteps/s")
+def train_dqn_dummy():
+    from training import dqn_training
+    return _train_rate(dqn_training, 1, "dummy", 8000)
+
+
+@benchmark("train/dqn/batched16", "timesteps/s")
+def train_dqn_batched():
+    from training import dqn_training
+    return _train_rate(dqn_training, 16, "batched", 16000)
+
+
+def calibrate():
+    """
+    Speed of a fixed pure-Python + NumPy workload, in loops/s. compare(normalize=True) divides
+    it out, for a baseline that was recorded on a uniformly faster or slower machine.
+    """
+    data = np.arange(4096, dtype=np.float64)
+
+    def loop():
+        total = 0
+        for i in range(200):
+            total += i * i
+        data.sum()
+    return best_rate(loop, 2000, repeats=25)
+
+
+def run_isolated(name):
+    """Runs one benchmark in a subprocess and returns its value."""
+    process = subprocess.run([sys.executable, "-m", "benchmarks.run", "--single", name],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {process.returncode}")
+    return float(process.stdout.strip().splitlines()[-1])
+
+
+def run(selected=None, runs=1):
+    """
+    Runs the selected benchmarks `runs` times and keeps the best value of each. Benchmarks
+    that raised in every run are reported under "errors" with their last exception.
+    """
+    results = {}
+    errors = {}
+    calibration = calibrate()
+    for _ in range(runs):
+        for name, (fn, unit, higher_is_better, isolated) in BENCHMARKS.items():
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            random.seed(0)
+            try:
+                value = run_isolated(name) if isolated else float(fn())
+            except Exception as e:  # e.g. no OpenGL context on this machine
+                errors[name] = f"{type(e).__name__}: {e}"
+                print(f"{name:<32} failed ({errors[name]})")
+                continue
+            errors.pop(name, None)
+            previous = results.get(name, {}).get("value")
+            if previous is not None:
+                value = max(value, previous) if higher_is_better else min(value, previous)
+            results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+            print(f"{name:<32} {value:14.1f} {unit}")
+    calibration = max(calibration, calibrate())
+    return {
+        "calibration": calibration,
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "processor": platform.processor(), "cpus": os.cpu_count()},
+        "results": results,
+        "errors": {name: error for name, error in errors.items() if name not in results},
+    }
+
+
+def tolerance_for(name, default, overrides):
+    """Longest matching prefix in `overrides` wins, e.g. {"train/": 0.3, "render/opengl": 0.5}."""
+    matches = [prefix for prefix in overrides if name.startswith(prefix)]
+    return overrides[max(matches, key=len)] if matches else default
+
+
+def compare(report, baseline, default_tolerance=0.2, overrides=None, normalize=False, selected=None):
+    """
+    Relative change of every benchmark present in both reports. A benchmark regresses when it
+    is slower than the baseline by more than its tolerance (0.2 = 20%). With `normalize`, the
+    baseline is first scaled by the calibration ratio of the two runs. A baseline benchmark
+    matching the `selected` prefixes (all of them without a selection) that raised or is
+    missing from the report fails. Returns the regressions and the failures.
+    """
+    overrides = dict(baseline.get("tolerances", {}), **(overrides or {}))
+    speed = 1.0
+    if normalize and report.get("calibration") and baseline.get("calibration"):
+        speed = report["calibration"] / baseline["calibration"]
+        print(f"\nCalibration: this run is {speed - 1:+.1%} vs the baseline machine; changes are normalized")
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        # Positive change = faster, whatever the unit
+        ratio = current["value"] / base["value"]
+        change = (ratio if current["higher_is_better"] else 1 / ratio) / speed - 1
+        tolerance = tolerance_for(name, default_tolerance, overrides)
+        flag = ""
+        if change < -tolerance:
+            flag = f"  REGRESSION (> {tolerance:.0%})"
+            regressions.append(name)
+        print(f"{name:<32} {base['value']:12.1f} {current['value']:12.1f} {change:+8.1%}{flag}")
+    failures = []
+    for name, base in baseline["results"].items():
+        if name in report["results"] or (selected and not any(name.startswith(prefix) for prefix in selected)):
+            continue
+        reason = report.get("errors", {}).get(name, "not run")
+        failures.append(name)
+        print(f"{name:<32} {base['value']:12.1f} {'-':>12} {'-':>8}  FAILED ({reason})")
+    return regressions, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput/latency benchmarks with regression checks")
+    parser.add_argument("--only", nargs="*", default=None, help="Benchmark name prefixes, e.g. env/fast render/")
+    parser.add_argument("--runs", type=int, default=1, help="Repeat the suite and keep each benchmark's best value")
+    parser.add_argument("--out", default=None, help="Write the results as JSON")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, default=None,
+                        help="Compare against a baseline JSON (default benchmarks/baseline.json)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--tolerance-for", nargs="*", default=[], metavar="PREFIX=TOL",
+                        help="Per-benchmark tolerances, e.g. train/=0.3")
+    parser.add_argument("--normalize", action="store_true",
+                        help="Scale the baseline by the calibration ratio (baseline made on another machine)")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite benchmarks/baseline.json")
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)  # Used by run_isolated
+    args = parser.parse_args()
+
+    if args.single:
+        random.seed(0)
+        print(float(BENCHMARKS[args.single][0]()))
+        return
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+
+    report = run(args.only, args.runs)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        tolerances = {}
+        if os.path.exists(BASELINE):
+            with open(BASELINE) as f:
+                tolerances = json.load(f).get("tolerances", {})
+        with open(BASELINE, "w") as f:
+            json.dump(dict(report, tolerances=tolerances), f, indent=2)
+        print(f"Baseline written to {BASELINE}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        overrides = {spec.split("=")[0]: float(spec.split("=")[1]) for spec in args.tolerance_for}
+        regressions, failures = compare(report, baseline, args.tolerance, overrides, args.normalize, args.only)
+        if failures:
+            print(f"\n{len(failures)} failed or missing: {', '.join(failures)}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if regressions or failures:
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
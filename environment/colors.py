@@ -0,0 +1,11 @@
+# environment/colors.py
+
+# Color definitions 
+COLORS = {
+    'background': (1.0, 1.0, 1.0),              # White background
+    'cell': (0.4, 0.2, 0.7),                    # Light purple cells
+    'grid': (0.8, 0.7, 0.9), 
+    'agent_body': (0.0, 0.0, 1.0),              # Blue agent body
+    'agent_head': (1.0, 1.0, 0.90),          
+    'waste': (0.55, 0.27, 0.07)                 
+}
@@ -2,10 +2,11 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-import random
+
+from environment.placement import waste_and_bin_cell
 
 class WasteCollectionEnv(gym.Env):
-    metadata = {'render_modes': ['human'], 'render_fps': 4}
+    metadata = {'render_modes': ['human', 'rgb_array'], 'render_fps': 4}
     
     def __init__(self, grid_size=5, max_steps=100, render_mode=None):
         super(WasteCollectionEnv, self).__init__()
@@ -16,17 +17,21 @@ class WasteCollectionEnv(gym.Env):
         # Action space: 0-3=movement, 4=pickup/drop
         self.action_space = spaces.Discrete(5)
         
+        self.observation_space = self.make_observation_space(grid_size)
+
+        self.seed()
+        self.reset()
+
+    @staticmethod
+    def make_observation_space(grid_size):
         # Observation space: agent, waste, bin positions + carrying status
-        self.observation_space = spaces.Dict({
+        return spaces.Dict({
             'agent': spaces.Box(0, grid_size-1, shape=(2,), dtype=np.int32),
             'waste': spaces.Box(0, grid_size-1, shape=(2,), dtype=np.int32),
             'bin': spaces.Box(0, grid_size-1, shape=(2,), dtype=np.int32),
             'carrying': spaces.Discrete(2)
         })
 
-        self.seed()
-        self.reset()
-
     def seed(self, seed=None):
         self.np_random, seed = gym.utils.seeding.np_random(seed)
         return [seed]
@@ -37,19 +42,15 @@ class WasteCollectionEnv(gym.Env):
         self.agent_pos = np.array([0, 0], dtype=np.int32)
         self.carrying_waste = False
         
-        # Place waste and bin ensuring they're not at agent's start
-        self.waste_pos = self._random_position(exclude=[self.agent_pos])
-        self.bin_pos = self._random_position(exclude=[self.agent_pos, self.waste_pos])
+        # Place waste and bin on distinct cells other than the agent's, drawn from the env's own
+        # generator so reset(seed=...) fixes the layout
+        g = self.grid_size
+        waste, bin_cell = waste_and_bin_cell(*self.np_random.random(2).tolist(), g * g)
+        self.waste_pos = np.array([waste % g, waste // g], dtype=np.int32)
+        self.bin_pos = np.array([bin_cell % g, bin_cell // g], dtype=np.int32)
         
         return self._get_obs(), {}
 
-    def _random_position(self, exclude=[]):
-        while True:
-            pos = np.array([random.randint(0, self.grid_size-1), 
-                           random.randint(0, self.grid_size-1)], dtype=np.int32)
-            if all(not np.array_equal(pos, e) for e in exclude):
-                return pos
-
     def _get_obs(self):
         return {
             'agent': self.agent_pos,
@@ -109,6 +110,10 @@ class WasteCollectionEnv(gym.Env):
         return self._get_obs(), reward, terminated, truncated, {}
 
     def render(self):
+        if self.render_mode == 'rgb_array':
+            # Headless NumPy rasterizer; copy because its frame buffer is reused
+            from environment.raster import render_rgb_array
+            return render_rgb_array(self).copy()
         if self.render_mode == 'human':
-            from environment.rendering import render_waste_env
-            render_waste_env(self)
+            from environment.rendering import render_human
+            render_human(self)
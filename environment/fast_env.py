@@ -0,0 +1,181 @@
+# environment/fast_env.py
+import gymnasium as gym
+from gymnasium import spaces
+import numpy as np
+
+from environment.custom_env import WasteCollectionEnv
+from environment.placement import UNIFORM_BLOCK, waste_and_bin_cell
+
+# Flat observation layout: agent x/y, waste x/y (-1 while carrying), bin x/y, carrying
+OBS_AGENT = slice(0, 2)
+OBS_WASTE = slice(2, 4)
+OBS_BIN = slice(4, 6)
+OBS_CARRYING = 6
+
+
+class EnvState:
+    """Plain-int episode state. Positions are cell indices (y * grid_size + x)."""
+    __slots__ = ('agent', 'waste', 'bin', 'carrying', 'steps')
+
+    def __init__(self):
+        self.agent = 0
+        self.waste = 0
+        self.bin = 0
+        self.carrying = False
+        self.steps = 0
+
+
+class FastWasteCollectionEnv(gym.Env):
+    """
+    Allocation-free version of WasteCollectionEnv with a flat Box observation.
+
+    State is kept as plain ints in an EnvState, movement and wall clamping come
+    from lookup tables built once per grid size, and the observation is a
+    preallocated int32 array updated in place. The array returned by step() and
+    reset() is reused, so copy it if you need to keep it. Wrap with
+    DictObsWrapper to get the original Dict layout.
+    """
+    metadata = {'render_modes': ['human', 'rgb_array'], 'render_fps': 4}
+
+    def __init__(self, grid_size=5, max_steps=100, render_mode=None):
+        super(FastWasteCollectionEnv, self).__init__()
+        self.grid_size = grid_size
+        self.max_steps = max_steps
+        self.render_mode = render_mode
+
+        self.action_space = spaces.Discrete(5)
+        low = np.array([0, 0, -1, -1, 0, 0, 0], dtype=np.int32)
+        high = np.array([grid_size-1] * 6 + [1], dtype=np.int32)
+        self.observation_space = spaces.Box(low, high, dtype=np.int32)
+
+        # Cell index -> coordinates, and next cell for each movement action
+        n_cells = grid_size * grid_size
+        self._cell_x = [c % grid_size for c in range(n_cells)]
+        self._cell_y = [c // grid_size for c in range(n_cells)]
+        self._next_cell = []
+        for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):     # Up, Down, Left, Right
+            moves = []
+            for c in range(n_cells):
+                x = min(max(self._cell_x[c] + dx, 0), grid_size-1)
+                y = min(max(self._cell_y[c] + dy, 0), grid_size-1)
+                moves.append(y * grid_size + x)
+            self._next_cell.append(moves)
+
+        self.state = EnvState()
+        self._obs = np.zeros(7, dtype=np.int32)
+        self._uniforms, self._uniform_source, self._next_uniform = None, None, UNIFORM_BLOCK
+        self.reset()
+
+    # Read-only views used by the renderer and anything expecting the scalar env attributes
+    @property
+    def agent_pos(self):
+        return self._cell_x[self.state.agent], self._cell_y[self.state.agent]
+
+    @property
+    def waste_pos(self):
+        return self._cell_x[self.state.waste], self._cell_y[self.state.waste]
+
+    @property
+    def bin_pos(self):
+        return self._cell_x[self.state.bin], self._cell_y[self.state.bin]
+
+    @property
+    def carrying_waste(self):
+        return self.state.carrying
+
+    @property
+    def steps(self):
+        return self.state.steps
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        s = self.state
+        s.steps = 0
+        s.agent = 0
+        s.carrying = False
+
+        # Same uniforms as WasteCollectionEnv so reset(seed=...) gives the same layout, drawn
+        # UNIFORM_BLOCK at a time; a new generator (reset with a seed) starts a new block
+        rng = self.np_random
+        if rng is not self._uniform_source or self._next_uniform == UNIFORM_BLOCK:
+            self._uniforms = rng.random(UNIFORM_BLOCK).tolist()
+            self._uniform_source = rng
+            self._next_uniform = 0
+        i = self._next_uniform
+        self._next_uniform = i + 2
+        s.waste, s.bin = waste_and_bin_cell(self._uniforms[i], self._uniforms[i + 1], len(self._cell_x))
+
+        obs = self._obs
+        obs[0] = obs[1] = 0
+        obs[2] = self._cell_x[s.waste]
+        obs[3] = self._cell_y[s.waste]
+        obs[4] = self._cell_x[s.bin]
+        obs[5] = self._cell_y[s.bin]
+        obs[6] = 0
+        return obs, {}
+
+    def step(self, action):
+        s = self.state
+        obs = self._obs
+        action = int(action)
+        s.steps += 1
+        terminated = False
+        truncated = s.steps >= self.max_steps
+        reward = -0.1  # Step penalty
+
+        if action <= 3:
+            new_cell = self._next_cell[action][s.agent]
+            if new_cell != s.agent:
+                # WasteCollectionEnv's distance shaping always evaluates to zero
+                s.agent = new_cell
+                obs[0] = self._cell_x[new_cell]
+                obs[1] = self._cell_y[new_cell]
+            else:
+                reward -= 0.5  # Wall hit penalty
+
+        elif action == 4:
+            if not s.carrying:
+                if s.agent == s.waste:
+                    s.carrying = True
+                    obs[2] = obs[3] = -1
+                    obs[6] = 1
+                    reward += 10  # Pickup reward
+                else:
+                    reward -= 1  # Invalid pickup attempt
+            else:
+                if s.agent == s.bin:
+                    terminated = True
+                    reward += 20  # Successful drop reward
+                else:
+                    reward -= 1  # Invalid drop attempt
+
+        if truncated and not terminated:
+            reward -= 5
+
+        return obs, reward, terminated, truncated, {}
+
+    def render(self):
+        if self.render_mode == 'rgb_array':
+            # Headless NumPy rasterizer; copy because its frame buffer is reused
+            from environment.raster import render_rgb_array
+            return render_rgb_array(self).copy()
+        if self.render_mode == 'human':
+            from environment.rendering import render_human
+            render_human(self)
+
+
+class DictObsWrapper(gym.ObservationWrapper):
+    """Turns the flat FastWasteCollectionEnv observation back into the WasteCollectionEnv Dict layout."""
+
+    def __init__(self, env):
+        super(DictObsWrapper, self).__init__(env)
+        grid_size = env.unwrapped.grid_size
+        self.observation_space = WasteCollectionEnv.make_observation_space(grid_size)
+
+    def observation(self, obs):
+        return {
+            'agent': obs[OBS_AGENT].copy(),
+            'waste': obs[OBS_WASTE].copy(),
+            'bin': obs[OBS_BIN].copy(),
+            'carrying': int(obs[OBS_CARRYING])
+        }
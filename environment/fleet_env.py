@@ -0,0 +1,239 @@
+# environment/fleet_env.py
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from environment.custom_env import WasteCollectionEnv
+from environment.vec_env import ACTION_DELTAS
+
+try:
+    from pettingzoo import ParallelEnv
+except ImportError:  # The parallel API is implemented here; PettingZoo only adds its base class
+    ParallelEnv = object
+
+
+def _first_per_group(groups, priority):
+    """Indices (into `groups`) of the lowest-priority member of every group."""
+    order = np.lexsort((priority, groups))
+    sorted_groups = groups[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    return order[first]
+
+
+class FleetWasteCollectionEnv(ParallelEnv):
+    """
+    A fleet of `n_agents` collection vehicles sharing one grid with `n_waste` items and `n_bins` bins,
+    following PettingZoo's parallel API (reset / step with per-agent dicts). The item count does not
+    depend on the fleet size; like WasteCollectionEnv, there is one item by default.
+
+    Every agent observes what a WasteCollectionEnv agent observes: its own position, the nearest
+    waste nobody has picked up yet (-1 while carrying or when none is left), the nearest bin and
+    whether it carries an item. One shared policy can therefore drive every vehicle, and policies
+    trained here can be evaluated on WasteCollectionEnv.
+
+    All vehicles start at the depot (0, 0) and act simultaneously. Per step, for all agents at once:
+      - moves: off-grid moves are wall hits (-0.5). Two vehicles swapping cells both bounce back, and
+        at most one vehicle enters a cell per step: when several move into the same cell, one chosen
+        at random gets in and the others stay and get -0.5 too. Moving onto a cell where vehicles
+        already stand is allowed, so vehicles can share a cell (they all start on the depot).
+      - pickup/drop: when several vehicles pick up the same item, one chosen at random gets it (+10)
+        and the others made an invalid attempt (-1). Dropping into a bin gives +20.
+    Rewards are per agent, with the same -0.1 step and -5 truncation penalties as WasteCollectionEnv.
+    The episode ends for the whole fleet once every item has been delivered; as in WasteCollectionEnv,
+    `truncated` is set on the last allowed step even when it is also the terminal one.
+
+    step_arrays() / reset_arrays() work on (n_agents, ...) arrays directly; FleetVecEnv uses them to
+    expose the fleet as an SB3 VecEnv with one sub-env per vehicle.
+    """
+    metadata = {'name': 'waste_fleet_v0', 'render_modes': []}
+
+    def __init__(self, n_agents=4, grid_size=10, n_waste=1, n_bins=1, max_steps=100, render_mode=None):
+        if n_waste + n_bins >= grid_size * grid_size:
+            raise ValueError("More items and bins than free cells")
+        self.n_agents = n_agents
+        self.grid_size = grid_size
+        self.n_waste = n_waste
+        self.n_bins = n_bins
+        self.max_steps = max_steps
+        self.render_mode = render_mode
+        self.possible_agents = [f"vehicle_{i}" for i in range(n_agents)]
+        self.agents = []
+        self.np_random = None
+        self._observation_space = WasteCollectionEnv.make_observation_space(grid_size)
+        self._action_space = spaces.Discrete(5)
+
+    def observation_space(self, agent):
+        return self._observation_space
+
+    def action_space(self, agent):
+        return self._action_space
+
+    def reset_arrays(self, seed=None):
+        if seed is not None or self.np_random is None:
+            self.np_random, _ = seeding.np_random(seed)
+        g = self.grid_size
+        self.steps = 0
+        self.delivered = 0
+        self.agent_pos = np.zeros((self.n_agents, 2), dtype=np.int32)
+        self.carrying = np.full(self.n_agents, -1, dtype=np.int64)  # Item held by each agent, or -1
+
+        # Distinct cells for items and bins, never the depot
+        cells = self.np_random.choice(g * g - 1, self.n_waste + self.n_bins, replace=False) + 1
+        waste_cells, bin_cells = cells[:self.n_waste], cells[self.n_waste:]
+        self.waste_pos = np.stack([waste_cells % g, waste_cells // g], axis=1).astype(np.int32)
+        self.bin_pos = np.stack([bin_cells % g, bin_cells // g], axis=1).astype(np.int32)
+        self.free = np.ones(self.n_waste, dtype=bool)  # Still lying on the grid
+        self.waste_at = np.full(g * g, -1, dtype=np.int64)
+        self.waste_at[waste_cells] = np.arange(self.n_waste)
+        self.bin_at = np.zeros(g * g, dtype=bool)
+        self.bin_at[bin_cells] = True
+        return self._get_obs()
+
+    def _get_obs(self):
+        holding = self.carrying >= 0
+        waste = np.full((self.n_agents, 2), -1, dtype=np.int32)
+        if self.free.any():
+            dist = np.abs(self.agent_pos[:, None, :] - self.waste_pos[None, :, :]).sum(axis=2)
+            dist[:, ~self.free] = 2 * self.grid_size
+            nearest = self.waste_pos[dist.argmin(axis=1)]
+            waste[~holding] = nearest[~holding]
+        dist = np.abs(self.agent_pos[:, None, :] - self.bin_pos[None, :, :]).sum(axis=2)
+        return {
+            'agent': self.agent_pos.copy(),
+            'waste': waste,
+            'bin': self.bin_pos[dist.argmin(axis=1)],
+            'carrying': holding.astype(np.int64)
+        }
+
+    def step_arrays(self, actions):
+        """Steps every agent; returns (obs arrays, rewards (n_agents,), terminated, truncated)."""
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.n_agents)
+        g = self.grid_size
+        self.steps += 1
+        rewards = np.full(self.n_agents, -0.1)  # Step penalty
+        priority = self.np_random.random(self.n_agents)  # Random winner of each contested cell or item
+
+        # Movement
+        is_move = actions <= 3
+        target = np.clip(self.agent_pos + ACTION_DELTAS[np.minimum(actions, 4)], 0, g-1)
+        moving = is_move & (target != self.agent_pos).any(axis=1)
+        rewards[is_move & ~moving] -= 0.5  # Wall hit penalty
+        movers = np.flatnonzero(moving)
+        if len(movers):
+            current = self.agent_pos[movers, 1] * g + self.agent_pos[movers, 0]
+            wanted = target[movers, 1] * g + target[movers, 0]
+            # Head-on: two vehicles swapping cells both bounce back
+            swapped = np.isin(current * g * g + wanted, wanted * g * g + current)
+            contenders = movers[~swapped]
+            winners = contenders[_first_per_group(wanted[~swapped], priority[contenders])]
+            blocked = moving.copy()
+            blocked[winners] = False
+            rewards[blocked] -= 0.5  # Collision penalty
+            self.agent_pos[winners] = target[winners]
+
+        # Pickup/drop
+        is_act = actions == 4
+        cell = self.agent_pos[:, 1] * g + self.agent_pos[:, 0]
+        item = self.waste_at[cell]
+        holding = self.carrying >= 0
+        wants = np.flatnonzero(is_act & ~holding & (item >= 0))
+        pickers = wants[_first_per_group(item[wants], priority[wants])]
+        self.carrying[pickers] = item[pickers]
+        self.free[item[pickers]] = False
+        self.waste_at[cell[pickers]] = -1
+        drop = is_act & holding & self.bin_at[cell]
+        self.carrying[drop] = -1
+        self.delivered += int(drop.sum())
+        invalid = is_act & ~drop
+        invalid[pickers] = False
+        rewards[pickers] += 10
+        rewards[drop] += 20
+        rewards[invalid] -= 1
+
+        terminated = self.delivered == self.n_waste
+        truncated = self.steps >= self.max_steps
+        if truncated and not terminated:
+            rewards -= 5
+        return self._get_obs(), rewards, terminated, truncated
+
+    def _split(self, obs):
+        return {agent: {key: value[i] for key, value in obs.items()} for i, agent in enumerate(self.possible_agents)}
+
+    def reset(self, seed=None, options=None):
+        obs = self.reset_arrays(seed)
+        self.agents = self.possible_agents[:]
+        return self._split(obs), {agent: {} for agent in self.agents}
+
+    def step(self, actions):
+        obs, rewards, terminated, truncated = self.step_arrays([actions[agent] for agent in self.possible_agents])
+        agents = self.agents
+        if terminated or truncated:
+            self.agents = []
+        return (
+            self._split(obs),
+            {agent: float(rewards[i]) for i, agent in enumerate(agents)},
+            {agent: terminated for agent in agents},
+            {agent: truncated for agent in agents},
+            {agent: {'delivered': self.delivered} for agent in agents}
+        )
+
+    def render(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class FleetVecEnv(VecEnv):
+    """
+    FleetWasteCollectionEnv as an SB3 VecEnv with one sub-env per vehicle, for shared-parameter
+    training: the policy sees n_agents observations per step and every vehicle's transitions go
+    into the same rollout buffer. All sub-envs end together and the fleet is then reset.
+    """
+
+    def __init__(self, n_agents=4, grid_size=10, n_waste=1, n_bins=1, max_steps=100, render_mode=None):
+        self.fleet = FleetWasteCollectionEnv(n_agents, grid_size, n_waste, n_bins, max_steps)
+        self.grid_size = grid_size
+        self.max_steps = max_steps
+        self.render_mode = render_mode
+        super(FleetVecEnv, self).__init__(n_agents, self.fleet.observation_space(None), self.fleet.action_space(None))
+        self.actions = np.zeros(n_agents, dtype=np.int64)
+
+    def reset(self):
+        # The fleet shares one random stream, seeded from the first sub-env's seed
+        obs = self.fleet.reset_arrays(self._seeds[0] if self._seeds else None)
+        self._reset_seeds()
+        self._reset_options()
+        return obs
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        obs, rewards, terminated, truncated = self.fleet.step_arrays(self.actions)
+        done = terminated or truncated
+        dones = np.full(self.num_envs, done)
+        infos = [{"TimeLimit.truncated": truncated and not terminated, "delivered": self.fleet.delivered} for _ in range(self.num_envs)]
+        if done:
+            for i, info in enumerate(infos):
+                info["terminal_observation"] = {key: value[i].copy() for key, value in obs.items()}
+            obs = self.fleet.reset_arrays()
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        # Every sub-env shares the same configuration
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        raise NotImplementedError(f"FleetVecEnv has no per-env method '{method_name}'")
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,175 @@
+# environment/multi_waste_env.py
+import math
+import gymnasium as gym
+from gymnasium import spaces
+import numpy as np
+
+from environment.spatial_index import BucketGrid
+
+# Window channels
+WASTE, BIN, WALL = 0, 1, 2
+
+
+class MultiWasteCollectionEnv(gym.Env):
+    """
+    WasteCollectionEnv for large maps: `n_waste` items and `n_bins` bins on a
+    grid_size x grid_size grid.
+
+    Items and bins are kept sparse in BucketGrid spatial indexes; nothing is
+    allocated per cell. The observation is egocentric, so its size only depends
+    on `view_radius`:
+      - window: (3, 2r+1, 2r+1) waste / bin / outside-the-map occupancy around the agent
+      - carrying: number of items held (up to `capacity`)
+      - targets: offsets to the nearest waste and nearest bin, divided by grid_size
+
+    Rewards follow WasteCollectionEnv (-0.1 per step, -0.5 wall, +10 pickup,
+    +20 per item dropped in a bin, -1 invalid pickup/drop, -5 on truncation) plus
+    `shaping` times the decrease in distance to the nearest waste (nearest bin
+    while full). The episode ends when every item has been delivered.
+    """
+    metadata = {'render_modes': [], 'render_fps': 4}
+
+    def __init__(self, grid_size=100, n_waste=200, n_bins=10, view_radius=5, capacity=1, max_steps=2000,
+                 shaping=0.1, bucket_size=None, render_mode=None):
+        super(MultiWasteCollectionEnv, self).__init__()
+        if n_waste + n_bins + 1 > grid_size * grid_size:
+            raise ValueError("More items and bins than free cells")
+        self.grid_size = grid_size
+        self.n_waste = n_waste
+        self.n_bins = n_bins
+        self.view_radius = view_radius
+        self.capacity = capacity
+        self.max_steps = max_steps
+        self.shaping = shaping
+        self.render_mode = render_mode
+        self.bucket_size = bucket_size
+
+        size = 2 * view_radius + 1
+        self.action_space = spaces.Discrete(5)
+        self.observation_space = spaces.Dict({
+            'window': spaces.Box(0, 1, shape=(3, size, size), dtype=np.float32),
+            'carrying': spaces.Discrete(capacity + 1),
+            'targets': spaces.Box(-1, 1, shape=(4,), dtype=np.float32)
+        })
+        self._window = np.zeros((3, size, size), dtype=np.float32)
+        self._targets = np.zeros(4, dtype=np.float32)
+        self._offsets = np.arange(-view_radius, view_radius + 1)
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        self.steps = 0
+        self.carrying = 0
+        self.delivered = 0
+        self.agent_pos = (0, 0)
+
+        cells = self._sample_cells(self.n_waste + self.n_bins, exclude=0)
+        g = self.grid_size
+        self.waste = BucketGrid(g, self._bucket_size(self.n_waste))
+        for item, cell in enumerate(cells[:self.n_waste]):
+            self.waste.insert(item, cell % g, cell // g)
+        self.bins = BucketGrid(g, self._bucket_size(self.n_bins))
+        for item, cell in enumerate(cells[self.n_waste:]):
+            self.bins.insert(item, cell % g, cell // g)
+
+        self._update_nearest()
+        self._target_dist = self._nearest_target()[1]
+        return self._get_obs(), {}
+
+    def _bucket_size(self, n_items):
+        """About one item per bucket, and a view window never spans more than 2x2 buckets."""
+        if self.bucket_size:
+            return self.bucket_size
+        return max(2 * self.view_radius + 1, int(math.sqrt(self.grid_size * self.grid_size / max(n_items, 1))))
+
+    def _sample_cells(self, n, exclude):
+        """n distinct cell indices other than `exclude`, drawn from np_random without touching every cell."""
+        total = self.grid_size * self.grid_size
+        if 4 * n >= total:
+            cells = self.np_random.permutation(total)
+            return cells[cells != exclude][:n]
+        chosen = np.empty(0, dtype=np.int64)
+        while len(chosen) < n:
+            draw = self.np_random.integers(0, total, size=2 * (n - len(chosen)) + 8)
+            chosen = np.concatenate([chosen, draw[draw != exclude]])
+            _, first = np.unique(chosen, return_index=True)
+            chosen = chosen[np.sort(first)]  # Keep draw order so a seed always gives the same layout
+        return chosen[:n]
+
+    def _update_nearest(self):
+        """One nearest-waste and one nearest-bin query per step, shared by shaping and the observation."""
+        x, y = self.agent_pos
+        self._nearest = (self.waste.nearest(x, y), self.bins.nearest(x, y))
+
+    def _nearest_target(self):
+        if self.carrying >= self.capacity or (self.carrying and not len(self.waste)):
+            return self._nearest[1]
+        return self._nearest[0]
+
+    def _get_obs(self):
+        r = self.view_radius
+        x, y = self.agent_pos
+        window = self._window
+        window[:2] = 0
+        # Window row i / column j shows cell (x - r + j, y - r + i)
+        for channel, index in ((WASTE, self.waste), (BIN, self.bins)):
+            for _, ix, iy in index.in_rect(x - r, y - r, x + r, y + r):
+                window[channel, iy - y + r, ix - x + r] = 1
+        xs = x + self._offsets
+        ys = y + self._offsets
+        outside_x = (xs < 0) | (xs >= self.grid_size)
+        outside_y = (ys < 0) | (ys >= self.grid_size)
+        window[WALL] = outside_y[:, None] | outside_x[None, :]
+
+        targets = self._targets
+        targets[:] = 0
+        for k, index in enumerate((self.waste, self.bins)):
+            item, _ = self._nearest[k]
+            if item is not None:
+                ix, iy = index.positions[item]
+                targets[2 * k] = (ix - x) / self.grid_size
+                targets[2 * k + 1] = (iy - y) / self.grid_size
+        return {'window': window.copy(), 'carrying': self.carrying, 'targets': targets.copy()}
+
+    def step(self, action):
+        self.steps += 1
+        terminated = False
+        truncated = self.steps >= self.max_steps
+        reward = -0.1  # Step penalty
+        x, y = self.agent_pos
+        action = int(action)
+
+        if action <= 3:
+            if action == 0: y = max(0, y-1)                      # Up
+            elif action == 1: y = min(self.grid_size-1, y+1)     # Down
+            elif action == 2: x = max(0, x-1)                    # Left
+            elif action == 3: x = min(self.grid_size-1, x+1)     # Right
+            if (x, y) != self.agent_pos:
+                self.agent_pos = (x, y)
+            else:
+                reward -= 0.5  # Wall hit penalty
+
+        elif action == 4:
+            item = self.waste.at(x, y)
+            if item is not None and self.carrying < self.capacity:
+                self.waste.remove(item)
+                self.carrying += 1
+                reward += 10  # Pickup reward
+            elif self.carrying and self.bins.at(x, y) is not None:
+                reward += 20 * self.carrying  # Drop everything carried
+                self.delivered += self.carrying
+                self.carrying = 0
+                terminated = self.delivered == self.n_waste
+            else:
+                reward -= 1  # Invalid pickup/drop attempt
+
+        # Potential-based shaping towards the current target; the target changes after pickup/drop
+        self._update_nearest()
+        dist = self._nearest_target()[1]
+        if action <= 3 and math.isfinite(dist) and math.isfinite(self._target_dist):
+            reward += self.shaping * (self._target_dist - dist)
+        self._target_dist = dist
+
+        if truncated and not terminated:
+            reward -= 5
+
+        return self._get_obs(), reward, terminated, truncated, {'delivered': self.delivered}
@@ -0,0 +1,37 @@
+# environment/placement.py
+import numpy as np
+
+UNIFORM_BLOCK = 32  # Placement uniforms drawn per generator call by the envs that buffer them (16 resets)
+# Seeded evaluation scores are cached per policies.registry.EVAL_VERSION: bump it when placement changes
+
+
+def waste_and_bin_cell(u_waste, u_bin, n_cells):
+    """
+    Waste and bin cells for an episode starting with the agent on cell 0, from two uniforms in [0, 1).
+
+    Sampling without replacement by rank: the waste takes rank floor(u * (n - 1))
+    among the cells other than the agent's, the bin a rank among the n - 2 cells
+    left, and ranks are mapped to cells by stepping over the taken ones. Every
+    layout is equally likely and there is no rejection loop, however small the grid.
+    """
+    n_free = n_cells - 1
+    waste = 1 + min(int(u_waste * n_free), n_free - 1)  # min: u * n can round up to n
+    bin_cell = 1 + min(int(u_bin * (n_free - 1)), n_free - 2)
+    return waste, bin_cell + (bin_cell >= waste)
+
+
+def free_cells(uniforms, n_cells):
+    """
+    The same rank sampling for (n, k) uniforms: k distinct cells other than cell 0 per row,
+    as an (n, k) int64 array. With k = 2, row i is waste_and_bin_cell(*uniforms[i], n_cells).
+    """
+    n, k = uniforms.shape
+    n_free = n_cells - 1
+    cells = np.empty((n, k), dtype=np.int64)
+    for j in range(k):
+        cell = 1 + np.minimum((uniforms[:, j] * (n_free - j)).astype(np.int64), n_free - j - 1)
+        # Step over the cells already taken, lowest first
+        for taken in np.sort(cells[:, :j], axis=1).T:
+            cell += cell >= taken
+        cells[:, j] = cell
+    return cells
@@ -0,0 +1,129 @@
+# environment/raster.py
+import numpy as np
+
+from environment.colors import COLORS
+
+BIN_IMAGE = "images/recycle-bin.png"
+
+# Renderers are cached per (grid_size, window_size) so static layers are built once
+_RENDERERS = {}
+
+
+def _rgb(color):
+    return np.array([round(c * 255) for c in color], dtype=np.uint8)
+
+
+class RgbRenderer:
+    """
+    Headless NumPy renderer producing the same picture as render_waste_env.
+
+    The cell/grid-line background and one tile per (bin, waste, agent)
+    combination are rasterized once per grid size. Each frame only clears the
+    cells drawn in the previous frame and copies tiles into the cells that are
+    occupied now. render() returns an internal (H, W, 3) uint8 buffer that is
+    reused on the next call.
+    """
+
+    def __init__(self, grid_size, window_size=600):
+        self.grid_size = grid_size
+        self.cell = max(window_size // grid_size, 1)
+        size = self.cell * grid_size
+
+        # Static layer: cells plus 2px grid lines on every cell border
+        self.background = np.empty((size, size, 3), dtype=np.uint8)
+        self.background[:] = _rgb(COLORS['cell'])
+        grid = _rgb(COLORS['grid'])
+        for i in range(grid_size + 1):
+            lo, hi = max(i * self.cell - 1, 0), min(i * self.cell + 1, size)
+            self.background[lo:hi, :] = grid
+            self.background[:, lo:hi] = grid
+        self.buffer = self.background.copy()
+        self._dirty = []
+
+        # Sprite masks in cell coordinates (u right, v up), matching rendering.py geometry
+        centers = (np.arange(self.cell) + 0.5) / self.cell
+        u = centers[None, :]
+        v = centers[::-1, None]
+        cell_color = _rgb(COLORS['cell'])
+
+        waste = (u - 0.5) ** 2 + (v - 0.5) ** 2 <= 0.35 ** 2
+        body = (u >= 0.2) & (u < 0.8) & (v >= 0.1) & (v < 0.7)
+        head = (u - 0.5) ** 2 + (v - 0.75) ** 2 <= 0.2 ** 2
+
+        # The bin only covers the cell interior, so it is pre-blended onto the plain cell color
+        bin_tile = np.empty((self.cell, self.cell, 3), dtype=np.uint8)
+        bin_tile[:] = cell_color
+        lo, hi = int(round(0.1 * self.cell)), int(round(0.9 * self.cell))
+        if hi > lo:
+            sprite = self._load_bin_sprite(hi - lo)
+            alpha = sprite[..., 3:4] / 255.0
+            blended = sprite[..., :3] * alpha + cell_color * (1 - alpha)
+            bin_tile[lo:hi, lo:hi] = np.round(blended).astype(np.uint8)
+
+        # Every sprite sits inside the grid lines, so each (bin, waste, agent) combination
+        # becomes one opaque tile of the cell interior and a frame is a few slice copies.
+        self._inner = slice(1, self.cell - 1) if self.cell > 2 else slice(0, self.cell)
+        self.tiles = {}
+        for has_bin in (False, True):
+            for has_waste in (False, True):
+                for has_agent in (False, True):
+                    tile = bin_tile.copy() if has_bin else np.tile(cell_color, (self.cell, self.cell, 1))
+                    if has_waste:
+                        tile[waste] = _rgb(COLORS['waste'])
+                    if has_agent:
+                        tile[body] = _rgb(COLORS['agent_body'])
+                        tile[head] = _rgb(COLORS['agent_head'])
+                    self.tiles[has_bin, has_waste, has_agent] = tile[self._inner, self._inner].copy()
+
+    @staticmethod
+    def _load_bin_sprite(size):
+        """RGBA bin image scaled to size x size; falls back to a plain green square without Pillow."""
+        try:
+            from PIL import Image
+            image = Image.open(BIN_IMAGE).convert("RGBA").resize((size, size), Image.BILINEAR)
+            return np.asarray(image, dtype=np.float64)
+        except (ImportError, OSError):
+            sprite = np.zeros((size, size, 4))
+            sprite[:] = (40, 160, 60, 255)
+            return sprite
+
+    def _cell_slice(self, cell):
+        x, y = cell
+        row = (self.grid_size - 1 - y) * self.cell  # y grows upwards, like the OpenGL view
+        inner = self._inner
+        return (slice(row + inner.start, row + inner.stop),
+                slice(x * self.cell + inner.start, x * self.cell + inner.stop))
+
+    def render(self, agent_pos, waste_pos, bin_pos, carrying):
+        buffer = self.buffer
+        empty = self.tiles[False, False, False]
+        for region in self._dirty:
+            buffer[region] = empty
+
+        agent = (int(agent_pos[0]), int(agent_pos[1]))
+        bin_cell = (int(bin_pos[0]), int(bin_pos[1]))
+        occupied = {agent, bin_cell}
+        waste = None
+        if not carrying:
+            waste = (int(waste_pos[0]), int(waste_pos[1]))
+            occupied.add(waste)
+
+        self._dirty = []
+        for cell in occupied:
+            region = self._cell_slice(cell)
+            buffer[region] = self.tiles[cell == bin_cell, cell == waste, cell == agent]
+            self._dirty.append(region)
+        return buffer
+
+
+def get_renderer(grid_size, window_size=600):
+    key = (grid_size, window_size)
+    if key not in _RENDERERS:
+        _RENDERERS[key] = RgbRenderer(grid_size, window_size)
+    return _RENDERERS[key]
+
+
+def render_rgb_array(env, window_size=600):
+    """Renders a WasteCollectionEnv-like object into the shared, reused frame buffer."""
+    renderer = get_renderer(env.grid_size, window_size)
+    return renderer.render(env.agent_pos, env.waste_pos, env.bin_pos, env.carrying_waste)
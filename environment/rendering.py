@@ -4,17 +4,9 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 import math
 
-# Color definitions 
-COLORS = {
-    'background': (1.0, 1.0, 1.0),              # White background
-    'cell': (0.4, 0.2, 0.7),                    # Light purple cells
-    'grid': (0.8, 0.7, 0.9), 
-    'agent_body': (0.0, 0.0, 1.0),              # Blue agent body
-    'agent_head': (1.0, 1.0, 0.90),          
-    'waste': (0.55, 0.27, 0.07)                 
-}
-
-# Global variable for bin texture
+from environment.colors import COLORS
+
+# Global variable for bin texture, loaded in the GL context of GL_SURFACE
 BIN_TEXTURE = None
 
 def load_texture(image_path):
@@ -76,54 +68,100 @@ def draw_circle(cx, cy, radius, color, segments=32):
         glVertex2f(cx + math.cos(angle) * radius, cy + math.sin(angle) * radius)
     glEnd()
 
-def render_waste_env(env, screen):
-    """
-    Renders the environment onto the provided 'screen'.
-    Assumes that 'screen' has already been created (e.g., via pygame.display.set_mode).
-    """
-    global BIN_TEXTURE
-    if BIN_TEXTURE is None:
-        BIN_TEXTURE = load_texture("images/recycle-bin.png")  
-
-    window_size = screen.get_width()  
-    cell_size = window_size / env.grid_size
-
-    # Clear the buffer with the background color.
-    glClearColor(*COLORS['background'], 1.0)
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    glLoadIdentity()
-    gluOrtho2D(0, env.grid_size, 0, env.grid_size)
-
-    # Drawing cells
-    for i in range(env.grid_size):
-        for j in range(env.grid_size):
-            draw_filled_rect(i, j, 1, 1, COLORS['cell'])
-    
-    # Drawing grid lines.
+def render_human(env, window_size=600):
+    """Renders into the current pygame window, opening one if none exists yet."""
+    screen = pygame.display.get_surface()
+    if screen is None:
+        pygame.init()
+        screen = pygame.display.set_mode((window_size, window_size), pygame.OPENGL | pygame.DOUBLEBUF)
+    render_waste_env(env, screen)
+
+def compile_list(draw):
+    """Records the GL calls made by draw() into a display list and returns its id."""
+    list_id = glGenLists(1)
+    glNewList(list_id, GL_COMPILE)
+    draw()
+    glEndList()
+    return list_id
+
+def draw_grid(grid_size):
+    """Draws all cells as one quad plus the grid lines."""
+    draw_filled_rect(0, 0, grid_size, grid_size, COLORS['cell'])
     glColor3f(*COLORS['grid'])
     glLineWidth(2)
     glBegin(GL_LINES)
-    for i in range(env.grid_size + 1):
+    for i in range(grid_size + 1):
         glVertex2f(i, 0)
-        glVertex2f(i, env.grid_size)
-    for j in range(env.grid_size + 1):
-        glVertex2f(0, j)
-        glVertex2f(env.grid_size, j)
+        glVertex2f(i, grid_size)
+        glVertex2f(0, i)
+        glVertex2f(grid_size, i)
     glEnd()
 
-    # drawing bin 
-    bx, by = env.bin_pos
-    draw_textured_rect(bx + 0.1, by + 0.1, 0.8, 0.8, BIN_TEXTURE)
+def draw_agent():
+    draw_filled_rect(0.2, 0.1, 0.6, 0.6, COLORS['agent_body'])
+    draw_circle(0.5, 0.75, 0.2, COLORS['agent_head'])
 
-    # drawing waste 
-    if not env.carrying_waste:
-        wx, wy = env.waste_pos
-        draw_circle(wx + 0.5, wy + 0.5, 0.35, COLORS['waste'])
-    
-    # Drawing agent
-    ax, ay = env.agent_pos
-    draw_filled_rect(ax + 0.2, ay + 0.1, 0.6, 0.6, COLORS['agent_body'])
-    draw_circle(ax + 0.5, ay + 0.75, 0.2, COLORS['agent_head']) 
-    
+class GLRenderer:
+    """
+    Retained-mode renderer for one grid size.
+
+    The grid and the bin, waste and agent sprites (in cell-local coordinates)
+    are compiled into display lists once; a frame is a clear, one call for
+    the grid and one translated call per sprite, whatever the grid size.
+    Display lists belong to the GL context that was current when they were
+    compiled, so build renderers after the window exists.
+    """
+    def __init__(self, grid_size):
+        global BIN_TEXTURE
+        if BIN_TEXTURE is None:
+            BIN_TEXTURE = load_texture("images/recycle-bin.png")
+        self.grid_size = grid_size
+        self.grid_list = compile_list(lambda: draw_grid(grid_size))
+        self.bin_list = compile_list(lambda: draw_textured_rect(0.1, 0.1, 0.8, 0.8, BIN_TEXTURE))
+        self.waste_list = compile_list(lambda: draw_circle(0.5, 0.5, 0.35, COLORS['waste']))
+        self.agent_list = compile_list(draw_agent)
+
+    @staticmethod
+    def draw_at(list_id, x, y):
+        glPushMatrix()
+        glTranslatef(float(x), float(y), 0)
+        glCallList(list_id)
+        glPopMatrix()
+
+    def draw(self, env):
+        glClearColor(*COLORS['background'], 1.0)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        gluOrtho2D(0, self.grid_size, 0, self.grid_size)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+
+        glCallList(self.grid_list)
+        self.draw_at(self.bin_list, *env.bin_pos)
+        if not env.carrying_waste:
+            self.draw_at(self.waste_list, *env.waste_pos)
+        self.draw_at(self.agent_list, *env.agent_pos)
+
+# One renderer per grid size, created lazily inside the GL context of GL_SURFACE. A new window
+# (pygame.quit() then set_mode() gives a new display surface) has a new context, in which these
+# display lists and the bin texture do not exist, so both caches are rebuilt for it
+GL_RENDERERS = {}
+GL_SURFACE = None
+
+def render_waste_env(env, screen):
+    """
+    Renders the environment onto the provided 'screen'.
+    Assumes that 'screen' has already been created (e.g., via pygame.display.set_mode).
+    The frame is presented immediately; pacing is left to the caller's clock.
+    """
+    global BIN_TEXTURE, GL_SURFACE
+    if screen is not GL_SURFACE:
+        GL_RENDERERS.clear()
+        BIN_TEXTURE = None
+        GL_SURFACE = screen
+    renderer = GL_RENDERERS.get(env.grid_size)
+    if renderer is None:
+        renderer = GL_RENDERERS[env.grid_size] = GLRenderer(env.grid_size)
+    renderer.draw(env)
     pygame.display.flip()
-    pygame.time.wait(100)
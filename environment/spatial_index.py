@@ -0,0 +1,85 @@
+# environment/spatial_index.py
+import math
+
+
+class BucketGrid:
+    """
+    Uniform bucket grid over a grid_size x grid_size map for sparse items.
+
+    Items live in the bucket of their cell, with a cell -> item map for O(1)
+    "is there something here" checks. Rectangle queries visit only the buckets
+    they overlap and nearest() searches rings of buckets outwards from the query
+    point, so with about one item per bucket both cost the same whatever the
+    map size.
+    """
+
+    def __init__(self, grid_size, bucket_size):
+        self.grid_size = grid_size
+        self.bucket_size = max(int(bucket_size), 1)
+        self.n_buckets = math.ceil(grid_size / self.bucket_size)
+        self.buckets = [set() for _ in range(self.n_buckets * self.n_buckets)]
+        self.cells = {}  # cell index (y * grid_size + x) -> item
+        self.positions = {}  # item -> (x, y)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _bucket(self, x, y):
+        return (y // self.bucket_size) * self.n_buckets + x // self.bucket_size
+
+    def insert(self, item, x, y):
+        self.buckets[self._bucket(x, y)].add(item)
+        self.cells[y * self.grid_size + x] = item
+        self.positions[item] = (x, y)
+
+    def remove(self, item):
+        x, y = self.positions.pop(item)
+        self.buckets[self._bucket(x, y)].discard(item)
+        del self.cells[y * self.grid_size + x]
+
+    def at(self, x, y):
+        """Item on cell (x, y), or None."""
+        return self.cells.get(y * self.grid_size + x)
+
+    def in_rect(self, x0, y0, x1, y1):
+        """Yields (item, x, y) for items with x0 <= x <= x1 and y0 <= y <= y1."""
+        b = self.bucket_size
+        last = self.n_buckets - 1
+        bx0, bx1 = max(x0 // b, 0), min(x1 // b, last)
+        by0, by1 = max(y0 // b, 0), min(y1 // b, last)
+        positions = self.positions
+        for by in range(by0, by1 + 1):
+            row = by * self.n_buckets
+            for bx in range(bx0, bx1 + 1):
+                for item in self.buckets[row + bx]:
+                    x, y = positions[item]
+                    if x0 <= x <= x1 and y0 <= y <= y1:
+                        yield item, x, y
+
+    def nearest(self, x, y):
+        """(item, manhattan distance) of the closest item, or (None, inf) when empty."""
+        if not self.positions:
+            return None, math.inf
+        b = self.bucket_size
+        n = self.n_buckets
+        cx, cy = x // b, y // b
+        best, best_dist = None, math.inf
+        positions = self.positions
+        for ring in range(n):
+            # Buckets of Chebyshev ring `ring` around the query bucket
+            for by in range(max(cy - ring, 0), min(cy + ring, n - 1) + 1):
+                edge = by == cy - ring or by == cy + ring
+                step = 1 if edge else 2 * ring
+                bx = cx - ring
+                while bx <= cx + ring:
+                    if 0 <= bx < n:
+                        for item in self.buckets[by * n + bx]:
+                            ix, iy = positions[item]
+                            dist = abs(ix - x) + abs(iy - y)
+                            if dist < best_dist:
+                                best, best_dist = item, dist
+                    bx += step
+            # Every item in ring + 1 is at least ring * bucket_size + 1 cells away
+            if best_dist <= ring * b:
+                break
+        return best, best_dist
@@ -0,0 +1,243 @@
+# environment/vec_env.py
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from environment.custom_env import WasteCollectionEnv
+from environment.placement import UNIFORM_BLOCK, free_cells
+
+# Position delta for each action: 0=Up, 1=Down, 2=Left, 3=Right, 4=pickup/drop (no move)
+ACTION_DELTAS = np.array([[0, -1], [0, 1], [-1, 0], [1, 0], [0, 0]], dtype=np.int32)
+
+
+class BatchedWasteCollectionEnv(VecEnv):
+    """
+    N copies of WasteCollectionEnv stepped together with array operations.
+
+    Agent, waste, bin and carrying state live in contiguous (N, ...) arrays and
+    every step resolves movement, wall hits, pickup/drop and rewards for all N
+    environments at once. Transitions and rewards are identical to a
+    DummyVecEnv of scalar envs: every sub-env has its own generator and uses
+    its uniforms for waste and bin placement the way WasteCollectionEnv does, so
+    after env.seed(seed) sub-env i plays the episodes of a WasteCollectionEnv
+    reset with seed + i.
+
+    With n_waste > 1 an episode has several items, carried one at a time; the
+    observed waste is the nearest item still on the grid and the episode ends
+    once every item is in a bin. set_stage() changes the grid size, item count
+    and horizon of the episodes that start afterwards (a curriculum), while
+    `observation_grid_size` keeps the observation space fixed across stages.
+    """
+
+    def __init__(self, num_envs=8, grid_size=5, max_steps=100, render_mode=None, n_waste=1,
+                 observation_grid_size=None):
+        self.render_mode = render_mode
+        self.observation_grid_size = observation_grid_size or grid_size
+
+        super(BatchedWasteCollectionEnv, self).__init__(
+            num_envs, WasteCollectionEnv.make_observation_space(self.observation_grid_size), spaces.Discrete(5)
+        )
+
+        self.agent_pos = np.zeros((num_envs, 2), dtype=np.int32)
+        self.waste_pos = np.zeros((num_envs, 2), dtype=np.int32)  # The item itself, or the nearest one left
+        self.bin_pos = np.zeros((num_envs, 2), dtype=np.int32)
+        self.carrying_waste = np.zeros(num_envs, dtype=bool)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.actions = np.zeros(num_envs, dtype=np.int64)
+        # Stage of each sub-env's current episode
+        self.stage = 0
+        self.env_stage = np.zeros(num_envs, dtype=np.int64)
+        self.env_grid_size = np.zeros(num_envs, dtype=np.int64)
+        self.env_max_steps = np.zeros(num_envs, dtype=np.int64)
+        self.env_n_waste = np.zeros(num_envs, dtype=np.int64)
+        # Items of multi-item episodes: positions, still on the grid, and the one observed
+        self.items = np.zeros((num_envs, 1, 2), dtype=np.int32)
+        self.free = np.zeros((num_envs, 1), dtype=bool)
+        self.target = np.zeros(num_envs, dtype=np.int64)
+        self.delivered = np.zeros(num_envs, dtype=np.int64)
+        # Per sub-env generator, created on first reset. Placement uniforms are drawn UNIFORM_BLOCK
+        # at a time (or n_waste + 1 when more) and consumed n_waste + 1 per reset: with one item,
+        # the same values a scalar env draws with random(2)
+        self.np_randoms = [None] * num_envs
+        self._uniforms = np.zeros((num_envs, UNIFORM_BLOCK))
+        self._next_uniform = np.full(num_envs, UNIFORM_BLOCK)
+        self.grid_size, self.n_waste, self.max_steps = grid_size, n_waste, max_steps
+        self.set_stage(grid_size, n_waste, max_steps, stage=0)
+
+    def set_stage(self, grid_size=None, n_waste=None, max_steps=None, stage=None):
+        """
+        Grid size, item count and step limit of episodes starting from now on; running
+        episodes finish with their own. `stage` is reported in the info of their last step.
+        """
+        grid_size = grid_size or self.grid_size
+        n_waste = n_waste or self.n_waste
+        if grid_size > self.observation_grid_size:
+            raise ValueError(f"Grid size {grid_size} exceeds the observation space ({self.observation_grid_size})")
+        if n_waste + 1 >= grid_size * grid_size:
+            raise ValueError("More items and bins than free cells")
+        if n_waste > self.items.shape[1]:
+            if self.items.shape[1] == 1:
+                # Single-item resets only set waste_pos; running episodes keep their item
+                self.items[:, 0] = self.waste_pos
+                self.free[:, 0] = ~self.carrying_waste
+                self.target[:] = 0
+                self.delivered[:] = 0
+            extra = n_waste - self.items.shape[1]
+            self.items = np.concatenate([self.items, np.zeros((self.num_envs, extra, 2), dtype=np.int32)], axis=1)
+            self.free = np.concatenate([self.free, np.zeros((self.num_envs, extra), dtype=bool)], axis=1)
+        self.grid_size, self.n_waste = grid_size, n_waste
+        self.max_steps = max_steps or self.max_steps
+        self.stage = self.stage + 1 if stage is None else stage
+
+    def set_seeds(self, seeds):
+        """One seed per sub-env for the next reset(), instead of env.seed()'s seed + i."""
+        self._seeds = [None if seed is None else int(seed) for seed in seeds]
+
+    def _reset_envs(self, indices, seeds=None):
+        """Resets the given sub-envs into the current stage; all of them are placed in one batch."""
+        indices = np.asarray(indices, dtype=np.int64)
+        g, k = self.grid_size, self.n_waste
+        self.agent_pos[indices] = 0
+        self.carrying_waste[indices] = False
+        self.steps[indices] = 0
+        self.env_stage[indices] = self.stage
+        self.env_grid_size[indices] = g
+        self.env_max_steps[indices] = self.max_steps
+        self.env_n_waste[indices] = k
+        if seeds:
+            for i in indices:
+                if seeds[i] is not None:
+                    self.np_randoms[i], _ = seeding.np_random(seeds[i])
+                    self._next_uniform[i] = self._uniforms.shape[1]
+        if k + 1 > self._uniforms.shape[1]:
+            # Wider blocks for this stage; every sub-env draws a new one
+            self._uniforms = np.zeros((self.num_envs, k + 1))
+            self._next_uniform[:] = k + 1
+        block = self._uniforms.shape[1]
+        for i in indices[self._next_uniform[indices] + k + 1 > block]:
+            if self.np_randoms[i] is None:
+                self.np_randoms[i], _ = seeding.np_random()
+            self._uniforms[i] = self.np_randoms[i].random(block)
+            self._next_uniform[i] = 0
+        cursor = self._next_uniform[indices]
+        uniforms = self._uniforms[indices[:, None], cursor[:, None] + np.arange(k + 1)]
+        self._next_uniform[indices] += k + 1
+        cells = free_cells(uniforms, g * g)  # Items first, then the bin
+        self.bin_pos[indices, 0], self.bin_pos[indices, 1] = cells[:, k] % g, cells[:, k] // g
+        if self.items.shape[1] == 1:
+            self.waste_pos[indices, 0], self.waste_pos[indices, 1] = cells[:, 0] % g, cells[:, 0] // g
+            return
+        self.items[indices, :k, 0], self.items[indices, :k, 1] = cells[:, :k] % g, cells[:, :k] // g
+        self.free[indices] = np.arange(self.items.shape[1]) < k
+        self.delivered[indices] = 0
+        self._retarget(indices)
+
+    def _retarget(self, indices):
+        """Points waste_pos at the nearest item still on the grid (Manhattan distance)."""
+        dist = np.abs(self.items[indices] - self.agent_pos[indices, None, :]).sum(axis=2)
+        dist[~self.free[indices]] = np.iinfo(np.int32).max
+        self.target[indices] = dist.argmin(axis=1)
+        self.waste_pos[indices] = self.items[indices, self.target[indices]]
+
+    def _get_obs(self):
+        waste = np.where(self.carrying_waste[:, None], np.int32(-1), self.waste_pos)
+        return {
+            'agent': self.agent_pos.copy(),
+            'waste': waste,
+            'bin': self.bin_pos.copy(),
+            'carrying': self.carrying_waste.astype(np.int64)
+        }
+
+    def reset(self):
+        self._reset_envs(range(self.num_envs), self._seeds)
+        # Seeds and options are only used once; later resets continue each sub-env's stream
+        self._reset_seeds()
+        self._reset_options()
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        actions = self.actions
+        multi = self.items.shape[1] > 1
+        self.steps += 1
+        rewards = np.full(self.num_envs, -0.1)  # Step penalty
+
+        # Movement actions: non-move actions have a zero delta
+        is_move = actions <= 3
+        new_pos = np.clip(self.agent_pos + ACTION_DELTAS[np.minimum(actions, 4)], 0, self.env_grid_size[:, None] - 1)
+        moved = (new_pos != self.agent_pos).any(axis=1)
+        self.agent_pos = new_pos.astype(np.int32)
+        # The scalar env measures both shaping distances after the move, so its
+        # distance term is always zero; only the wall penalty changes the reward.
+        rewards[is_move & ~moved] -= 0.5
+        if multi:
+            self._retarget(np.arange(self.num_envs))
+
+        # Pickup/drop action
+        is_act = actions == 4
+        at_waste = (self.agent_pos == self.waste_pos).all(axis=1)
+        at_bin = (self.agent_pos == self.bin_pos).all(axis=1)
+        carrying = self.carrying_waste
+        pickup = is_act & ~carrying & at_waste
+        drop = is_act & carrying & at_bin
+        invalid = is_act & ~pickup & ~drop
+        rewards[pickup] += 10
+        rewards[invalid] -= 1
+        rewards[drop] += 20
+        self.carrying_waste = carrying | pickup
+
+        terminated = drop
+        if multi:
+            self.free[np.flatnonzero(pickup), self.target[pickup]] = False
+            self.delivered += drop
+            terminated = drop & (self.delivered == self.env_n_waste)
+            # Like the scalar env, the final observation of an episode still shows the item carried
+            self.carrying_waste &= ~(drop & ~terminated)
+            self._retarget(np.flatnonzero(drop))
+        truncated = self.steps >= self.env_max_steps
+        rewards[truncated & ~terminated] -= 5
+        dones = terminated | truncated
+
+        obs = self._get_obs()
+        infos = [{"TimeLimit.truncated": bool(t and not d)} for t, d in zip(truncated, terminated)]
+        done_idx = np.flatnonzero(dones)
+        if len(done_idx) > 0:
+            # Save final observations where SB3 can find them, then reset
+            for i in done_idx:
+                infos[i]["terminal_observation"] = {key: value[i].copy() for key, value in obs.items()}
+                infos[i]["stage"] = int(self.env_stage[i])
+            self._reset_envs(done_idx)
+            reset_obs = self._get_obs()
+            for key in obs:
+                obs[key][done_idx] = reset_obs[key][done_idx]
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def get_images(self):
+        if self.render_mode != 'rgb_array':
+            return [None for _ in range(self.num_envs)]
+        from environment.raster import get_renderer
+        return [
+            get_renderer(int(self.env_grid_size[i])).render(
+                self.agent_pos[i], self.waste_pos[i], self.bin_pos[i], self.carrying_waste[i]).copy()
+            for i in range(self.num_envs)
+        ]
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        # Every sub-env shares the same configuration
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        raise NotImplementedError(f"BatchedWasteCollectionEnv has no per-env method '{method_name}'")
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
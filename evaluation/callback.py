@@ -0,0 +1,207 @@
+# evaluation/callback.py
+import os
+import numpy as np
+from stable_baselines3.common.callbacks import EventCallback
+
+from evaluation.evaluate import evaluate_policy_batched
+
+
+class BatchedEvalCallback(EventCallback):
+    """
+    Drop-in replacement for EvalCallback that scores the model on
+    `n_eval_episodes` seeded episodes played side by side in a
+    BatchedWasteCollectionEnv. It never touches the training env, logs the
+    same eval/* scalars (plus success rate and steps-to-drop), writes the
+    same evaluations.npz layout and saves best_model.zip.
+    """
+    def __init__(self, n_eval_episodes=1000, eval_freq=5000, grid_size=5, max_steps=100, seed=0,
+                 best_model_save_path=None, log_path=None, deterministic=True,
+                 callback_on_new_best=None, callback_after_eval=None, verbose=1):
+        super(BatchedEvalCallback, self).__init__(callback_after_eval, verbose=verbose)
+        self.callback_on_new_best = callback_on_new_best
+        if self.callback_on_new_best is not None:
+            self.callback_on_new_best.parent = self
+        self.n_eval_episodes = n_eval_episodes
+        self.eval_freq = eval_freq
+        self.grid_size = grid_size
+        self.max_steps = max_steps
+        self.seed = seed
+        self.deterministic = deterministic
+        self.best_model_save_path = best_model_save_path
+        self.log_path = os.path.join(log_path, "evaluations") if log_path is not None else None
+        self.best_mean_reward = -np.inf
+        self.last_mean_reward = -np.inf
+        self.last_result = None
+        self.evaluations_timesteps = []
+        self.evaluations_results = []
+        self.evaluations_length = []
+        self.evaluations_successes = []
+
+    def _init_callback(self):
+        if self.best_model_save_path is not None:
+            os.makedirs(self.best_model_save_path, exist_ok=True)
+        if self.log_path is not None:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        if self.callback_on_new_best is not None:
+            self.callback_on_new_best.init_callback(self.model)
+
+    def _on_step(self) -> bool:
+        continue_training = True
+        if self.eval_freq > 0 and self.n_calls % self.eval_freq == 0:
+            result = evaluate_policy_batched(
+                self.model.predict, self.n_eval_episodes, self.grid_size, self.max_steps,
+                seed=self.seed, deterministic=self.deterministic
+            )
+            continue_training = self._record_result(result, self.num_timesteps, self._save_best)
+        return continue_training
+
+    def _save_best(self):
+        self.model.save(os.path.join(self.best_model_save_path, "best_model"))
+
+    def _record_result(self, result, timesteps, save_best):
+        """Logs and stores an evaluation of the policy at `timesteps`; save_best() saves that policy."""
+        continue_training = True
+        self.last_result = result
+        mean_reward = result["mean_return"]
+        self.last_mean_reward = mean_reward
+
+        if self.log_path is not None:
+            self.evaluations_timesteps.append(timesteps)
+            self.evaluations_results.append(result["returns"])
+            self.evaluations_length.append(result["lengths"])
+            self.evaluations_successes.append(result["success"])
+            np.savez(
+                self.log_path,
+                timesteps=self.evaluations_timesteps,
+                results=self.evaluations_results,
+                ep_lengths=self.evaluations_length,
+                successes=self.evaluations_successes
+            )
+
+        if self.verbose >= 1:
+            print(f"Eval num_timesteps={timesteps}, "
+                  f"episode_reward={mean_reward:.2f} +/- {result['return_ci95']:.2f} (95% CI), "
+                  f"success rate={result['success_rate']:.1%}")
+        self.logger.record("eval/mean_reward", mean_reward)
+        self.logger.record("eval/mean_ep_length", result["mean_ep_length"])
+        self.logger.record("eval/success_rate", result["success_rate"])
+        self.logger.record("eval/mean_steps_to_drop", result["mean_steps_to_drop"])
+        self.logger.record("time/total_timesteps", timesteps, exclude="tensorboard")
+        self.logger.dump(timesteps)
+
+        if mean_reward > self.best_mean_reward:
+            if self.verbose >= 1:
+                print("New best mean reward!")
+            if self.best_model_save_path is not None:
+                save_best()
+            self.best_mean_reward = mean_reward
+            if self.callback_on_new_best is not None:
+                continue_training = self.callback_on_new_best.on_step()
+
+        if self.callback is not None:
+            continue_training = continue_training and self._on_event()
+        return continue_training
+
+
+def _eval_worker(requests, results, n_eval_episodes, grid_size, max_steps, seed):
+    """AsyncEvalCallback's process: evaluates (timesteps, policy arrays) requests until it gets None."""
+    from policies.numpy_policy import NumpyPolicy
+
+    for request in iter(requests.get, None):
+        timesteps, arrays = request
+        policy = NumpyPolicy.from_arrays(arrays)
+        results.put((timesteps, evaluate_policy_batched(policy.predict, n_eval_episodes, grid_size, max_steps, seed)))
+
+
+class AsyncEvalCallback(BatchedEvalCallback):
+    """
+    BatchedEvalCallback that evaluates in a background process while training goes on.
+
+    Every eval_freq calls, the action path of the policy is copied to NumPy arrays (the
+    export_numpy layout) and sent to a worker process that plays the seeded episodes with a
+    NumpyPolicy. Results are picked up by later steps and logged, saved and passed to
+    callback_after_eval exactly like BatchedEvalCallback's, under the timesteps of the
+    snapshot; best_model.zip is saved from a copy of the weights taken with the snapshot.
+    At most `max_pending` evaluations are in flight: later ones are skipped (and counted
+    in `skipped`) rather than waiting. Pending results are collected when training ends.
+    Evaluation is always deterministic.
+    """
+    def __init__(self, *args, max_pending=2, **kwargs):
+        super(AsyncEvalCallback, self).__init__(*args, **kwargs)
+        if not self.deterministic:
+            raise ValueError("AsyncEvalCallback evaluates NumPy exports, which only act deterministically")
+        self.max_pending = max_pending
+        self.skipped = 0
+        self._pending = {}  # timesteps -> state_dict copy of the policy being evaluated
+        self._process = None
+
+    def _init_callback(self):
+        super(AsyncEvalCallback, self)._init_callback()
+        import multiprocessing
+        from stable_baselines3 import DQN
+
+        self._algorithm = "dqn" if isinstance(self.model, DQN) else "ppo"
+        context = multiprocessing.get_context("spawn")
+        self._requests, self._results = context.Queue(), context.Queue()
+        self._process = context.Process(
+            target=_eval_worker, daemon=True,
+            args=(self._requests, self._results, self.n_eval_episodes, self.grid_size, self.max_steps, self.seed)
+        )
+        self._process.start()
+
+    def _on_step(self) -> bool:
+        continue_training = True
+        if self.eval_freq > 0 and self.n_calls % self.eval_freq == 0:
+            if len(self._pending) < self.max_pending:
+                from policies.export_numpy import policy_arrays
+
+                # Copies: the exported arrays share memory with parameters the next update changes
+                arrays = {key: np.array(value) for key, value in policy_arrays(self.model, self._algorithm).items()}
+                self._requests.put((self.num_timesteps, arrays))
+                self._pending[self.num_timesteps] = {key: value.detach().clone()
+                                                     for key, value in self.model.policy.state_dict().items()}
+            else:
+                self.skipped += 1
+        while self._pending and not self._results.empty():
+            continue_training = self._collect(*self._results.get()) and continue_training
+        return continue_training
+
+    def _collect(self, timesteps, result):
+        weights = self._pending.pop(timesteps)
+        return self._record_result(result, timesteps, lambda: self._save_weights(weights))
+
+    def _save_weights(self, weights):
+        """Saves best_model.zip with the evaluated weights, then puts the current ones back."""
+        current = {key: value.detach().clone() for key, value in self.model.policy.state_dict().items()}
+        self.model.policy.load_state_dict(weights)
+        self._save_best()
+        self.model.policy.load_state_dict(current)
+
+    def _next_result(self, poll_interval=1.0):
+        """Waits for the worker's next result; RuntimeError if the worker exited without sending it."""
+        import queue
+
+        while True:
+            try:
+                return self._results.get(timeout=poll_interval)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    try:  # A result sent just before exiting may still be in the pipe
+                        return self._results.get(timeout=poll_interval)
+                    except queue.Empty:
+                        pass
+                    exitcode = self._process.exitcode
+                    self._process = None
+                    raise RuntimeError(f"Evaluation worker exited (code {exitcode}) with "
+                                       f"{len(self._pending)} evaluation(s) pending")
+
+    def _on_training_end(self):
+        while self._pending:
+            self._collect(*self._next_result())
+        self.close()
+
+    def close(self):
+        if self._process is not None:
+            self._requests.put(None)
+            self._process.join()
+            self._process = None
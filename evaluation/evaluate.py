@@ -0,0 +1,109 @@
+# evaluation/evaluate.py
+import argparse
+import time
+import numpy as np
+
+from environment.vec_env import BatchedWasteCollectionEnv
+
+
+def run_episodes(env, predict, obs, deterministic=True):
+    """
+    Runs every sub-env of a BatchedWasteCollectionEnv for exactly one episode.
+
+    Each step makes one batched `predict` call (SB3 signature) on the
+    observations of the episodes that are still running. Returns per-episode
+    undiscounted returns, lengths and success flags (dropped before truncation).
+    """
+    n = env.num_envs
+    returns = np.zeros(n)
+    lengths = np.zeros(n, dtype=np.int64)
+    success = np.zeros(n, dtype=bool)
+    live = np.ones(n, dtype=bool)
+    actions = np.zeros(n, dtype=np.int64)
+    while live.any():
+        idx = np.flatnonzero(live)
+        live_obs = obs if len(idx) == n else {key: value[idx] for key, value in obs.items()}
+        # Finished episodes keep stepping (auto-reset) with a no-op action; their results are ignored
+        actions[:] = 0
+        actions[idx], _ = predict(live_obs, deterministic=deterministic)
+        obs, rewards, dones, infos = env.step(actions)
+        returns[idx] += rewards[idx]
+        lengths[idx] += 1
+        for i in np.flatnonzero(live & dones):
+            success[i] = not infos[i]["TimeLimit.truncated"]
+        live &= ~dones
+    return returns, lengths, success
+
+
+def evaluate_policy_batched(predict, n_episodes=1000, grid_size=5, max_steps=100, seed=0, deterministic=True):
+    """
+    Evaluates a policy on `n_episodes` seeded episodes played side by side.
+
+    The same seed always gives the same episode layouts, so results from
+    different checkpoints are directly comparable. Episode i is the first
+    episode of WasteCollectionEnv after reset(seed=seed + i).
+    """
+    env = BatchedWasteCollectionEnv(n_episodes, grid_size=grid_size, max_steps=max_steps)
+    env.seed(seed)
+    obs = env.reset()
+    returns, lengths, success = run_episodes(env, predict, obs, deterministic)
+    return summarize(returns, lengths, success)
+
+
+def _ci95(values):
+    return 1.96 * values.std(ddof=1) / np.sqrt(len(values)) if len(values) > 1 else float("nan")
+
+
+def summarize(returns, lengths, success):
+    """Mean return, success rate (Wilson interval) and steps-to-drop with 95% confidence intervals."""
+    n = len(returns)
+    rate = success.mean()
+    z = 1.96
+    center = (rate + z**2 / (2 * n)) / (1 + z**2 / n)
+    half = z * np.sqrt(rate * (1 - rate) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+    drop_steps = lengths[success]
+    return {
+        "n_episodes": n,
+        "mean_return": float(returns.mean()),
+        "return_ci95": float(_ci95(returns)),
+        "success_rate": float(rate),
+        "success_ci95": (float(center - half), float(center + half)),
+        "mean_steps_to_drop": float(drop_steps.mean()) if len(drop_steps) else float("nan"),
+        "steps_to_drop_ci95": float(_ci95(drop_steps)),
+        "mean_ep_length": float(lengths.mean()),
+        "returns": returns,
+        "lengths": lengths,
+        "success": success,
+    }
+
+
+def format_result(name, result):
+    low, high = result["success_ci95"]
+    return (f"{name}: return {result['mean_return']:.2f} ± {result['return_ci95']:.2f} | "
+            f"success {result['success_rate']:.1%} [{low:.1%}, {high:.1%}] | "
+            f"steps-to-drop {result['mean_steps_to_drop']:.2f} ± {result['steps_to_drop_ci95']:.2f} "
+            f"({result['n_episodes']} episodes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate PPO/DQN checkpoints on many seeded episodes in parallel")
+    parser.add_argument("checkpoints", nargs="+", help="SB3 zips (PPO or DQN), TablePolicy or NumpyPolicy .npz files")
+    parser.add_argument("--episodes", type=int, default=10000)
+    parser.add_argument("--grid-size", type=int, default=5)
+    parser.add_argument("--max-steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from policies.checkpoints import load_policy, read_metadata
+    for path in args.checkpoints:
+        if not path.endswith(".npz") and not read_metadata(path)["compatible"]:
+            print(f"{path}: skipped, trained on a different observation space")
+            continue
+        policy = load_policy(path)
+        start = time.perf_counter()
+        result = evaluate_policy_batched(policy.predict, args.episodes, args.grid_size, args.max_steps, args.seed)
+        print(format_result(path, result) + f" in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# evaluation/tournament.py
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from policies.registry import SEARCH_DIRS, CheckpointRegistry, make_score
+
+
+def evaluate_checkpoint(path, n_episodes, grid_size, max_steps, seed):
+    """Worker: loads one checkpoint and plays the tournament episodes. Returns (score, seconds)."""
+    import torch
+    from evaluation.evaluate import evaluate_policy_batched
+    from policies.checkpoints import load_policy
+
+    torch.set_num_threads(1)  # One core per checkpoint; parallelism comes from the pool
+    start = time.perf_counter()
+    result = evaluate_policy_batched(load_policy(path).predict, n_episodes, grid_size, max_steps, seed)
+    return make_score(result, grid_size, max_steps, seed), time.perf_counter() - start
+
+
+def rank_key(entry):
+    """Highest success rate first, then highest return, then fewest steps to drop."""
+    score = entry["score"]
+    steps = score["mean_steps_to_drop"]
+    return -score["success_rate"], -score["mean_return"], steps if steps is not None else float("inf")
+
+
+def run_tournament(registry=None, n_episodes=1000, grid_size=5, max_steps=100, seed=0, workers=None,
+                   dirs=SEARCH_DIRS, refresh=False, verbose=1):
+    """
+    Evaluates every compatible checkpoint under `dirs` on the same seeded episodes and ranks them.
+
+    Scores are cached in the registry manifest by content hash and eval_config, so only new
+    or changed checkpoints (or all of them with `refresh`) are played, one per pool worker.
+    Returns the ranked entries, each with its "score", and the incompatible ones that were skipped.
+    """
+    registry = registry or CheckpointRegistry()
+    entries = registry.scan(dirs)
+    players = [entry for entry in entries if entry["compatible"] and entry["grid_size"] in (grid_size, None)]
+    skipped = [entry for entry in entries if entry not in players]
+    pending = []
+    for entry in players:
+        entry["score"] = None if refresh else registry.cached_eval(entry["sha256"], n_episodes, grid_size,
+                                                                   max_steps, seed)
+        entry["cached"] = entry["score"] is not None
+        if entry["score"] is None:
+            pending.append(entry)
+    if verbose:
+        print(f"{len(players)} checkpoints, {len(players) - len(pending)} cached, {len(pending)} to evaluate")
+
+    if pending:
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {pool.submit(evaluate_checkpoint, registry.path(entry["sha256"]), n_episodes, grid_size,
+                                   max_steps, seed): entry for entry in pending}
+            for future in as_completed(futures):
+                entry = futures[future]
+                score, seconds = future.result()
+                entry["score"] = registry.record_eval(entry["sha256"], score)
+                if verbose:
+                    print(f"  {entry['paths'][0]}: success {score['success_rate']:.1%} [{seconds:.1f}s]")
+    return sorted(players, key=rank_key), skipped
+
+
+def format_leaderboard(ranked):
+    lines = [f"{'#':>3}  {'success':>8} {'return':>8} {'± ci95':>7} {'to drop':>8}  {'algo':<6} {'timesteps':>9}  "
+             f"{'sha256':<12}  paths"]
+    for rank, entry in enumerate(ranked, 1):
+        score = entry["score"]
+        steps = score["mean_steps_to_drop"]
+        steps = f"{steps:8.2f}" if steps is not None else f"{'-':>8}"
+        timesteps = entry["num_timesteps"] if entry["num_timesteps"] is not None else "-"
+        lines.append(f"{rank:>3}  {score['success_rate']:8.1%} {score['mean_return']:8.2f} {score['return_ci95']:7.2f} "
+                     f"{steps}  {entry['algorithm']:<6} {timesteps!s:>9}  {entry['sha256'][:12]}  "
+                     f"{', '.join(entry['paths'])}{' (cached)' if entry['cached'] else ''}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank every saved checkpoint on the same seeded episodes")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--grid-size", type=int, default=5)
+    parser.add_argument("--max-steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Parallel evaluations (default: all cores)")
+    parser.add_argument("--dirs", nargs="+", default=list(SEARCH_DIRS), help="Directories searched for checkpoints")
+    parser.add_argument("--refresh", action="store_true", help="Evaluate every checkpoint again")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    ranked, skipped = run_tournament(None, args.episodes, args.grid_size, args.max_steps, args.seed, args.workers,
+                                     args.dirs, args.refresh)
+    print(format_leaderboard(ranked))
+    for entry in skipped:
+        reason = "other observation space" if not entry["compatible"] else f"{entry['grid_size']}x{entry['grid_size']} grid"
+        print(f"skipped {', '.join(entry['paths'])}: {reason}")
+    print(f"{len(ranked)} checkpoints ranked on {args.episodes} episodes in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# player.py
+import argparse
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+
+from environment.fast_env import DictObsWrapper, FastWasteCollectionEnv
+
+# What the renderer needs of an env, copied from the simulation after every step
+Frame = namedtuple("Frame", ["grid_size", "agent_pos", "waste_pos", "bin_pos", "carrying_waste", "step"])
+
+DEFAULT_MODELS = {
+    "ppo": "models/numpy/ppo_collection(2).npz",
+    "dqn": "models/numpy/dqn_final_model.npz",
+    "table": "models/oracle/table_policy_5.npz",  # python -m policies.dp_solver --grid-size 5
+}
+CAPTIONS = {
+    "random": "Random Movement Simulation",
+    "ppo": "Trained PPO Waste Collection Simulation",
+    "dqn": "Trained DQN Waste Collection Simulation",
+    "table": "Optimal Table Policy Waste Collection Simulation",
+}
+
+
+class GameState:
+    def __init__(self):
+        self.total_reward = 0.0
+        self.steps = 0
+        self.episode = 1
+        self.ep_start_time = time.time()
+
+
+def log_episode(state):
+    elapsed = time.time() - state.ep_start_time
+    avg_reward = state.total_reward / state.steps if state.steps > 0 else 0
+    print(f"Episode {state.episode} finished:")
+    print(f"   Total Reward: {state.total_reward:.2f}")
+    print(f"   Steps: {state.steps}")
+    print(f"   Average Reward per Step: {avg_reward:.2f}")
+    print(f"   Episode Duration: {elapsed:.2f} seconds")
+    print("-" * 60)
+
+
+class RandomPolicy:
+    """Uniformly random actions (0-3 for movement, 4 for pickup/drop), SB3-style predict."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        return int(self.rng.integers(5)), None
+
+
+def load_player_policy(kind, path=None, seed=None):
+    """random, or a ppo / dqn / table policy from `path` (default: the file in DEFAULT_MODELS)."""
+    if kind == "random":
+        return RandomPolicy(seed)
+    from policies.checkpoints import load_policy
+    return load_policy(path or DEFAULT_MODELS[kind])
+
+
+class Simulation(threading.Thread):
+    """
+    Plays episodes of a FastWasteCollectionEnv with `policy`, at most `rate` steps per second
+    (None: as fast as possible), independently of any rendering. After every step the
+    positions are published in `frame`, which a renderer can read at its own pace.
+
+    Per-episode totals follow GameState; `episodes` keeps the (reward, steps, dropped,
+    seconds) of every finished episode. run() can also be called directly, without a thread.
+    """
+
+    def __init__(self, policy, grid_size=5, max_steps=100, rate=None, n_episodes=None, seed=None,
+                 log_episodes=False):
+        super(Simulation, self).__init__(daemon=True)
+        self.policy = policy
+        self.env = FastWasteCollectionEnv(grid_size=grid_size, max_steps=max_steps)
+        # SB3 models take the Dict observation; NumPy, table and random policies the flat one
+        self.policy_env = DictObsWrapper(self.env) if hasattr(policy, "policy") else self.env
+        self.rate = rate
+        self.n_episodes = n_episodes
+        self.seed = seed
+        self.log_episodes = log_episodes
+        self.state = GameState()
+        self.episodes = []
+        self.total_steps = 0
+        self.frame = None
+        self.stopped = threading.Event()
+        self.start_time = None
+        self.elapsed = 0.0
+
+    def _publish(self):
+        env = self.env
+        # One assignment, so readers always see a whole frame
+        self.frame = Frame(env.grid_size, env.agent_pos, env.waste_pos, env.bin_pos, env.carrying_waste,
+                           self.total_steps)
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        env, policy, state = self.policy_env, self.policy, self.state
+        obs, _ = env.reset(seed=self.seed)
+        self._publish()
+        self.start_time = time.perf_counter()
+        next_step = self.start_time
+        while not self.stopped.is_set():
+            if self.rate:
+                next_step += 1.0 / self.rate
+                delay = next_step - time.perf_counter()
+                if delay > 0:
+                    self.stopped.wait(delay)
+            action, _ = policy.predict(obs, deterministic=True)
+            obs, reward, terminated, truncated, _ = env.step(action)
+            state.total_reward += reward
+            state.steps += 1
+            self.total_steps += 1
+            self._publish()
+
+            if terminated or truncated:
+                if self.log_episodes:
+                    log_episode(state)
+                self.episodes.append((state.total_reward, state.steps, terminated, time.time() - state.ep_start_time))
+                obs, _ = env.reset()
+                state.episode += 1
+                state.total_reward = 0.0
+                state.steps = 0
+                state.ep_start_time = time.time()
+                if self.n_episodes is not None and len(self.episodes) >= self.n_episodes:
+                    break
+        self.elapsed = time.perf_counter() - self.start_time
+
+    def summary(self):
+        """GameState totals aggregated over every finished episode."""
+        if not self.episodes:
+            return "No episode finished"
+        rewards, steps, dropped, durations = (np.array(column) for column in zip(*self.episodes))
+        return (f"{len(rewards)} episodes: Total Reward {rewards.mean():.2f} ± {rewards.std():.2f} | "
+                f"Steps {steps.mean():.2f} | Average Reward per Step {rewards.sum() / steps.sum():.2f} | "
+                f"Success {dropped.mean():.1%} | Episode Duration {1e3 * durations.mean():.3f} ms\n"
+                f"{self.total_steps} steps in {self.elapsed:.2f}s ({self.total_steps / max(self.elapsed, 1e-9):.0f} "
+                f"steps/s)")
+
+
+def play(kind="random", path=None, grid_size=5, max_steps=100, rate=2.0, fps=30, seed=None):
+    """
+    Window mode: the simulation runs in its own thread at `rate` steps per second (0 or None:
+    full speed) while the main thread draws the latest frame `fps` times per second, so frames
+    are skipped rather than the simulation slowed down when it steps faster than the display.
+    """
+    import pygame
+    from environment.rendering import render_waste_env
+
+    pygame.init()
+    window_size = 600
+    screen = pygame.display.set_mode((window_size, window_size), pygame.OPENGL | pygame.DOUBLEBUF)
+    pygame.display.set_caption(CAPTIONS[kind])
+
+    simulation = Simulation(load_player_policy(kind, path, seed), grid_size, max_steps, rate or None, seed=seed,
+                            log_episodes=bool(rate))
+    simulation.start()
+    clock = pygame.time.Clock()
+    drawn = skipped = 0
+    last_step = None
+    running = True
+    while running and simulation.is_alive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        frame = simulation.frame
+        if frame is not None and frame.step != last_step:
+            if last_step is not None:
+                skipped += max(frame.step - last_step - 1, 0)
+            render_waste_env(frame, screen)
+            drawn += 1
+            last_step = frame.step
+        clock.tick(fps)
+
+    simulation.stop()
+    simulation.join()
+    pygame.quit()
+    print(simulation.summary())
+    print(f"{drawn} frames drawn, {skipped} skipped")
+
+
+def run_headless(kind="random", path=None, n_episodes=1000, grid_size=5, max_steps=100, seed=None):
+    """Plays `n_episodes` at full speed without a window and prints the aggregate statistics."""
+    simulation = Simulation(load_player_policy(kind, path, seed), grid_size, max_steps, n_episodes=n_episodes,
+                            seed=seed)
+    simulation.run()
+    print(simulation.summary())
+    return simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch or benchmark a policy in the waste collection env")
+    parser.add_argument("--policy", choices=("random", "ppo", "dqn", "table"), default="random")
+    parser.add_argument("--model", default=None, help="Policy file (default: the usual export of --policy)")
+    parser.add_argument("--rate", type=float, default=2.0, help="Simulation steps per second, 0 for full speed")
+    parser.add_argument("--fps", type=int, default=30, help="Display frames per second")
+    parser.add_argument("--headless", action="store_true", help="No window: play --episodes at full speed")
+    parser.add_argument("--episodes", type=int, default=1000, help="Episodes played in --headless mode")
+    parser.add_argument("--grid-size", type=int, default=5)
+    parser.add_argument("--max-steps", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.headless:
+        run_headless(args.policy, args.model, args.episodes, args.grid_size, args.max_steps, args.seed)
+    else:
+        play(args.policy, args.model, args.grid_size, args.max_steps, args.rate, args.fps, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+# playoracle.py
+from player import play
+
+if __name__ == '__main__':
+    # table written by: python -m policies.dp_solver --grid-size 5
+    play("table", "models/oracle/table_policy_5.npz")
@@ -0,0 +1,181 @@
+# plots/plot_runs.py
+import argparse
+import os
+import time
+import numpy as np
+
+from training.metrics_io import read_metrics
+from training.tfevents import read_scalars
+
+# metric -> (stream, field, sign); SB3 logs the PPO entropy *loss*, i.e. minus the entropy
+METRICS = {
+    "reward": ("episodes", "reward", 1),
+    "cumulative": ("episodes", "reward", 1),
+    "length": ("episodes", "length", 1),
+    "entropy": ("updates", "value", -1),
+    "loss": ("updates", "value", 1),
+}
+LABELS = {
+    "reward": "Episode Reward",
+    "cumulative": "Cumulative Reward",
+    "length": "Episode Length",
+    "entropy": "Policy Entropy",
+    "loss": "Training Loss",
+}
+
+
+def load_series(source, metric, tag=None):
+    """
+    (x, y) for a run. `source` is a log dir with a metrics stream (x = timesteps) or a
+    legacy .npy history (x = index); with `tag`, the log dir's TensorBoard scalar of that
+    name (x = step). Nothing is copied until the data is transformed.
+    """
+    if tag is not None:
+        records = read_scalars(source, tag)
+        x, y = records["step"], records["value"]
+    elif source.endswith(".npy"):
+        y = np.load(source, mmap_mode="r")
+        x = np.arange(len(y))
+    else:
+        stream, field, sign = METRICS[metric]
+        records = read_metrics(source, stream)
+        x = records["timestep"]
+        y = records[field] if sign > 0 else -records[field].astype(np.float64)
+    if metric == "cumulative":
+        y = np.cumsum(y, dtype=np.float64)
+    return x, y
+
+
+def rolling_mean(x, y, window):
+    """Trailing mean over `window` points from a cumulative sum; x is aligned to each window's last point."""
+    if window <= 1 or len(y) < window:
+        return x, y
+    c = np.cumsum(y, dtype=np.float64)
+    means = np.empty(len(y) - window + 1)
+    means[0] = c[window - 1]
+    means[1:] = c[window:] - c[:-window]
+    return x[window - 1:], means / window
+
+
+def minmax_downsample(x, y, n_out):
+    """Keeps the min and max of each of n_out // 2 equal buckets, in index order, so spikes survive."""
+    n = len(y)
+    n_buckets = n_out // 2
+    if n <= n_out or n_buckets < 1:
+        return np.asarray(x), np.asarray(y)
+    size = n // n_buckets
+    body = np.asarray(y[:n_buckets * size]).reshape(n_buckets, size)
+    starts = np.arange(n_buckets) * size
+    lo = starts + body.argmin(axis=1)
+    hi = starts + body.argmax(axis=1)
+    idx = np.sort(np.stack([lo, hi], axis=1), axis=1).ravel()
+    idx = np.concatenate([idx, [n - 1]])  # Leftover tail is represented by its last point
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: first and last point plus, per bucket, the point
+    forming the largest triangle with the previously kept point and the next bucket's mean.
+    Buckets are processed in order but each one is a single vectorized area computation.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.asarray(x), np.asarray(y)
+    xf = np.asarray(x, dtype=np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    # Means of every bucket, used as the third triangle vertex of the bucket before it
+    sums_x = np.add.reduceat(xf[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(yf[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, xf[-1])
+    mean_y = np.append(sums_y / counts, yf[-1])
+
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = xf[prev], yf[prev]
+        area = np.abs((ax - mean_x[b + 1]) * (yf[lo:hi] - ay) - (ax - xf[lo:hi]) * (mean_y[b + 1] - ay))
+        prev = lo + int(area.argmax())
+        idx[b + 1] = prev
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+DOWNSAMPLERS = {"minmax": minmax_downsample, "lttb": lttb_downsample}
+
+
+def parse_run(spec):
+    """'LABEL=path' or just 'path' (labelled by the path)."""
+    if "=" in spec:
+        label, path = spec.split("=", 1)
+        return label, path
+    return spec.rstrip("/"), spec
+
+
+def plot_runs(runs, metric="reward", window=100, method="lttb", points=2000, raw=False, out=None, show=False,
+              tag=None):
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    downsample = DOWNSAMPLERS[method]
+    plt.figure(figsize=(10, 5))
+    for label, path in runs:
+        x, y = load_series(path, metric, tag)
+        if len(y) == 0:
+            print(f"{path}: no {tag or metric} values logged, skipped")
+            continue
+        if raw:
+            line, = plt.plot(*minmax_downsample(x, y, points), alpha=0.25, linewidth=0.8)
+            color = line.get_color()
+        else:
+            color = None
+        smooth = metric != "cumulative"
+        xs, ys = rolling_mean(x, y, window if smooth else 1)
+        plt.plot(*downsample(xs, ys, points), label=label, color=color)
+
+    plt.xlabel("Timesteps")
+    ylabel = tag or LABELS[metric]
+    plt.ylabel(ylabel if metric == "cumulative" or window <= 1 else f"{ylabel} (rolling mean, {window})")
+    plt.title(f"{ylabel} Over Training")
+    plt.legend()
+    plt.grid(True)
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        plt.savefig(out)
+        print(f"Saved {out}")
+    if show:
+        plt.show()
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlay training histories of several runs on one chart")
+    parser.add_argument("runs", nargs="+", help="Log dirs with a metrics stream or legacy .npy histories, "
+                                                "optionally LABEL=path (e.g. PPO=logs DQN=dqn_logs)")
+    parser.add_argument("--metric", choices=sorted(METRICS), default="reward")
+    parser.add_argument("--window", type=int, default=100, help="Rolling-mean window in points (1 = raw)")
+    parser.add_argument("--tag", default=None, help="Plot this TensorBoard scalar of each log dir instead of --metric "
+                                                    "(e.g. rollout/ep_rew_mean)")
+    parser.add_argument("--method", choices=sorted(DOWNSAMPLERS), default="lttb")
+    parser.add_argument("--points", type=int, default=2000, help="Points drawn per run")
+    parser.add_argument("--raw", action="store_true", help="Also draw the min/max envelope of the raw values")
+    parser.add_argument("--out", default=None, help="Image path (default plots/<metric>.png)")
+    parser.add_argument("--show", action="store_true", help="Open a window instead of only saving")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    name = args.tag.replace("/", "_") if args.tag else args.metric
+    out = args.out or os.path.join("plots", f"{name}.png")
+    plot_runs([parse_run(spec) for spec in args.runs], args.metric, args.window, args.method, args.points,
+              args.raw, out, args.show, args.tag)
+    print(f"Plotted {len(args.runs)} run(s) in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# policies/checkpoints.py
+import json
+import re
+import zipfile
+
+
+def read_metadata(path):
+    """Reads algorithm, timesteps and observation type from an SB3 zip without importing torch."""
+    with zipfile.ZipFile(path) as archive:
+        data = json.loads(archive.read("data"))
+    if "exploration_rate" in data:
+        algorithm = "dqn"
+    elif "n_steps" in data:
+        algorithm = "ppo"
+    else:
+        algorithm = "unknown"
+    # Only checkpoints trained on the agent/waste/bin/carrying Dict match WasteCollectionEnv
+    spaces = data.get("observation_space", {}).get("spaces", "")
+    agent_box = re.search(r"'agent': Box\(0, (\d+), \(2,\)", spaces)
+    compatible = agent_box is not None and all(
+        re.search(pattern, spaces) for pattern in (r"'waste': Box\(0, \d+, \(2,\)", r"'bin': Box\(0, \d+, \(2,\)",
+                                                   r"'carrying': Discrete\(2\)")
+    )
+    return {
+        "algorithm": algorithm,
+        "num_timesteps": int(data.get("num_timesteps", 0)),
+        "gamma": float(data.get("gamma", 0.99)),
+        "compatible": compatible,
+        "grid_size": int(agent_box.group(1)) + 1 if compatible else None,
+    }
+
+
+def load_model(path):
+    """Loads a PPO or DQN checkpoint, picking the class from the zip's metadata."""
+    from stable_baselines3 import DQN, PPO
+
+    algorithm = read_metadata(path)["algorithm"]
+    if algorithm == "dqn":
+        return DQN.load(path)
+    if algorithm == "ppo":
+        return PPO.load(path)
+    raise ValueError(f"Cannot tell which algorithm saved {path}")
+
+
+def load_policy(path):
+    """Loads anything with an SB3-style predict(): PPO/DQN zips, NumpyPolicy or TablePolicy .npz files."""
+    if path.endswith(".npz"):
+        import numpy as np
+        from policies.numpy_policy import NumpyPolicy
+        from policies.table_policy import TablePolicy
+        with np.load(path) as data:
+            is_numpy_policy = "obs_keys" in data
+        return NumpyPolicy.load(path) if is_numpy_policy else TablePolicy.load(path)
+    return load_model(path)
@@ -0,0 +1,102 @@
+# policies/export_numpy.py
+import argparse
+import os
+import numpy as np
+from gymnasium import spaces
+
+from policies.checkpoints import load_model, read_metadata
+from policies.numpy_policy import NumpyPolicy
+
+
+def _sequential_layers(modules):
+    """(weight, bias, activation) triples from a Linear/activation nn.Sequential."""
+    import torch.nn as nn
+
+    layers = []
+    for module in modules:
+        if isinstance(module, nn.Linear):
+            layers.append([module.weight.detach().cpu().numpy(), module.bias.detach().cpu().numpy(), "identity"])
+        elif isinstance(module, nn.Tanh):
+            layers[-1][2] = "tanh"
+        elif isinstance(module, nn.ReLU):
+            layers[-1][2] = "relu"
+        else:
+            raise ValueError(f"Unsupported layer {module}")
+    return layers
+
+
+def policy_arrays(model, algorithm):
+    """The action path of a live PPO/DQN MultiInputPolicy model, as the arrays NumpyPolicy loads."""
+    policy = model.policy
+    if algorithm == "ppo":
+        layers = _sequential_layers(policy.mlp_extractor.policy_net) + _sequential_layers([policy.action_net])
+    else:
+        layers = _sequential_layers(policy.q_net.q_net)
+
+    obs_space = policy.observation_space
+    obs_keys = list(obs_space.spaces.keys())
+    discrete_sizes = [space.n if isinstance(space, spaces.Discrete) else 0 for space in obs_space.spaces.values()]
+    arrays = {f"weight_{i}": w for i, (w, _, _) in enumerate(layers)}
+    arrays.update({f"bias_{i}": b for i, (_, b, _) in enumerate(layers)})
+    return dict(
+        obs_keys=np.array(obs_keys),
+        discrete_sizes=np.array(discrete_sizes),
+        activations=np.array([activation for _, _, activation in layers]),
+        algorithm=np.array(algorithm),
+        **arrays
+    )
+
+
+def export(checkpoint, out_path):
+    """Writes the action path of a PPO/DQN MultiInputPolicy checkpoint to a NumPy .npz."""
+    algorithm = read_metadata(checkpoint)["algorithm"]
+    model = load_model(checkpoint)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    np.savez(out_path, **policy_arrays(model, algorithm))
+    return model
+
+
+def parity_corpus(grid_size=5, n_random=20000, seed=0):
+    """Every (agent, waste, bin, carrying) state of the grid plus random in-range observations."""
+    cells = np.arange(grid_size * grid_size)
+    agent, waste, bin_cells = [c.ravel() for c in np.meshgrid(cells, cells, cells, indexing="ij")]
+    carrying = np.concatenate([np.zeros(len(agent), dtype=np.int64), np.ones(len(agent), dtype=np.int64)])
+    agent, waste, bin_cells = np.tile(agent, 2), np.tile(waste, 2), np.tile(bin_cells, 2)
+
+    def xy(c):
+        return np.stack([c % grid_size, c // grid_size], axis=1).astype(np.int32)
+
+    waste_xy = np.where(carrying[:, None] == 1, -1, xy(waste)).astype(np.int32)
+    rng = np.random.default_rng(seed)
+    return {
+        "agent": np.concatenate([xy(agent), rng.integers(-1, grid_size, (n_random, 2), dtype=np.int32)]),
+        "waste": np.concatenate([waste_xy, rng.integers(-1, grid_size, (n_random, 2), dtype=np.int32)]),
+        "bin": np.concatenate([xy(bin_cells), rng.integers(-1, grid_size, (n_random, 2), dtype=np.int32)]),
+        "carrying": np.concatenate([carrying, rng.integers(0, 2, n_random)]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export PPO/DQN checkpoints to a torch-free NumPy policy")
+    parser.add_argument("checkpoints", nargs="+")
+    parser.add_argument("--out-dir", default="models/numpy")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the action comparison against SB3")
+    args = parser.parse_args()
+
+    for checkpoint in args.checkpoints:
+        name = os.path.splitext(os.path.basename(checkpoint))[0]
+        out_path = os.path.join(args.out_dir, f"{name}.npz")
+        model = export(checkpoint, out_path)
+        print(f"Exported {checkpoint} -> {out_path}")
+        if not args.no_verify:
+            corpus = parity_corpus(read_metadata(checkpoint)["grid_size"] or 5)
+            expected, _ = model.predict(corpus, deterministic=True)
+            actual, _ = NumpyPolicy.load(out_path).predict(corpus)
+            mismatches = int((expected != actual).sum())
+            print(f"   {len(actual)} observations, {mismatches} action mismatches vs SB3")
+            if mismatches:
+                raise SystemExit(f"{checkpoint}: NumPy export does not match SB3")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# policies/numpy_policy.py
+import numpy as np
+
+from environment.fast_env import OBS_AGENT, OBS_BIN, OBS_CARRYING, OBS_WASTE
+
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "identity": lambda x: x,
+}
+
+
+class NumpyPolicy:
+    """
+    PPO/DQN action selection with NumPy only.
+
+    Loads the .npz written by policies/export_numpy.py: the Dict observation
+    keys in the order SB3's CombinedExtractor concatenates them (Box values
+    cast to float32, Discrete values one-hot encoded), followed by the
+    action path of the network (PPO: policy_net + action_net, DQN: q_net).
+    The action is the argmax of the final layer, which is what SB3's
+    deterministic predict returns for a Discrete action space. PPO exports
+    can also sample from the action logits like SB3's stochastic predict;
+    DQN exports hold Q-values and only act deterministically.
+    """
+
+    def __init__(self, obs_keys, discrete_sizes, weights, biases, activations, algorithm=""):
+        self.obs_keys = list(obs_keys)
+        self.discrete_sizes = [int(n) for n in discrete_sizes]
+        self.weights = [np.ascontiguousarray(w.T, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = [ACTIVATIONS[name] for name in activations]
+        self.algorithm = algorithm
+        self.can_sample = algorithm == "ppo"
+        self.rng = np.random.default_rng()
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_arrays(np.load(path))
+
+    @classmethod
+    def from_arrays(cls, data):
+        """From the arrays of an export (an opened .npz or export_numpy.policy_arrays())."""
+        n_layers = len(data["activations"])
+        return cls(
+            [str(key) for key in data["obs_keys"]],
+            data["discrete_sizes"],
+            [data[f"weight_{i}"] for i in range(n_layers)],
+            [data[f"bias_{i}"] for i in range(n_layers)],
+            [str(name) for name in data["activations"]],
+            str(data["algorithm"])
+        )
+
+    def features(self, observation):
+        """Flattens batched Dict observations the way CombinedExtractor does."""
+        parts = []
+        for key, n in zip(self.obs_keys, self.discrete_sizes):
+            value = np.asarray(observation[key])
+            if n:
+                value = value.reshape(-1).astype(np.int64)
+                one_hot = np.zeros((len(value), n), dtype=np.float32)
+                one_hot[np.arange(len(value)), value] = 1.0
+                parts.append(one_hot)
+            else:
+                parts.append(value.reshape(-1, value.shape[-1]).astype(np.float32))
+        return np.concatenate(parts, axis=1)
+
+    def forward(self, features):
+        x = features
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            x = activation(x @ weight + bias)
+        return x
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        SB3-style predict for Dict observations (WasteCollectionEnv) or flat ones
+        (FastWasteCollectionEnv), single or batched. Returns (actions, None).
+        """
+        if not isinstance(observation, dict):
+            flat = np.asarray(observation)
+            observation = {"agent": flat[..., OBS_AGENT], "waste": flat[..., OBS_WASTE],
+                           "bin": flat[..., OBS_BIN], "carrying": flat[..., OBS_CARRYING]}
+        single = np.asarray(observation["agent"]).ndim == 1
+        logits = self.forward(self.features(observation))
+        if not deterministic:
+            if not self.can_sample:
+                raise ValueError(f"A {self.algorithm or 'non-PPO'} export only acts deterministically")
+            # Gumbel-max: the argmax of logits plus Gumbel noise is a sample of softmax(logits)
+            logits = logits - np.log(-np.log(self.rng.random(logits.shape, dtype=np.float32)))
+        actions = logits.argmax(axis=1)
+        return (actions[0] if single else actions), None
@@ -0,0 +1,334 @@
+# policies/registry.py
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from policies.checkpoints import load_policy, read_metadata
+
+MANIFEST = "models/manifest.json"
+SEARCH_DIRS = ("models", "old models")
+EXTENSIONS = (".zip", ".npz")
+# Part of every eval_config key. Bump it whenever env reset, placement, dynamics, rewards or the
+# evaluation metrics change, so scores of the old episodes are no longer served from the manifest
+EVAL_VERSION = 1
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe(path):
+    """Metadata of a checkpoint file, read without deserializing the policy; None if it holds no policy."""
+    if path.endswith(".npz"):
+        import numpy as np
+        with np.load(path) as data:
+            if "obs_keys" in data:
+                return {"format": "numpy", "algorithm": str(data["algorithm"]), "num_timesteps": None,
+                        "compatible": True, "grid_size": None}
+            if "free_actions" in data:
+                return {"format": "table", "algorithm": "table", "num_timesteps": None,
+                        "compatible": True, "grid_size": int(data["grid_size"])}
+            return None  # e.g. EvalCallback's evaluations.npz
+    metadata = read_metadata(path)
+    return {"format": "sb3", "algorithm": metadata["algorithm"], "num_timesteps": metadata["num_timesteps"],
+            "compatible": metadata["compatible"], "grid_size": metadata["grid_size"]}
+
+
+def policy_nbytes(policy):
+    """Approximate memory held by a loaded policy: SB3 weights and optimizer state, or NumPy arrays."""
+    import numpy as np
+    if hasattr(policy, "policy"):
+        tensors = list(policy.policy.state_dict().values())
+        optimizer = getattr(policy.policy, "optimizer", None)
+        if optimizer is not None:
+            tensors += [value for state in optimizer.state.values() for value in state.values()
+                        if hasattr(value, "element_size")]
+        return sum(t.numel() * t.element_size() for t in tensors)
+    total = 0
+    for value in vars(policy).values():
+        for array in value if isinstance(value, list) else [value]:
+            if isinstance(array, np.ndarray):
+                total += array.nbytes
+    return total
+
+
+class PolicyCache:
+    """
+    LRU cache of deserialized policies, bounded by their approximate memory.
+
+    get() returns the cached policy or calls `loader` and caches the result;
+    least recently used policies are dropped once the total exceeds
+    `max_bytes` (the most recent one is always kept).
+    """
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (policy, nbytes)
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, loader):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            policy = loader()
+            size = policy_nbytes(policy)
+            self._entries[key] = (policy, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+            return policy
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+class CheckpointRegistry:
+    """
+    Index of checkpoint files by SHA-256 of their content, stored in models/manifest.json.
+
+    Each entry records the files holding that content (copies share one entry), the
+    format (sb3 zip, NumPy export or lookup table), algorithm, grid size, training
+    timesteps and, once evaluated, its scores per eval_config ("eval" holds the latest).
+    Within a process, files are only re-hashed when their size or modification time changes. Policies are loaded on
+    first use and kept in a PolicyCache, so switching back to a model costs a dict
+    lookup. Keys can be a hash prefix, a file path or a file name without extension.
+    """
+
+    def __init__(self, root=".", manifest=MANIFEST, cache=None):
+        self.root = root
+        self.manifest_path = os.path.join(root, manifest)
+        self.cache = cache if cache is not None else PolicyCache()
+        self.checkpoints = {}  # sha256 -> metadata
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.checkpoints = json.load(f)["checkpoints"]
+        # path -> {"size", "mtime", "sha256"}; stats are per process, so listed files are hashed once
+        self.files = {path: {"size": None, "mtime": None, "sha256": digest}
+                      for digest, entry in self.checkpoints.items() for path in entry["paths"]}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "checkpoints": self.checkpoints}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _stat(self, path):
+        stat = os.stat(os.path.join(self.root, path))
+        return stat.st_size, stat.st_mtime
+
+    def _index_file(self, path):
+        """
+        sha256 of `path` (relative to root), hashed again only if its size or mtime changed.
+        Returns None for files that hold no policy.
+        """
+        size, mtime = self._stat(path)
+        known = self.files.get(path)
+        if known and known["size"] == size and known["mtime"] == mtime:
+            return known["sha256"]
+        full_path = os.path.join(self.root, path)
+        digest = file_hash(full_path)
+        if known and known["sha256"] != digest:
+            self._unlink(path)
+        entry = self.checkpoints.get(digest)
+        if entry is None:
+            metadata = describe(full_path)
+            if metadata is None:
+                self.files[path] = {"size": size, "mtime": mtime, "sha256": None}
+                return None
+            entry = self.checkpoints[digest] = dict(metadata, bytes=size, paths=[], eval=None)
+        entry["paths"] = sorted(set(entry["paths"]) | {path})
+        self.files[path] = {"size": size, "mtime": mtime, "sha256": digest}
+        return digest
+
+    def _unlink(self, path):
+        known = self.files.pop(path, None)
+        if known and known["sha256"] in self.checkpoints:
+            entry = self.checkpoints[known["sha256"]]
+            entry["paths"] = [p for p in entry["paths"] if p != path]
+            if not entry["paths"]:
+                del self.checkpoints[known["sha256"]]
+
+    def scan(self, dirs=SEARCH_DIRS):
+        """Indexes every checkpoint under `dirs`, forgets deleted files and saves the manifest."""
+        found = set()
+        for directory in dirs:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, directory)):
+                for name in filenames:
+                    if name.endswith(EXTENSIONS):
+                        found.add(os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/"))
+        for path in set(self.files) - found:
+            self._unlink(path)
+        for path in sorted(found):
+            self._index_file(path)
+        self.save()
+        return self.entries()
+
+    def resolve(self, key):
+        """sha256 of the checkpoint named by a hash prefix, file path or file name."""
+        if key in self.checkpoints:
+            return key
+        if os.path.isfile(key):
+            digest = self._index_file(os.path.relpath(key, self.root).replace(os.sep, "/"))
+            if digest is None:
+                raise KeyError(f"{key!r} holds no policy")
+            return digest
+        matches = [digest for digest in self.checkpoints if len(key) >= 6 and digest.startswith(key)]
+        if not matches:
+            matches = [digest for digest, entry in self.checkpoints.items()
+                       if any(os.path.splitext(os.path.basename(p))[0] == key for p in entry["paths"])]
+        if len(matches) != 1:
+            raise KeyError(f"{key!r} matches {len(matches)} checkpoints")
+        return matches[0]
+
+    def entries(self, algorithm=None, grid_size=None, compatible=None):
+        """Manifest entries (with their sha256) matching the filters, best eval score first."""
+        selected = []
+        for digest, entry in self.checkpoints.items():
+            if algorithm is not None and entry["algorithm"] != algorithm:
+                continue
+            if grid_size is not None and entry["grid_size"] not in (grid_size, None):
+                continue
+            if compatible is not None and entry["compatible"] != compatible:
+                continue
+            selected.append(dict(entry, sha256=digest))
+        return sorted(selected, key=lambda e: (e["eval"] is None, -(e["eval"] or {}).get("mean_return", 0),
+                                               e["paths"][0]))
+
+    def path(self, key):
+        """Path of a file holding the checkpoint; re-indexed first if it changed on disk."""
+        digest = self.resolve(key)
+        for path in self.checkpoints[digest]["paths"]:
+            if os.path.exists(os.path.join(self.root, path)) and self._index_file(path) == digest:
+                return os.path.join(self.root, path)
+        raise FileNotFoundError(f"No file with content {digest[:12]} is left")
+
+    def get(self, key):
+        """The loaded policy (anything with an SB3-style predict), from the cache when possible."""
+        digest = self.resolve(key)
+        return self.cache.get(digest, lambda: load_policy(self.path(digest)))
+
+    def evaluate(self, key, n_episodes=1000, grid_size=None, max_steps=100, seed=0, refresh=False):
+        """
+        Evaluates the checkpoint on seeded episodes and stores the score in the manifest.
+        Scores are kept per eval_config, so a checkpoint already evaluated on the same
+        episodes gets its stored score back unless `refresh`.
+        """
+        from evaluation.evaluate import evaluate_policy_batched
+
+        digest = self.resolve(key)
+        entry = self.checkpoints[digest]
+        grid_size = grid_size or entry["grid_size"] or 5
+        score = self.cached_eval(digest, n_episodes, grid_size, max_steps, seed)
+        if score is None or refresh:
+            result = evaluate_policy_batched(self.get(digest).predict, n_episodes, grid_size, max_steps, seed)
+            score = self.record_eval(digest, make_score(result, grid_size, max_steps, seed))
+        return score
+
+    def cached_eval(self, key, n_episodes=1000, grid_size=5, max_steps=100, seed=0):
+        """Stored score of the checkpoint on these episodes, or None."""
+        entry = self.checkpoints[self.resolve(key)]
+        return (entry.get("evals") or {}).get(eval_config(n_episodes, grid_size, max_steps, seed))
+
+    def record_eval(self, key, score):
+        """Stores a make_score() result as the checkpoint's latest score and saves the manifest."""
+        entry = self.checkpoints[self.resolve(key)]
+        config = eval_config(score["n_episodes"], score["grid_size"], score["max_steps"], score["seed"])
+        entry.setdefault("evals", {})[config] = score
+        entry["eval"] = score
+        self.save()
+        return score
+
+
+def eval_config(n_episodes, grid_size, max_steps, seed):
+    """Key of an evaluation setting: the same key means the same seeded episodes, played by the same env code."""
+    return f"v{EVAL_VERSION}-grid{grid_size}-steps{max_steps}-episodes{n_episodes}-seed{seed}"
+
+
+def make_score(result, grid_size, max_steps, seed):
+    """Manifest record of an evaluate_policy_batched result."""
+    steps_to_drop = result["mean_steps_to_drop"]
+    return {
+        "mean_return": round(result["mean_return"], 4),
+        "return_ci95": round(result["return_ci95"], 4),
+        "success_rate": result["success_rate"],
+        "mean_steps_to_drop": None if steps_to_drop != steps_to_drop else round(steps_to_drop, 4),  # NaN: no drops
+        "n_episodes": result["n_episodes"],
+        "grid_size": grid_size,
+        "max_steps": max_steps,
+        "seed": seed,
+    }
+
+
+_default_registry = None
+
+
+def get_registry():
+    """Process-wide registry, so every caller in a long-lived process shares one policy cache."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = CheckpointRegistry()
+    return _default_registry
+
+
+def format_entry(entry):
+    score = entry["eval"]
+    score = f"{score['mean_return']:8.2f} {score['success_rate']:8.1%}" if score else f"{'-':>8} {'-':>8}"
+    steps = entry["num_timesteps"] if entry["num_timesteps"] is not None else "-"
+    grid = entry["grid_size"] or "-"
+    return (f"{entry['sha256'][:12]}  {entry['format']:<6} {entry['algorithm']:<6} {grid!s:>4} {steps!s:>9} "
+            f"{score}  {', '.join(entry['paths'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed index of saved checkpoints")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("scan", help="Index new or changed checkpoint files")
+    list_parser = subparsers.add_parser("list", help="List checkpoints, best evaluated first")
+    list_parser.add_argument("--algorithm", default=None)
+    list_parser.add_argument("--grid-size", type=int, default=None)
+    eval_parser = subparsers.add_parser("evaluate", help="Evaluate checkpoints and record their score")
+    eval_parser.add_argument("keys", nargs="*", help="Hash prefixes, paths or names (default: every compatible one)")
+    eval_parser.add_argument("--episodes", type=int, default=1000)
+    eval_parser.add_argument("--max-steps", type=int, default=100)
+    eval_parser.add_argument("--seed", type=int, default=0)
+    eval_parser.add_argument("--refresh", action="store_true", help="Evaluate again even if a score is stored")
+    args = parser.parse_args()
+
+    registry = CheckpointRegistry()
+    if args.command == "scan":
+        registry.scan()
+    elif args.command == "evaluate":
+        keys = args.keys or [entry["sha256"] for entry in registry.entries(compatible=True)]
+        for key in keys:
+            registry.evaluate(key, args.episodes, max_steps=args.max_steps, seed=args.seed, refresh=args.refresh)
+    entries = registry.entries(getattr(args, "algorithm", None), getattr(args, "grid_size", None))
+    print(f"{'sha256':<12}  {'format':<6} {'algo':<6} {'grid':>4} {'timesteps':>9} {'return':>8} {'success':>8}  paths")
+    for entry in entries:
+        print(format_entry(entry))
+
+
+if __name__ == "__main__":
+    main()
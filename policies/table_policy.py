@@ -0,0 +1,64 @@
+# policies/table_policy.py
+import numpy as np
+
+
+class TablePolicy:
+    """
+    Lookup-table policy for WasteCollectionEnv, indexed by cell (y * grid_size + x).
+
+    free_actions[agent, waste, bin] is the action while not carrying and
+    carrying_actions[agent, bin] the action while carrying. Only NumPy is
+    needed to load and run it. There is one action per state, so it only acts
+    deterministically.
+    """
+
+    can_sample = False
+
+    def __init__(self, free_actions, carrying_actions, grid_size):
+        self.free_actions = np.asarray(free_actions, dtype=np.uint8)
+        self.carrying_actions = np.asarray(carrying_actions, dtype=np.uint8)
+        self.grid_size = grid_size
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["free_actions"], data["carrying_actions"], int(data["grid_size"]))
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            free_actions=self.free_actions,
+            carrying_actions=self.carrying_actions,
+            grid_size=self.grid_size
+        )
+
+    def act_cells(self, agent, waste, bin, carrying):
+        """Single-state lookup on cell indices, e.g. straight from FastWasteCollectionEnv.state."""
+        if carrying:
+            return int(self.carrying_actions[agent, bin])
+        return int(self.free_actions[agent, waste, bin])
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        SB3-style predict for Dict observations (WasteCollectionEnv) or flat ones
+        (FastWasteCollectionEnv), single or batched. Returns (actions, None).
+        """
+        if not deterministic:
+            raise ValueError("A table policy only acts deterministically")
+        g = self.grid_size
+        if isinstance(observation, dict):
+            agent = np.asarray(observation["agent"])
+            waste = np.asarray(observation["waste"])
+            bin_pos = np.asarray(observation["bin"])
+            carrying = np.asarray(observation["carrying"])
+        else:
+            flat = np.asarray(observation)
+            agent, waste, bin_pos, carrying = flat[..., 0:2], flat[..., 2:4], flat[..., 4:6], flat[..., 6]
+        carrying = carrying.reshape(agent.shape[:-1]).astype(bool)
+
+        a = agent[..., 1] * g + agent[..., 0]
+        b = bin_pos[..., 1] * g + bin_pos[..., 0]
+        # Waste is (-1, -1) while carrying; clamp so the unused lookup stays in range
+        w = np.maximum(waste[..., 1], 0) * g + np.maximum(waste[..., 0], 0)
+        actions = np.where(carrying, self.carrying_actions[a, b], self.free_actions[a, w, b])
+        return actions.astype(np.int64), None
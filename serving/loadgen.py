@@ -0,0 +1,94 @@
+# serving/loadgen.py
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+
+
+def random_rows(rng, n, grid_size=5):
+    """n random flat observations: agent, waste (-1 while carrying), bin and carrying."""
+    rows = rng.integers(0, grid_size, size=(n, 7))
+    rows[:, 6] = rng.integers(0, 2, size=n)
+    rows[rows[:, 6] == 1, 2:4] = -1
+    return rows
+
+
+async def _connect(host, port, unix_path):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _client(host, port, unix_path, duration, vehicles, grid_size, seed, latencies):
+    """Closed loop: one request in flight, the next one sent as soon as the reply arrives."""
+    reader, writer = await _connect(host, port, unix_path)
+    rng = np.random.default_rng(seed)
+    pool = [json.dumps(random_rows(rng, vehicles, grid_size).tolist()) for _ in range(64)]
+    stop = time.perf_counter() + duration
+    request_id = 0
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        writer.write(f'{{"id": {request_id}, "obs": {pool[request_id % len(pool)]}}}\n'.encode())
+        reply = json.loads(await reader.readline())
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        latencies.append(time.perf_counter() - start)
+        request_id += 1
+    writer.close()
+
+
+async def server_metrics(host="127.0.0.1", port=8765, unix_path=None):
+    reader, writer = await _connect(host, port, unix_path)
+    writer.write(b'{"op": "metrics"}\n')
+    metrics = json.loads(await reader.readline())
+    writer.close()
+    return metrics
+
+
+async def run_load(host="127.0.0.1", port=8765, unix_path=None, clients=64, duration=10.0, vehicles=1,
+                   grid_size=5, seed=0):
+    """Runs `clients` concurrent closed-loop clients; returns client-side latency and throughput."""
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, unix_path, duration, vehicles, grid_size, seed + i, latencies) for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies)
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {
+        "requests": len(latencies),
+        "requests_per_sec": len(latencies) / elapsed,
+        "observations_per_sec": vehicles * len(latencies) / elapsed,
+        "p50_ms": 1e3 * p50,
+        "p99_ms": 1e3 * p99,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for serving.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, metavar="PATH")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent connections, one request in flight each")
+    parser.add_argument("--vehicles", type=int, default=1, help="Observations per request")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--grid-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run():
+        result = await run_load(args.host, args.port, args.unix, args.clients, args.duration, args.vehicles,
+                                args.grid_size, args.seed)
+        return result, await server_metrics(args.host, args.port, args.unix)
+
+    client, server = asyncio.run(run())
+    print(f"client: {client['requests']} requests, {client['requests_per_sec']:.0f} req/s, "
+          f"{client['observations_per_sec']:.0f} obs/s | p50 {client['p50_ms']:.2f} ms, p99 {client['p99_ms']:.2f} ms")
+    print(f"server: p50 {server['p50_ms']:.2f} ms, p99 {server['p99_ms']:.2f} ms | mean batch {server['mean_batch']:.1f} "
+          f"over {server['batches']} batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# serving/server.py
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+
+from environment.fast_env import OBS_AGENT, OBS_BIN, OBS_CARRYING, OBS_WASTE
+
+OBS_SIZE = 7
+
+
+def rows_to_obs(rows):
+    """(n, 7) flat observations (FastWasteCollectionEnv layout) -> batched WasteCollectionEnv Dict observation."""
+    return {
+        "agent": rows[:, OBS_AGENT].astype(np.int32),
+        "waste": rows[:, OBS_WASTE].astype(np.int32),
+        "bin": rows[:, OBS_BIN].astype(np.int32),
+        "carrying": rows[:, OBS_CARRYING].astype(np.int64),
+    }
+
+
+def check_rows(rows, grid_size):
+    """ValueError unless every row is an observation of a grid_size grid (waste -1 while carrying)."""
+    if len(rows) == 0:
+        raise ValueError("No observations")
+
+    def inside(columns):
+        return ((rows[:, columns] >= 0) & (rows[:, columns] < grid_size)).all(axis=1)
+
+    waste_hidden = (rows[:, OBS_WASTE] == -1).all(axis=1)
+    valid = inside(OBS_AGENT) & inside(OBS_BIN) & (inside(OBS_WASTE) | waste_hidden)
+    valid &= (rows[:, OBS_CARRYING] == 0) | (rows[:, OBS_CARRYING] == 1)
+    if not valid.all():
+        bad = int(np.flatnonzero(~valid)[0])
+        raise ValueError(f"Observation {bad} is out of range for a {grid_size}x{grid_size} grid: {rows[bad].tolist()}")
+
+
+class LatencyStats:
+    """
+    Request latencies in a ring buffer of the last `window` requests, plus counters
+    for throughput and batch sizes since the server started.
+    """
+
+    def __init__(self, window=10000):
+        self.latencies = np.zeros(window)
+        self.count = 0
+        self.observations = 0
+        self.batches = 0
+        self.start_time = time.perf_counter()
+
+    def record(self, latency, n_obs):
+        self.latencies[self.count % len(self.latencies)] = latency
+        self.count += 1
+        self.observations += n_obs
+
+    def snapshot(self):
+        recent = self.latencies[:min(self.count, len(self.latencies))]
+        elapsed = time.perf_counter() - self.start_time
+        p50, p99 = np.percentile(recent, [50, 99]) if len(recent) else (float("nan"), float("nan"))
+        return {
+            "requests": self.count,
+            "observations": self.observations,
+            "batches": self.batches,
+            "mean_batch": self.observations / max(self.batches, 1),
+            "requests_per_sec": self.count / elapsed,
+            "observations_per_sec": self.observations / elapsed,
+            "p50_ms": 1e3 * float(p50),
+            "p99_ms": 1e3 * float(p99),
+        }
+
+
+class MicroBatcher:
+    """
+    Collects observations from concurrent requests and answers them with one batched predict.
+
+    A batch is started by the first waiting request and closed after `max_delay`
+    seconds or once it holds `max_batch` observations, whichever comes first.
+    The forward pass runs on the event loop, so while it runs new requests queue
+    up for the next batch.
+    """
+
+    def __init__(self, predict, max_batch=256, max_delay=0.002, stats=None):
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = stats
+        self._pending = deque()  # (rows, future) in arrival order
+        self._size = 0
+        self._started = asyncio.Event()
+        self._full = asyncio.Event()
+
+    async def submit(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((rows, future))
+        self._size += len(rows)
+        self._started.set()
+        if self._size >= self.max_batch:
+            self._full.set()
+        return await future
+
+    def _take_batch(self):
+        pending, size = [], 0
+        while self._pending and (not pending or size + len(self._pending[0][0]) <= self.max_batch):
+            rows, future = self._pending.popleft()
+            pending.append((rows, future))
+            size += len(rows)
+        self._size -= size
+        if not self._pending:
+            self._started.clear()
+        if self._size < self.max_batch:
+            self._full.clear()
+        return pending
+
+    async def run(self):
+        while True:
+            await self._started.wait()
+            if not self._full.is_set():
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            pending = self._take_batch()
+            rows = np.concatenate([rows for rows, _ in pending])
+            try:
+                actions, _ = self.predict(rows_to_obs(rows), deterministic=True)
+            except Exception:
+                # One bad request must not fail the others: answer each on its own
+                for rows, future in pending:
+                    try:
+                        actions, _ = self.predict(rows_to_obs(rows), deterministic=True)
+                    except Exception as error:
+                        future.set_exception(error)
+                        continue
+                    if self.stats is not None:
+                        self.stats.batches += 1
+                    future.set_result(np.asarray(actions).reshape(-1))
+                continue
+            actions = np.asarray(actions).reshape(-1)
+            if self.stats is not None:
+                self.stats.batches += 1
+            start = 0
+            for rows, future in pending:
+                future.set_result(actions[start:start + len(rows)])
+                start += len(rows)
+
+
+class PolicyServer:
+    """
+    Serves actions for a policy over newline-delimited JSON on a Unix or TCP socket.
+
+    Requests:
+      {"id": 1, "obs": [ax, ay, wx, wy, bx, by, carrying]}       -> {"id": 1, "actions": 3}
+      {"id": 2, "obs": [[...], [...], ...]}                      -> {"id": 2, "actions": [3, 0, ...]}
+      {"op": "metrics"}                                          -> latency / throughput snapshot
+    Requests on one connection are handled concurrently, so a client may pipeline
+    them and match replies by id. Observations outside the `grid_size` grid get an
+    error reply before they reach a batch. Latency is measured from the request
+    being read to its reply being ready to write.
+    """
+
+    def __init__(self, policy, max_batch=256, max_delay=0.002, report_interval=10.0, grid_size=5):
+        self.policy = policy
+        self.grid_size = grid_size
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(policy.predict, max_batch, max_delay, self.stats)
+        self.report_interval = report_interval
+
+    async def _handle_request(self, line, writer):
+        start = time.perf_counter()
+        message = None
+        try:
+            message = json.loads(line)
+            if message.get("op") == "metrics":
+                reply = self.stats.snapshot()
+            else:
+                rows = np.asarray(message["obs"], dtype=np.int64)
+                single = rows.ndim == 1
+                rows = rows.reshape(-1, OBS_SIZE)
+                check_rows(rows, self.grid_size)
+                actions = await self.batcher.submit(rows)
+                reply = {"id": message.get("id"), "actions": int(actions[0]) if single else actions.tolist()}
+                self.stats.record(time.perf_counter() - start, len(rows))
+        except Exception as error:
+            # Pipelining clients match replies by id, errors included
+            request_id = message.get("id") if isinstance(message, dict) else None
+            reply = {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+        writer.write(json.dumps(reply).encode() + b"\n")
+
+    async def _handle_connection(self, reader, writer):
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._handle_request(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            s = self.stats.snapshot()
+            print(f"[serve] {s['requests']} requests | {s['requests_per_sec']:.0f} req/s, "
+                  f"{s['observations_per_sec']:.0f} obs/s | p50 {s['p50_ms']:.2f} ms, p99 {s['p99_ms']:.2f} ms | "
+                  f"mean batch {s['mean_batch']:.1f}", flush=True)
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None, ready=None):
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            server = await asyncio.start_unix_server(self._handle_connection, path=unix_path)
+        else:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+        tasks = [asyncio.create_task(self.batcher.run())]
+        if self.report_interval:
+            tasks.append(asyncio.create_task(self._report()))
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching action server for a trained policy")
+    parser.add_argument("--model", default="models/numpy/ppo_collection(2).npz",
+                        help="Checkpoint path, registry hash prefix or name")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=256, help="Observations per forward pass")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0,
+                        help="Latency budget for gathering a batch after its first request")
+    parser.add_argument("--grid-size", type=int, default=None,
+                        help="Grid of the accepted observations (default: the checkpoint's, else 5)")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between metric lines (0: off)")
+    args = parser.parse_args()
+
+    from policies.registry import get_registry
+    registry = get_registry()
+    policy = registry.get(args.model)
+    grid_size = args.grid_size or registry.checkpoints[registry.resolve(args.model)]["grid_size"] or 5
+    server = PolicyServer(policy, args.max_batch, args.max_delay_ms / 1000, args.report_interval, grid_size)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving {args.model} on {where} (batch <= {args.max_batch}, budget {args.max_delay_ms} ms)", flush=True)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
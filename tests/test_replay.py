@@ -0,0 +1,80 @@
+import numpy as np
+import torch
+from stable_baselines3.common.buffers import DictReplayBuffer
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from environment.custom_env import WasteCollectionEnv
+from training.replay import EncodedReplayBuffer, StateCodec
+
+
+def _random_states(grid_size, n, rng):
+    obs = {
+        "agent": rng.integers(0, grid_size, (n, 2)),
+        "waste": rng.integers(0, grid_size, (n, 2)),
+        "bin": rng.integers(0, grid_size, (n, 2)),
+        "carrying": rng.integers(0, 2, n),
+    }
+    obs["waste"][obs["carrying"] == 1] = -1
+    return obs
+
+
+def test_codec_round_trip():
+    rng = np.random.default_rng(0)
+    for grid_size in (5, 10):  # Table lookup, then integer arithmetic
+        codec = StateCodec(grid_size)
+        assert (codec.table is not None) == (grid_size == 5)
+        obs = _random_states(grid_size, 1000, rng)
+        decoded = codec.decode(codec.encode(obs))
+        for key in obs:
+            np.testing.assert_array_equal(decoded[key].reshape(obs[key].shape), obs[key])
+
+
+def test_samples_match_dict_replay_buffer():
+    n_envs, steps, buffer_size = 3, 120, 150  # Wraps around; max_steps=10 truncates often
+    env = DummyVecEnv([lambda: WasteCollectionEnv(grid_size=5, max_steps=10) for _ in range(n_envs)])
+    env.seed(0)
+    buffers = [buffer_class(buffer_size, env.observation_space, env.action_space, device="cpu", n_envs=n_envs)
+               for buffer_class in (DictReplayBuffer, EncodedReplayBuffer)]
+    rng = np.random.default_rng(0)
+    obs = env.reset()
+    for _ in range(steps):
+        # Greedy with some random moves, so that episodes both terminate and hit the time limit
+        target = np.where(obs["carrying"][:, None] == 1, obs["bin"], obs["waste"])
+        dx, dy = (target - obs["agent"]).T
+        greedy = np.select([dx > 0, dx < 0, dy > 0, dy < 0], [3, 2, 1, 0], 4)
+        actions = np.where(rng.random(n_envs) < 0.3, rng.integers(0, 5, n_envs), greedy)
+        new_obs, rewards, dones, infos = env.step(actions)
+        # What off-policy algorithms store: the final observation of an episode, not the reset one
+        next_obs = {key: value.copy() for key, value in new_obs.items()}
+        for i in np.flatnonzero(dones):
+            for key in next_obs:
+                next_obs[key][i] = infos[i]["terminal_observation"][key]
+        for buffer in buffers:
+            buffer.add(obs, next_obs, actions, rewards, dones, infos)
+        obs = new_obs
+
+    reference, encoded = buffers
+    assert encoded.pos == reference.pos and encoded.full
+    # Every slot but the oldest one, whose obs the encoded buffer has overwritten
+    batch_inds = (encoded.pos + np.arange(1, encoded.buffer_size)) % encoded.buffer_size
+    batch_inds = np.repeat(batch_inds, 4)
+    samples = []
+    for buffer in buffers:
+        np.random.seed(0)  # Same env index per sample
+        samples.append(buffer._get_samples(batch_inds))
+    expected, actual = samples
+    # A terminal transition's next state is never used by the TD target (it is multiplied by
+    # 1 - done), and the encoded buffer holds the reset observation there instead
+    live = expected.dones.reshape(-1) == 0
+    for key in expected.observations:
+        rows = [(batch.observations[key].float().reshape(len(batch_inds), -1),
+                 batch.next_observations[key].float().reshape(len(batch_inds), -1)) for batch in samples]
+        (expected_obs, expected_next), (obs, next_obs) = rows
+        torch.testing.assert_close(obs, expected_obs)
+        torch.testing.assert_close(next_obs[live], expected_next[live])
+    torch.testing.assert_close(actual.actions, expected.actions.long())
+    torch.testing.assert_close(actual.rewards, expected.rewards)
+    torch.testing.assert_close(actual.dones, expected.dones)
+    # Both episode ends are covered: terminations and time-limit truncations
+    assert expected.dones.sum() > 0
+    assert len(encoded.final_states) > 0
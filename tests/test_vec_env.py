@@ -0,0 +1,55 @@
+import numpy as np
+
+from environment.vec_env import BatchedWasteCollectionEnv
+
+
+def test_stage_change_keeps_running_episodes():
+    env = BatchedWasteCollectionEnv(4, grid_size=5, max_steps=100, observation_grid_size=10)
+    env.seed(0)
+    obs = env.reset()
+    waste = obs["waste"].copy()
+    env.set_stage(10, 2, 80)
+
+    # Pickup on the start cell: the waste of a stage-0 episode is never there
+    obs, rewards, dones, infos = env.step(np.full(4, 4))
+    assert not dones.any()
+    assert (env.env_stage == 0).all()
+    np.testing.assert_allclose(rewards, -1.1)
+    np.testing.assert_array_equal(obs["waste"], waste)
+    assert not obs["carrying"].any()
+
+
+def test_stage_change_episode_finishes_in_its_stage():
+    env = BatchedWasteCollectionEnv(1, grid_size=5, max_steps=100, observation_grid_size=10)
+    env.seed(0)
+    obs = env.reset()
+    env.set_stage(10, 2, 80, stage=1)
+    infos = None
+    for target_key in ("waste", "bin"):
+        target = obs[target_key][0].copy()
+        while (obs["agent"][0] != target).any():
+            dx, dy = target - obs["agent"][0]
+            action = 3 if dx > 0 else 2 if dx < 0 else 1 if dy > 0 else 0
+            obs, _, dones, infos = env.step([action])
+            assert not dones[0]
+        obs, rewards, dones, infos = env.step([4])
+    assert dones[0] and not infos[0]["TimeLimit.truncated"]
+    assert infos[0]["stage"] == 0
+    assert env.env_stage[0] == 1 and env.env_n_waste[0] == 2
+
+
+def test_more_items_than_a_uniform_block():
+    env = BatchedWasteCollectionEnv(2, grid_size=20, max_steps=100, n_waste=40)
+    env.seed(0)
+    env.reset()
+    assert env.free.sum(axis=1).tolist() == [40, 40]
+    cells = env.items[:, :, 1] * 20 + env.items[:, :, 0]
+    assert all(len(set(row.tolist()) | {0}) == 41 for row in cells)
+
+    env = BatchedWasteCollectionEnv(2, grid_size=5, max_steps=100, observation_grid_size=20)
+    env.seed(0)
+    env.reset()
+    env.set_stage(20, 40, 100)
+    for _ in range(3):
+        env.reset()
+        assert env.free.sum(axis=1).tolist() == [40, 40]
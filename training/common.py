@@ -0,0 +1,127 @@
+# training/common.py
+import time
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback, EvalCallback
+from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecMonitor
+
+from environment.custom_env import WasteCollectionEnv
+from environment.vec_env import BatchedWasteCollectionEnv
+from environment.fleet_env import FleetVecEnv
+from evaluation.callback import AsyncEvalCallback, BatchedEvalCallback
+
+VEC_BACKENDS = ("dummy", "subproc", "batched", "fleet")
+
+
+def spawn_seed(seed, *keys):
+    """
+    Seed of one part of a run (a sweep trial, a rung, a worker): the stream of
+    SeedSequence(seed).spawn()'s child `keys`, as a 32-bit int.
+
+    Sub-envs get seed + i, so runs seeded s and s + 1 would share all but one env stream;
+    seeds spawned from (seed, *keys) are unrelated for every distinct key path.
+    """
+    return int(np.random.SeedSequence(seed, spawn_key=keys).generate_state(1)[0])
+
+
+def add_vec_env_args(parser):
+    """Adds the shared --n-envs / --vec-backend / --seed / --target-reward options."""
+    parser.add_argument("--n-envs", type=int, default=1, help="Number of parallel environments")
+    parser.add_argument("--vec-backend", choices=VEC_BACKENDS, default="dummy",
+                        help="dummy: one process, subproc: one worker process per env, batched: NumPy VecEnv, "
+                             "fleet: n-envs vehicles sharing one grid (shared-parameter multi-agent)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--total-timesteps", type=int, default=100000)
+    parser.add_argument("--target-reward", type=float, default=None,
+                        help="Report wall-clock time until the mean eval reward reaches this value")
+    parser.add_argument("--stop-at-target", action="store_true", help="Stop training once --target-reward is reached")
+    parser.add_argument("--eval-backend", choices=("batched", "async", "sb3"), default="batched",
+                        help="batched: BatchedEvalCallback on seeded parallel episodes, async: the same in a "
+                             "background process, sb3: EvalCallback")
+    parser.add_argument("--eval-episodes", type=int, default=None,
+                        help="Episodes per evaluation (default 1000 batched, 5 sb3)")
+    return parser
+
+
+def _make_env(rank, seed, env_kwargs):
+    def _init():
+        env = Monitor(WasteCollectionEnv(**env_kwargs))
+        env.reset(seed=None if seed is None else seed + rank)
+        return env
+    return _init
+
+
+def make_training_env(n_envs=1, vec_backend="dummy", seed=None, grid_size=5, max_steps=100, n_waste=1):
+    """
+    Builds a VecEnv with episode stats in info['episode'] for every sub-env. `n_waste` is the
+    number of items on the shared grid of the fleet backend, whatever its number of vehicles.
+    """
+    env_kwargs = dict(grid_size=grid_size, max_steps=max_steps)
+    if vec_backend == "batched":
+        env = BatchedWasteCollectionEnv(n_envs, **env_kwargs)
+        env.seed(seed)
+        return VecMonitor(env)
+    if vec_backend == "fleet":
+        env = FleetVecEnv(n_envs, n_waste=n_waste, **env_kwargs)
+        env.seed(seed)
+        return VecMonitor(env)
+    env_fns = [_make_env(rank, seed, env_kwargs) for rank in range(n_envs)]
+    env = SubprocVecEnv(env_fns) if vec_backend == "subproc" else DummyVecEnv(env_fns)
+    # First episodes reset with seed + rank, the same layouts as the batched backend
+    env.seed(seed)
+    return env
+
+
+def make_eval_env(seed=None, grid_size=5, max_steps=100):
+    """Single monitored env for EvalCallback, kept separate from the training envs."""
+    return DummyVecEnv([_make_env(10000, seed, dict(grid_size=grid_size, max_steps=max_steps))])
+
+
+def make_eval_callback(eval_backend="batched", eval_episodes=None, n_envs=1, seed=None, grid_size=5, max_steps=100,
+                       best_model_save_path=None, log_path=None, callback_after_eval=None):
+    """Evaluation every ~5000 timesteps; eval_freq counts vectorized steps, so it is scaled by n_envs."""
+    eval_freq = max(5000 // n_envs, 1)
+    if eval_backend in ("batched", "async"):
+        callback_class = AsyncEvalCallback if eval_backend == "async" else BatchedEvalCallback
+        return callback_class(
+            n_eval_episodes=eval_episodes or 1000, eval_freq=eval_freq, grid_size=grid_size, max_steps=max_steps,
+            seed=0 if seed is None else seed, best_model_save_path=best_model_save_path, log_path=log_path,
+            deterministic=True, callback_after_eval=callback_after_eval
+        )
+    eval_env = make_eval_env(seed=seed, grid_size=grid_size, max_steps=max_steps)
+    return EvalCallback(eval_env, best_model_save_path=best_model_save_path, log_path=log_path, eval_freq=eval_freq,
+                        n_eval_episodes=eval_episodes or 5, deterministic=True, render=False,
+                        callback_after_eval=callback_after_eval)
+
+
+class TargetRewardTimer(BaseCallback):
+    """
+    Used as callback_after_eval of EvalCallback or BatchedEvalCallback. Records the wall-clock time
+    and timesteps at which the mean eval reward (or, with metric="success_rate", the success rate
+    measured by BatchedEvalCallback) first reaches `target`.
+    """
+    def __init__(self, target, stop=False, metric="reward", verbose=1):
+        super(TargetRewardTimer, self).__init__(verbose)
+        self.target = target
+        self.stop = stop
+        self.metric = metric
+        self.start_time = None
+        self.reached_time = None
+        self.reached_timesteps = None
+
+    def _init_callback(self):
+        self.start_time = time.time()
+
+    def _on_step(self) -> bool:
+        if self.metric == "success_rate":
+            value = self.parent.last_result["success_rate"]
+        else:
+            value = self.parent.last_mean_reward
+        if self.reached_time is None and value >= self.target:
+            self.reached_time = time.time() - self.start_time
+            self.reached_timesteps = self.num_timesteps
+            if self.verbose:
+                print(f"Target eval {self.metric.replace('_', ' ')} {self.target} reached after "
+                      f"{self.reached_time:.1f}s ({self.reached_timesteps} timesteps)")
+            return not self.stop
+        return True
@@ -0,0 +1,132 @@
+# training/curriculum.py
+import argparse
+import time
+from collections import deque
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecMonitor
+
+from environment.vec_env import BatchedWasteCollectionEnv
+from evaluation.callback import BatchedEvalCallback
+from training.common import TargetRewardTimer
+
+# (grid_size, n_waste, max_steps) of each stage; the last one is the task being learned
+DEFAULT_STAGES = [(5, 1, 25), (10, 2, 80), (15, 2, 120), (20, 1, 100)]
+
+
+def make_curriculum_env(n_envs=16, stages=DEFAULT_STAGES, seed=None):
+    """
+    BatchedWasteCollectionEnv starting at stages[0], with the observation space of the
+    largest grid so the same policy carries over from stage to stage.
+    """
+    grid_size, n_waste, max_steps = stages[0]
+    env = BatchedWasteCollectionEnv(n_envs, grid_size, max_steps, n_waste=n_waste,
+                                    observation_grid_size=max(stage[0] for stage in stages))
+    env.seed(seed)
+    return VecMonitor(env)
+
+
+class CurriculumCallback(BaseCallback):
+    """
+    Moves the training env (a make_curriculum_env) to the next stage once `threshold` of the
+    last `window` episodes played in the current stage succeeded. Episodes already running
+    finish in their own stage and do not count for the new one.
+
+    Logs curriculum/stage and curriculum/success_rate every rollout and keeps the timesteps
+    and wall-clock time of each promotion in `promotions`.
+    """
+
+    def __init__(self, stages=DEFAULT_STAGES, threshold=0.8, window=200, verbose=1):
+        super(CurriculumCallback, self).__init__(verbose)
+        self.stages = stages
+        self.threshold = threshold
+        self.successes = deque(maxlen=window)
+        self.stage = 0
+        self.promotions = []  # (stage, timesteps, seconds since the start)
+
+    def _init_callback(self):
+        self.start_time = time.time()
+        self.env = self.training_env.unwrapped
+
+    def _on_step(self) -> bool:
+        for done, info in zip(self.locals["dones"], self.locals["infos"]):
+            if done and info.get("stage") == self.stage:
+                self.successes.append(not info["TimeLimit.truncated"])
+        if (self.stage + 1 < len(self.stages) and len(self.successes) == self.successes.maxlen
+                and np.mean(self.successes) >= self.threshold):
+            self.stage += 1
+            self.env.set_stage(*self.stages[self.stage], stage=self.stage)
+            self.successes.clear()
+            self.promotions.append((self.stage, self.num_timesteps, time.time() - self.start_time))
+            if self.verbose:
+                grid_size, n_waste, max_steps = self.stages[self.stage]
+                print(f"[curriculum] stage {self.stage}: {grid_size}x{grid_size}, {n_waste} item(s), "
+                      f"{max_steps} steps after {self.num_timesteps} timesteps")
+        return True
+
+    def _on_rollout_end(self):
+        self.logger.record("curriculum/stage", self.stage)
+        if self.successes:
+            self.logger.record("curriculum/success_rate", float(np.mean(self.successes)))
+
+
+def train(stages=DEFAULT_STAGES, n_envs=16, seed=0, total_timesteps=2_000_000, target_success=0.9, threshold=0.8,
+          window=200, eval_episodes=500, eval_freq=20000, verbose=0):
+    """
+    Trains PPO through `stages` (a single stage is plain training on it) until the success rate
+    on the last stage's task reaches `target_success`. Returns the TargetRewardTimer and the
+    CurriculumCallback, whose reached_* and promotions hold the timings.
+    """
+    from training.pg_training import make_model
+
+    env = make_curriculum_env(n_envs, stages, seed)
+    model = make_model(env, n_envs, seed=seed, verbose=verbose)
+    grid_size, _, max_steps = stages[-1]
+    timer = TargetRewardTimer(target_success, stop=True, metric="success_rate", verbose=verbose)
+    curriculum = CurriculumCallback(stages, threshold, window, verbose=1)
+    eval_callback = BatchedEvalCallback(n_eval_episodes=eval_episodes, eval_freq=max(eval_freq // n_envs, 1),
+                                        grid_size=grid_size, max_steps=max_steps, seed=0,
+                                        callback_after_eval=timer, verbose=verbose)
+    model.learn(total_timesteps=total_timesteps, callback=[curriculum, eval_callback])
+    return timer, curriculum, eval_callback
+
+
+def parse_stages(text):
+    """'5:1:25,10:3:60,20:1:100' -> [(5, 1, 25), (10, 3, 60), (20, 1, 100)]"""
+    return [tuple(int(value) for value in stage.split(":")) for stage in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPO with a grid size / item count / horizon curriculum")
+    parser.add_argument("--stages", type=parse_stages, default=DEFAULT_STAGES,
+                        help="grid:items:max_steps per stage, comma separated (default 5:1:25,10:2:80,15:2:120,20:1:100)")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Rolling success rate that promotes a stage")
+    parser.add_argument("--window", type=int, default=200, help="Episodes in the rolling success rate")
+    parser.add_argument("--target-success", type=float, default=0.9,
+                        help="Eval success rate on the last stage that ends training")
+    parser.add_argument("--n-envs", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--total-timesteps", type=int, default=2_000_000)
+    parser.add_argument("--compare", action="store_true", help="Also train on the last stage alone and compare")
+    args = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(1)
+    runs = [("curriculum", args.stages)] + ([("scratch", args.stages[-1:])] if args.compare else [])
+    results = []
+    for name, stages in runs:
+        print(f"== {name}: {stages}")
+        timer, curriculum, evaluation = train(stages, args.n_envs, args.seed, args.total_timesteps,
+                                              args.target_success, args.threshold, args.window)
+        results.append((name, timer, evaluation))
+    print(f"\n{'run':<12} {'timesteps':>10} {'seconds':>8}  (to {args.target_success:.0%} eval success on the last stage)")
+    for name, timer, evaluation in results:
+        if timer.reached_time is None:
+            last = evaluation.last_result["success_rate"] if evaluation.last_result else float("nan")
+            print(f"{name:<12} {'not reached':>10} {'-':>8}  last eval success {last:.1%}")
+        else:
+            print(f"{name:<12} {timer.reached_timesteps:>10} {timer.reached_time:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,40 @@
+import argparse
 import os
-import numpy as np
 from stable_baselines3 import DQN
-from stable_baselines3.common.callbacks import BaseCallback, EvalCallback
 from stable_baselines3.common.logger import configure
-from environment.custom_env import WasteCollectionEnv
+from training.common import TargetRewardTimer, add_vec_env_args, make_eval_callback, make_training_env
+from training.metrics import MetricsLoggerCallback
+from training.profiling import PhaseProfilerCallback, add_profiling_args, parse_window
+from training.replay import EncodedReplayBuffer
 
-# Custom callback to log rewards
-class TrainingLoggerCallback(BaseCallback):
-    def __init__(self, log_dir, verbose=1):
-        super(TrainingLoggerCallback, self).__init__(verbose)
-        self.episode_rewards = []
-        self.log_dir = log_dir
-        os.makedirs(log_dir, exist_ok=True)
+# Defaults used by train(); training/sweep.py overrides them per trial
+DQN_HYPERPARAMS = dict(
+    learning_rate=3e-4,
+    gamma=0.99,
+    batch_size=64,
+    buffer_size=100000,
+    replay_buffer_class=EncodedReplayBuffer,  # 8 bytes per transition instead of 84
+    learning_starts=1000,
+    target_update_interval=500,
+    exploration_fraction=0.1,
+    exploration_initial_eps=1.0,
+    exploration_final_eps=0.01,
+    train_freq=4,
+    gradient_steps=1
+)
 
-    def _on_step(self) -> bool:
-        if "infos" in self.locals and len(self.locals["infos"]) > 0:
-            episode_reward = self.locals["infos"][0].get("episode", {}).get("r")
-            if episode_reward is not None:
-                self.episode_rewards.append(episode_reward)
-                print(f"Episode Reward Logged: {episode_reward}")
-        return True
+def make_model(env, n_envs=1, seed=None, tensorboard_log=None, verbose=1, **hyperparams):
+    params = dict(DQN_HYPERPARAMS, **hyperparams)
+    # train_freq counts vectorized steps; keep the same gradient steps per collected transition
+    train_freq = max(params["train_freq"] // n_envs, 1)
+    params["gradient_steps"] = max(params["gradient_steps"] * n_envs * train_freq // params["train_freq"], 1)
+    params["train_freq"] = train_freq
+    return DQN("MultiInputPolicy", env, verbose=verbose, seed=seed, tensorboard_log=tensorboard_log, **params)
 
-    def on_training_end(self):
-        np.save(os.path.join(self.log_dir, "dqn_reward_history.npy"), 
-               np.array(self.episode_rewards, dtype=np.float32))
-
-def train():
-    env = WasteCollectionEnv(grid_size=5, max_steps=100)
+def train(n_envs=1, vec_backend="dummy", seed=None, total_timesteps=100000, target_reward=None, stop_at_target=False,
+          eval_backend="batched", eval_episodes=None, profile=False, profile_window=None, profile_mode="sample",
+          buffer_size=DQN_HYPERPARAMS["buffer_size"]):
+    env = make_training_env(n_envs, vec_backend, seed=seed, grid_size=5, max_steps=100)
     
     # paths
     models_dir = "models/dqn/"
@@ -37,40 +45,38 @@ def train():
     os.makedirs(log_dir, exist_ok=True)
     os.makedirs(best_model_dir, exist_ok=True)
 
-    model = DQN(
-        "MultiInputPolicy",
-        env,
-        verbose=1,
-        learning_rate=3e-4,
-        gamma=0.99,
-        batch_size=64,
-        buffer_size=100000,
-        learning_starts=1000,
-        target_update_interval=500,
-        exploration_fraction=0.1,
-        exploration_initial_eps=1.0,
-        exploration_final_eps=0.01,
-        tensorboard_log=log_dir
-    )
+    model = make_model(env, n_envs, seed=seed, tensorboard_log=log_dir, buffer_size=buffer_size)
 
     new_logger = configure(log_dir, ["stdout", "tensorboard"])
     model.set_logger(new_logger)
 
-    training_logger = TrainingLoggerCallback(log_dir)
-    eval_callback = EvalCallback(
-        env, 
+    training_logger = MetricsLoggerCallback(log_dir, scalar_key="train/loss")
+    target_timer = TargetRewardTimer(target_reward, stop=stop_at_target) if target_reward is not None else None
+    eval_callback = make_eval_callback(
+        eval_backend,
+        eval_episodes,
+        n_envs,
+        seed,
         best_model_save_path=best_model_dir,
         log_path=log_dir,
-        eval_freq=5000,
-        deterministic=True,
-        render=False
+        callback_after_eval=target_timer
     )
 
-    model.learn(total_timesteps=100000, callback=[training_logger, eval_callback])
+    callback = [training_logger, eval_callback]
+    if profile or profile_window:
+        callback = PhaseProfilerCallback(callback, log_dir, window=profile_window, mode=profile_mode)
+    model.learn(total_timesteps=total_timesteps, callback=callback)
     
     # model save
     model.save(os.path.join(models_dir, "dqn_final_model"))
     print("DQN training completed and model saved to separate directory.")
+    return target_timer
 
 if __name__ == '__main__':
-    train()
\ No newline at end of file
+    parser = add_vec_env_args(argparse.ArgumentParser(description="Train DQN on WasteCollectionEnv"))
+    parser.add_argument("--buffer-size", type=int, default=DQN_HYPERPARAMS["buffer_size"],
+                        help="Replay buffer transitions (8 bytes each with the encoded buffer)")
+    args = add_profiling_args(parser).parse_args()
+    train(args.n_envs, args.vec_backend, args.seed, args.total_timesteps, args.target_reward, args.stop_at_target,
+          args.eval_backend, args.eval_episodes, args.profile, parse_window(args.profile_window), args.profile_mode,
+          args.buffer_size)
@@ -0,0 +1,71 @@
+# training/metrics.py
+import time
+from collections import deque
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+# The record formats and their reader live in metrics_io, which plotting imports without torch
+from training.metrics_io import EPISODE_DTYPE, UPDATE_DTYPE, MetricsWriter, read_metrics  # noqa: F401
+
+
+class MetricsLoggerCallback(BaseCallback):
+    """
+    Streams episode rewards/lengths from every sub-env and one training scalar per
+    gradient update (`scalar_key` in the SB3 logger, e.g. "train/entropy_loss") to
+    MetricsWriter files, and prints a progress line at most every `print_interval` seconds.
+    """
+
+    def __init__(self, log_dir, scalar_key=None, chunk_size=4096, flush_interval=10.0, print_interval=10.0, verbose=1):
+        super(MetricsLoggerCallback, self).__init__(verbose)
+        self.log_dir = log_dir
+        self.scalar_key = scalar_key
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.print_interval = print_interval
+        self.recent_rewards = deque(maxlen=100)
+        self.n_episodes = 0
+        self.episodes = None
+        self.updates = None
+
+    def _init_callback(self):
+        self.start_time = time.time()
+        self._last_print = self.start_time
+        self._last_n_updates = 0
+        self.episodes = MetricsWriter(self.log_dir, "episodes", EPISODE_DTYPE, self.chunk_size, self.flush_interval)
+        if self.scalar_key is not None:
+            self.updates = MetricsWriter(self.log_dir, "updates", UPDATE_DTYPE, self.chunk_size, self.flush_interval)
+
+    def _on_rollout_start(self):
+        # Training scalars are recorded by train(), which runs just before the next rollout
+        self._record_update()
+
+    def _record_update(self):
+        n_updates = getattr(self.model, "_n_updates", 0)
+        if self.updates is not None and n_updates != self._last_n_updates:
+            value = self.model.logger.name_to_value.get(self.scalar_key)
+            if value is not None:
+                self.updates.append(self.num_timesteps, time.time() - self.start_time, n_updates, value)
+            self._last_n_updates = n_updates
+
+    def _on_step(self) -> bool:
+        for info in self.locals.get("infos", []):
+            episode = info.get("episode")
+            if episode is not None:
+                self.episodes.append(self.num_timesteps, time.time() - self.start_time, episode["r"], episode["l"])
+                self.recent_rewards.append(episode["r"])
+                self.n_episodes += 1
+
+        now = time.time()
+        if self.verbose and now - self._last_print >= self.print_interval:
+            self._last_print = now
+            mean_reward = np.mean(self.recent_rewards) if self.recent_rewards else float("nan")
+            print(f"[{now - self.start_time:7.1f}s] timesteps {self.num_timesteps} | episodes {self.n_episodes} | "
+                  f"mean reward (last {len(self.recent_rewards)}) {mean_reward:.2f}")
+        return True
+
+    def _on_training_end(self):
+        # The last train() is followed by no rollout
+        self._record_update()
+        self.episodes.close()
+        if self.updates is not None:
+            self.updates.close()
@@ -0,0 +1,70 @@
+# training/metrics_io.py
+import json
+import os
+import time
+import numpy as np
+
+# One record per finished episode and one per gradient update (rollout boundary)
+EPISODE_DTYPE = np.dtype([("timestep", np.int64), ("wall_time", np.float64),
+                          ("reward", np.float32), ("length", np.int32)])
+UPDATE_DTYPE = np.dtype([("timestep", np.int64), ("wall_time", np.float64),
+                         ("n_updates", np.int64), ("value", np.float32)])
+
+
+class MetricsWriter:
+    """
+    Appends fixed-size records to `<log_dir>/metrics/<stream>.bin`.
+
+    Records go into a preallocated buffer of `chunk_size` rows which is written
+    out when it is full or when `flush_interval` seconds have passed, so memory
+    stays bounded and at most one chunk (or a few seconds) is lost on a crash.
+    The .bin file is raw records with the dtype described in `<stream>.json`,
+    which read_metrics() memory-maps, also while training is still writing.
+    """
+
+    def __init__(self, log_dir, stream, dtype, chunk_size=4096, flush_interval=10.0):
+        directory = os.path.join(log_dir, "metrics")
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{stream}.bin")
+        with open(os.path.join(directory, f"{stream}.json"), "w") as f:
+            json.dump({"fields": dtype.descr}, f)
+        self.buffer = np.zeros(chunk_size, dtype=dtype)
+        self.size = 0
+        self.flush_interval = flush_interval
+        self._last_flush = time.time()
+        self._file = open(self.path, "wb")  # A new run starts a new stream
+
+    def append(self, *values):
+        self.buffer[self.size] = values
+        self.size += 1
+        if self.size == len(self.buffer) or time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.size:
+            self._file.write(self.buffer[:self.size].tobytes())
+            self._file.flush()
+            self.size = 0
+        self._last_flush = time.time()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def read_metrics(log_dir, stream):
+    """
+    Read-only memmap over the records written so far, empty if the stream does not exist.
+    A record still being written is left out.
+    """
+    directory = os.path.join(log_dir, "metrics")
+    header = os.path.join(directory, f"{stream}.json")
+    path = os.path.join(directory, f"{stream}.bin")
+    if not os.path.exists(header) or not os.path.exists(path):
+        return np.zeros(0, dtype=EPISODE_DTYPE if stream == "episodes" else UPDATE_DTYPE)
+    with open(header) as f:
+        dtype = np.dtype([tuple(field) for field in json.load(f)["fields"]])
+    n_records = os.path.getsize(path) // dtype.itemsize
+    if n_records == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(n_records,))
@@ -1,76 +1,64 @@
+import argparse
 import os
-import numpy as np
-import matplotlib.pyplot as plt
 from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import BaseCallback, EvalCallback
 from stable_baselines3.common.logger import configure
-from environment.custom_env import WasteCollectionEnv
+from training.common import TargetRewardTimer, add_vec_env_args, make_eval_callback, make_training_env
+from training.metrics import MetricsLoggerCallback
+from training.profiling import PhaseProfilerCallback, add_profiling_args, parse_window
 
-# Custom callback to log rewards and entropy
-class TrainingLoggerCallback(BaseCallback):
-    def __init__(self, log_dir, verbose=1):
-        super(TrainingLoggerCallback, self).__init__(verbose)
-        self.episode_rewards = []
-        self.entropy_values = []
-        self.log_dir = log_dir
-        os.makedirs(log_dir, exist_ok=True)
+# Defaults used by train(); training/sweep.py overrides them per trial
+PPO_HYPERPARAMS = dict(
+    learning_rate=3e-4,
+    gamma=0.99,
+    batch_size=64,
+    n_steps=2048,
+    n_epochs=10,
+    ent_coef=0.01
+)
+MIN_ENV_STEPS = 512  # Shortest rollout per env
 
-    def _on_step(self) -> bool:
-        # Log episode rewards
-        if "infos" in self.locals and len(self.locals["infos"]) > 0:
-            episode_reward = self.locals["infos"][0].get("episode", {}).get("r")
-            if episode_reward is not None:
-                self.episode_rewards.append(episode_reward)
-                print(f"Episode Reward Logged: {episode_reward}") 
+def make_model(env, n_envs=1, seed=None, tensorboard_log=None, verbose=1, **hyperparams):
+    params = dict(PPO_HYPERPARAMS, **hyperparams)
+    # Keep ~n_steps transitions per rollout whatever the number of envs, but never under
+    # MIN_ENV_STEPS per env: 16 envs x 128 steps never learned, even on a 5x5 grid
+    params["n_steps"] = max(params["n_steps"] // n_envs, MIN_ENV_STEPS)
+    return PPO("MultiInputPolicy", env, verbose=verbose, seed=seed, tensorboard_log=tensorboard_log, **params)
 
-        # Log entropy value from policy
-        entropy = float(self.model.logger.name_to_value.get("entropy_loss", 0))
-        self.entropy_values.append(entropy)
-        print(f"Entropy Logged: {entropy}") 
-
-        return True
-
-    def on_training_end(self):
-        # Save logged values to numpy files
-        np.save(os.path.join(self.log_dir, "reward_history.npy"), np.array(self.episode_rewards, dtype=np.float32))
-        np.save(os.path.join(self.log_dir, "entropy_history.npy"), np.array(self.entropy_values, dtype=np.float32))
-
-def train():
-    env = WasteCollectionEnv(grid_size=5, max_steps=100)
+def train(n_envs=1, vec_backend="dummy", seed=None, total_timesteps=100000, target_reward=None, stop_at_target=False,
+          eval_backend="batched", eval_episodes=None, profile=False, profile_window=None, profile_mode="sample"):
+    env = make_training_env(n_envs, vec_backend, seed=seed, grid_size=5, max_steps=100)
     models_dir = "models/pg/"
     log_dir = "logs/"
 
     os.makedirs(models_dir, exist_ok=True)
     os.makedirs(log_dir, exist_ok=True)
 
-    model = PPO(
-        "MultiInputPolicy",
-        env,
-        verbose=1,
-        learning_rate=3e-4,
-        gamma=0.99,
-        batch_size=64,
-        n_steps=2048,
-        n_epochs=10,
-        ent_coef=0.01,
-        tensorboard_log=log_dir 
-    )
+    model = make_model(env, n_envs, seed=seed, tensorboard_log=log_dir)
 
     # Set up TensorBoard logger
     new_logger = configure(log_dir, ["stdout", "tensorboard"])
     model.set_logger(new_logger)
 
-    # Initialize custom logging callback
-    training_logger = TrainingLoggerCallback(log_dir)
+    # Stream episode rewards/lengths and the entropy loss of every update to logs/metrics/
+    training_logger = MetricsLoggerCallback(log_dir, scalar_key="train/entropy_loss")
     
     # Evaluation callback
-    eval_callback = EvalCallback(env, best_model_save_path=models_dir, log_path=log_dir, eval_freq=5000, deterministic=True, render=False)
+    target_timer = TargetRewardTimer(target_reward, stop=stop_at_target) if target_reward is not None else None
+    eval_callback = make_eval_callback(eval_backend, eval_episodes, n_envs, seed, best_model_save_path=models_dir,
+                                       log_path=log_dir, callback_after_eval=target_timer)
 
     # Train model with both callbacks
-    model.learn(total_timesteps=100000, callback=[training_logger, eval_callback])
+    callback = [training_logger, eval_callback]
+    if profile or profile_window:
+        callback = PhaseProfilerCallback(callback, log_dir, window=profile_window, mode=profile_mode)
+    model.learn(total_timesteps=total_timesteps, callback=callback)
     
     model.save(os.path.join(models_dir, "ppo_collection(3)"))
     print("Training completed and model saved.")
+    return target_timer
 
 if __name__ == '__main__':
-    train()
+    parser = add_vec_env_args(argparse.ArgumentParser(description="Train PPO on WasteCollectionEnv"))
+    args = add_profiling_args(parser).parse_args()
+    train(args.n_envs, args.vec_backend, args.seed, args.total_timesteps, args.target_reward, args.stop_at_target,
+          args.eval_backend, args.eval_episodes, args.profile, parse_window(args.profile_window), args.profile_mode)
@@ -0,0 +1,180 @@
+# training/replay.py
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.buffers import DictReplayBuffer, ReplayBuffer
+from stable_baselines3.common.type_aliases import DictReplayBufferSamples
+
+DONE, TIMEOUT = 1, 2  # Bits of EncodedReplayBuffer.flags
+# Decoded row layout, the same as FastWasteCollectionEnv's flat observation
+FIELDS = {"agent": slice(0, 2), "waste": slice(2, 4), "bin": slice(4, 6), "carrying": slice(6, 7)}
+
+
+class StateCodec:
+    """
+    Packs a WasteCollectionEnv observation (agent, waste, bin, carrying) into one integer.
+
+    Cells are y * grid_size + x; the waste position is -1 while carrying (or when no
+    waste is left), which gets its own code g². The code is
+    ((agent * (g² + 1) + waste) * g² + bin) * 2 + carrying, stored in the smallest
+    unsigned dtype that holds every state (uint16 up to a 5x5 grid, uint32 up to 15x15).
+
+    Decoding is a single gather from a table of every state's fields while that table
+    stays under `max_table_states` rows (7 bytes each, grids up to 8x8); larger grids
+    decode with integer arithmetic.
+    """
+
+    def __init__(self, grid_size, max_table_states=2**20):
+        self.grid_size = grid_size
+        cells = grid_size * grid_size
+        self.n_states = cells * (cells + 1) * cells * 2
+        self.dtype = next(dtype for dtype in (np.uint16, np.uint32, np.uint64)
+                          if self.n_states <= np.iinfo(dtype).max + 1)
+        # Place value of each field of a decoded row in the code
+        waste, agent = 2 * cells, 2 * cells * (cells + 1)
+        self._weights = np.array([agent, agent * grid_size, waste, waste * grid_size, 2, 2 * grid_size, 1])
+        self._carried_shift = (cells + grid_size + 1) * waste
+        self.table = None
+        if self.n_states <= max_table_states:
+            self.table = self._decode_rows(np.arange(self.n_states)).astype(np.int8)
+
+    @classmethod
+    def for_space(cls, observation_space):
+        """Codec for a WasteCollectionEnv-style Dict space; ValueError for anything else."""
+        expected = {"agent", "waste", "bin", "carrying"}
+        if not isinstance(observation_space, spaces.Dict) or set(observation_space.spaces) != expected:
+            raise ValueError(f"EncodedReplayBuffer needs the keys {sorted(expected)}, got {observation_space}")
+        if observation_space["carrying"].n != 2 or observation_space["agent"].shape != (2,):
+            raise ValueError(f"Unsupported observation space {observation_space}")
+        return cls(int(observation_space["agent"].high[0]) + 1)
+
+    def encode(self, *observations):
+        """Codes of every state in one or more batched observations, concatenated."""
+        n = np.size(observations[0]["carrying"])
+        rows = np.empty((len(observations) * n, 7), dtype=np.int64)
+        for i, obs in enumerate(observations):
+            block = rows[i * n:(i + 1) * n]
+            block[:, 0:2] = obs["agent"]
+            block[:, 2:4] = obs["waste"]
+            block[:, 4:6] = obs["bin"]
+            block[:, 6] = np.ravel(obs["carrying"])
+        # The weights give a waste of (-1, -1) the code -(g + 1) * 2g²; shift it to g² * 2g²
+        return (rows @ self._weights + (rows[:, 2] < 0) * self._carried_shift).astype(self.dtype)
+
+    def _decode_rows(self, codes):
+        g = self.grid_size
+        cells = g * g
+        code, carrying = np.divmod(codes.astype(np.int64), 2)
+        code, bin_cell = np.divmod(code, cells)
+        agent_cell, waste_cell = np.divmod(code, cells + 1)
+        rows = np.stack([agent_cell % g, agent_cell // g, waste_cell % g, waste_cell // g,
+                         bin_cell % g, bin_cell // g, carrying], axis=1)
+        rows[waste_cell == cells, 2:4] = -1
+        return rows
+
+    def decode_rows(self, codes):
+        """(n, 7) int32 rows of agent x, y, waste x, y, bin x, y, carrying."""
+        rows = self.table[codes] if self.table is not None else self._decode_rows(codes)
+        return rows.astype(np.int32)
+
+    def decode(self, codes):
+        rows = self.decode_rows(codes)
+        return {key: rows[:, columns] for key, columns in FIELDS.items()}
+
+
+class EncodedReplayBuffer(DictReplayBuffer):
+    """
+    Drop-in replacement for DictReplayBuffer (replay_buffer_class=EncodedReplayBuffer)
+    storing each WasteCollectionEnv transition in 8 bytes (10 above a 5x5 grid) instead of 84.
+
+    - observations are packed by StateCodec into one integer per state
+    - the next state of a transition is the state stored in the following slot, like
+      SB3's optimize_memory_usage: add() writes next_obs there and the next add()
+      overwrites it with the same state. Episode ends are the exception: their slot
+      then holds the reset observation, which is fine for terminations (the target
+      ignores it) while truncations keep their final state in a small dict
+    - actions are uint8, done/timeout flags share one uint8, rewards stay float32
+
+    Sampled obs and next_obs are decoded together by one StateCodec table lookup.
+    """
+
+    def __init__(self, buffer_size, observation_space, action_space, device="auto", n_envs=1,
+                 optimize_memory_usage=False, handle_timeout_termination=True):
+        # Skip DictReplayBuffer's allocation of one array per key for obs and next_obs
+        super(ReplayBuffer, self).__init__(buffer_size, observation_space, action_space, device, n_envs=n_envs)
+        if not isinstance(action_space, spaces.Discrete) or action_space.n > 256:
+            raise ValueError("EncodedReplayBuffer stores actions as uint8")
+        self.codec = StateCodec.for_space(observation_space)
+        self.buffer_size = max(buffer_size // n_envs, 1)
+        self.optimize_memory_usage = True
+        self.handle_timeout_termination = handle_timeout_termination
+        self.states = np.zeros((self.buffer_size, n_envs), dtype=self.codec.dtype)
+        self.actions = np.zeros((self.buffer_size, n_envs), dtype=np.uint8)
+        self.rewards = np.zeros((self.buffer_size, n_envs), dtype=np.float32)
+        self.flags = np.zeros((self.buffer_size, n_envs), dtype=np.uint8)
+        self.final_states = {}  # pos * n_envs + env -> final state of a truncated episode
+
+    def nbytes(self):
+        return self.states.nbytes + self.actions.nbytes + self.rewards.nbytes + self.flags.nbytes
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        pos = self.pos
+        if self.final_states:
+            for env in np.flatnonzero(self.flags[pos] & TIMEOUT):
+                del self.final_states[pos * self.n_envs + env]
+        states = self.codec.encode(obs, next_obs)
+        next_states = states[self.n_envs:]
+        self.states[pos] = states[:self.n_envs]
+        self.states[(pos + 1) % self.buffer_size] = next_states
+        self.actions[pos] = np.asarray(action).reshape(self.n_envs)
+        self.rewards[pos] = np.asarray(reward).reshape(self.n_envs)
+        self.flags[pos] = done
+        if self.handle_timeout_termination:
+            for env, info in enumerate(infos):
+                if info.get("TimeLimit.truncated", False):
+                    self.flags[pos, env] |= TIMEOUT
+                    self.final_states[pos * self.n_envs + env] = next_states[env]
+
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def sample(self, batch_size, env=None):
+        if self.full:
+            # The oldest slot now holds the newest transition's next state, so its own obs is gone
+            batch_inds = (np.random.randint(1, self.buffer_size, size=batch_size) + self.pos) % self.buffer_size
+        else:
+            batch_inds = np.random.randint(0, self.pos, size=batch_size)
+        return self._get_samples(batch_inds, env=env)
+
+    def _get_samples(self, batch_inds, env=None):
+        env_indices = np.random.randint(0, high=self.n_envs, size=(len(batch_inds),))
+        flags = self.flags[batch_inds, env_indices]
+        next_states = self.states[(batch_inds + 1) % self.buffer_size, env_indices]
+        for i in np.flatnonzero(flags & TIMEOUT):
+            next_states[i] = self.final_states[batch_inds[i] * self.n_envs + env_indices[i]]
+
+        n = len(batch_inds)
+        codes = np.concatenate([self.states[batch_inds, env_indices], next_states])
+        if env is None:
+            # One tensor for obs and next_obs; every key is a view of its columns
+            rows = self.to_torch(self.codec.decode_rows(codes)).view(2, n, 7)
+            widths = [columns.stop - columns.start for columns in FIELDS.values()]
+            obs, next_obs = {}, {}
+            for key, part in zip(FIELDS, rows.split(widths, dim=2)):
+                obs[key], next_obs[key] = part.unbind(0)
+        else:
+            decoded = self.codec.decode(codes)
+            obs = self._normalize_obs({key: value[:n] for key, value in decoded.items()}, env)
+            next_obs = self._normalize_obs({key: value[n:] for key, value in decoded.items()}, env)
+            obs = {key: self.to_torch(value) for key, value in obs.items()}
+            next_obs = {key: self.to_torch(value) for key, value in next_obs.items()}
+        # Dones caused by a time limit are not terminal
+        dones = ((flags & DONE) > 0) & ((flags & TIMEOUT) == 0)
+        return DictReplayBufferSamples(
+            observations=obs,
+            actions=self.to_torch(self.actions[batch_inds, env_indices].astype(np.int64).reshape(-1, 1)),
+            next_observations=next_obs,
+            dones=self.to_torch(dones.astype(np.float32).reshape(-1, 1)),
+            rewards=self.to_torch(self._normalize_reward(self.rewards[batch_inds, env_indices].reshape(-1, 1), env)),
+        )
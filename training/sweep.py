@@ -0,0 +1,336 @@
+# training/sweep.py
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+
+# Search spaces: {"uniform": [lo, hi]}, {"log_uniform": [lo, hi]} or {"choice": [...]}
+DEFAULT_SPACES = {
+    "ppo": {
+        "learning_rate": {"log_uniform": [1e-4, 3e-3]},
+        "gamma": {"choice": [0.95, 0.98, 0.99]},
+        "batch_size": {"choice": [32, 64, 128, 256]},
+        "n_steps": {"choice": [4096, 8192, 16384]},  # Per rollout; 512-2048 per env with the default 8 envs
+        "n_epochs": {"choice": [3, 5, 10]},
+        "ent_coef": {"log_uniform": [1e-4, 5e-2]},
+    },
+    "dqn": {
+        "learning_rate": {"log_uniform": [1e-4, 3e-3]},
+        "gamma": {"choice": [0.95, 0.98, 0.99]},
+        "batch_size": {"choice": [32, 64, 128]},
+        "learning_starts": {"choice": [500, 1000, 5000]},
+        "target_update_interval": {"choice": [250, 500, 1000, 2000]},
+        "exploration_fraction": {"uniform": [0.05, 0.5]},
+        "exploration_final_eps": {"choice": [0.01, 0.05, 0.1]},
+    },
+}
+
+
+def sample_config(space, rng):
+    config = {}
+    for name, spec in space.items():
+        (kind, values), = spec.items()
+        if kind == "choice":
+            value = values[rng.integers(len(values))]
+            config[name] = value.item() if isinstance(value, np.generic) else value
+        elif kind == "uniform":
+            config[name] = float(rng.uniform(*values))
+        elif kind == "log_uniform":
+            config[name] = float(math.exp(rng.uniform(math.log(values[0]), math.log(values[1]))))
+        else:
+            raise ValueError(f"Unknown distribution '{kind}' for {name}")
+    return config
+
+
+def rung_budgets(min_timesteps, max_timesteps, eta, unit=1):
+    """
+    Cumulative timesteps at each rung: min, min*eta, ... capped at max, each rounded up to a
+    multiple of `unit` so that learn() stops on every trial's rollout boundary.
+    """
+    budgets = [min_timesteps]
+    while budgets[-1] < max_timesteps:
+        budgets.append(min(budgets[-1] * eta, max_timesteps))
+    rounded = []
+    for budget in budgets:
+        budget = -(-budget // unit) * unit
+        if not rounded or budget > rounded[-1]:
+            rounded.append(budget)
+    return rounded
+
+
+def rollout_size(algo, space, n_envs):
+    """
+    Timesteps one collection of learn() adds, for every config of `space` at once (their
+    least common multiple). learn() only stops between collections, so a budget that is not
+    a multiple of it gives trials of the same rung different amounts of training.
+    """
+    if algo == "ppo":
+        from training.pg_training import MIN_ENV_STEPS, PPO_HYPERPARAMS
+        (kind, values), = space.get("n_steps", {"choice": [PPO_HYPERPARAMS["n_steps"]]}).items()
+        if kind != "choice":
+            raise ValueError("n_steps can only be searched with a choice")
+        return math.lcm(*(max(int(n) // n_envs, MIN_ENV_STEPS) * n_envs for n in values))
+    from training.dqn_training import DQN_HYPERPARAMS
+    return n_envs * max(DQN_HYPERPARAMS["train_freq"] // n_envs, 1)
+
+
+def _trial_dir(out_dir, trial):
+    return os.path.join(out_dir, "trials", f"{trial:03d}")
+
+
+def run_rung(out_dir, algo, trial, config, rung, budgets, n_envs, vec_backend, seed, eval_episodes, best_score):
+    """
+    Worker: trains `trial` from its checkpoint at rung - 1 (or from scratch) up to budgets[rung]
+    timesteps, evaluates it and saves rung_<k>.zip (and best_model.zip if it improved).
+    """
+    import torch
+    from evaluation.evaluate import evaluate_policy_batched
+    from training.common import make_training_env, spawn_seed
+
+    torch.set_num_threads(1)  # One core per trial; parallelism comes from the pool
+    trial_dir = _trial_dir(out_dir, trial)
+    # Independent streams per trial and rung: seed + trial would give neighbouring trials the same envs
+    trial_seed = spawn_seed(seed, trial)
+    env = make_training_env(n_envs, vec_backend, seed=spawn_seed(seed, trial, rung), grid_size=5, max_steps=100)
+    if algo == "ppo":
+        from stable_baselines3 import PPO as Algorithm
+        from training.pg_training import make_model
+    else:
+        from stable_baselines3 import DQN as Algorithm
+        from training.dqn_training import make_model
+
+    start = time.time()
+    start_timesteps = 0
+    if rung == 0:
+        model = make_model(env, n_envs, seed=trial_seed, verbose=0, **config)
+        timesteps = budgets[0]
+    else:
+        model = Algorithm.load(os.path.join(trial_dir, f"rung_{rung - 1}.zip"), env=env)
+        replay = os.path.join(trial_dir, f"replay_{rung - 1}.pkl")
+        if os.path.exists(replay):
+            model.load_replay_buffer(replay)
+        start_timesteps = model.num_timesteps
+        timesteps = budgets[rung] - start_timesteps
+    model.learn(total_timesteps=timesteps, reset_num_timesteps=rung == 0)
+
+    result = evaluate_policy_batched(model.predict, eval_episodes, grid_size=5, max_steps=100, seed=seed)
+    model.save(os.path.join(trial_dir, f"rung_{rung}.zip"))
+    if algo == "dqn" and rung + 1 < len(budgets):
+        # Promotions continue training, so they need the replay buffer too
+        model.save_replay_buffer(os.path.join(trial_dir, f"replay_{rung}.pkl"))
+    if rung > 0 and os.path.exists(os.path.join(trial_dir, f"replay_{rung - 1}.pkl")):
+        os.remove(os.path.join(trial_dir, f"replay_{rung - 1}.pkl"))
+    if result["mean_return"] > best_score:
+        model.save(os.path.join(trial_dir, "best_model.zip"))
+    env.close()
+    return {
+        "trial": trial,
+        "rung": rung,
+        "timesteps": int(model.num_timesteps),
+        "trained": int(model.num_timesteps - start_timesteps),
+        "mean_return": result["mean_return"],
+        "success_rate": result["success_rate"],
+        "mean_steps_to_drop": result["mean_steps_to_drop"],
+        "train_time": time.time() - start,
+    }
+
+
+class SweepStore:
+    """
+    Results store under `out_dir`: sweep.json (settings and every trial config),
+    results.jsonl (one line per finished (trial, rung)) and trials/<id>/ checkpoints.
+    Re-opening an existing directory resumes the sweep.
+    """
+
+    def __init__(self, out_dir, settings):
+        self.out_dir = out_dir
+        self.settings_path = os.path.join(out_dir, "sweep.json")
+        self.results_path = os.path.join(out_dir, "results.jsonl")
+        os.makedirs(out_dir, exist_ok=True)
+        if os.path.exists(self.settings_path):
+            with open(self.settings_path) as f:
+                self.settings = json.load(f)
+            if self.settings["algo"] != settings["algo"]:
+                raise ValueError(f"{out_dir} holds a {self.settings['algo']} sweep")
+        else:
+            self.settings = settings
+            with open(self.settings_path, "w") as f:
+                json.dump(settings, f, indent=2)
+
+        self.results = []
+        if os.path.exists(self.results_path):
+            with open(self.results_path) as f:
+                self.results = [json.loads(line) for line in f if line.strip()]
+
+    def add(self, record):
+        self.results.append(record)
+        with open(self.results_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def scores(self, rung):
+        return {r["trial"]: r["mean_return"] for r in self.results if r["rung"] == rung}
+
+    def best_score(self, trial):
+        scores = [r["mean_return"] for r in self.results if r["trial"] == trial]
+        return max(scores) if scores else -np.inf
+
+
+class ASHAScheduler:
+    """
+    Asynchronous successive halving. A free worker first gets a promotion: the
+    highest-rung trial that is in the top 1/eta of the trials finished at its rung
+    and not promoted yet. Otherwise it starts a new trial at rung 0. No rung waits
+    for stragglers, so every worker stays busy until the sweep runs out of work.
+    """
+
+    def __init__(self, store, n_trials, n_rungs, eta):
+        self.store = store
+        self.n_trials = n_trials
+        self.n_rungs = n_rungs
+        self.eta = eta
+        # Finished jobs count as started, so a resumed sweep continues where it stopped
+        self.started = {(r["trial"], r["rung"]) for r in store.results}
+
+    def next_job(self):
+        for rung in reversed(range(self.n_rungs - 1)):
+            scores = self.store.scores(rung)
+            ranked = sorted(scores, key=scores.get, reverse=True)[:self._quota(rung)]
+            for trial in ranked:
+                if (trial, rung + 1) not in self.started:
+                    return self._start(trial, rung + 1)
+        for trial in range(self.n_trials):
+            if (trial, 0) not in self.started:
+                return self._start(trial, 0)
+        return None
+
+    def _quota(self, rung):
+        """How many trials of `rung` get promoted; once no more can arrive, at least its best one."""
+        n_finished = len(self.store.scores(rung))
+        quota = n_finished // self.eta
+        if quota == 0 and n_finished > 0 and self._closed(rung):
+            quota = 1
+        return quota
+
+    def _closed(self, rung):
+        """True when no trial can still reach `rung`."""
+        if any((trial, 0) not in self.started for trial in range(self.n_trials)):
+            return False
+        finished = {(r["trial"], r["rung"]) for r in self.store.results}
+        if any(r <= rung for _, r in self.started - finished):
+            return False
+        return all(self._promoted(lower) >= self._quota(lower) for lower in range(rung))
+
+    def _promoted(self, rung):
+        return sum((trial, rung + 1) in self.started for trial in range(self.n_trials))
+
+    def _start(self, trial, rung):
+        self.started.add((trial, rung))
+        return trial, rung
+
+
+def leaderboard(store, top=10):
+    """Each trial's furthest rung, ranked by rung reached then score."""
+    latest = {}
+    for r in store.results:
+        if r["trial"] not in latest or r["rung"] > latest[r["trial"]]["rung"]:
+            latest[r["trial"]] = r
+    ranked = sorted(latest.values(), key=lambda r: (r["rung"], r["mean_return"]), reverse=True)
+    configs = store.settings["configs"]
+    lines = [f"{'trial':>5} {'rung':>4} {'timesteps':>9} {'return':>7} {'success':>7}  config"]
+    for r in ranked[:top]:
+        lines.append(f"{r['trial']:>5} {r['rung']:>4} {r['timesteps']:>9} {r['mean_return']:7.2f} "
+                     f"{r['success_rate']:7.1%}  {json.dumps(configs[r['trial']])}")
+    return ranked, "\n".join(lines)
+
+
+def sweep(algo="ppo", n_trials=16, min_timesteps=10000, max_timesteps=90000, eta=3, workers=None, n_envs=8,
+          vec_backend="batched", eval_episodes=500, seed=0, out_dir=None, space=None):
+    out_dir = out_dir or os.path.join("sweeps", algo)
+    space = space or DEFAULT_SPACES[algo]
+    rng = np.random.default_rng(seed)
+    settings = {
+        "algo": algo, "eta": eta, "seed": seed, "n_envs": n_envs, "vec_backend": vec_backend,
+        "eval_episodes": eval_episodes,
+        "budgets": rung_budgets(min_timesteps, max_timesteps, eta, rollout_size(algo, space, n_envs)),
+        "space": space, "configs": [sample_config(space, rng) for _ in range(n_trials)],
+    }
+    store = SweepStore(out_dir, settings)
+    settings = store.settings  # A resumed sweep keeps its original settings and configs
+    budgets = settings["budgets"]
+    scheduler = ASHAScheduler(store, len(settings["configs"]), len(budgets), settings["eta"])
+    for trial in range(len(settings["configs"])):
+        os.makedirs(_trial_dir(out_dir, trial), exist_ok=True)
+    if store.results:
+        print(f"Resuming {out_dir}: {len(store.results)} finished rung evaluations")
+
+    workers = workers or os.cpu_count() or 1
+    start = time.time()
+    timesteps = 0
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        running = {}
+        while True:
+            while len(running) < workers:
+                job = scheduler.next_job()
+                if job is None:
+                    break
+                trial, rung = job
+                future = pool.submit(run_rung, out_dir, settings["algo"], trial, settings["configs"][trial], rung,
+                                     budgets, settings["n_envs"], settings["vec_backend"], settings["seed"],
+                                     settings["eval_episodes"], store.best_score(trial))
+                running[future] = job
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.pop(future)
+                record = future.result()
+                store.add(record)
+                timesteps += record["trained"]
+                print(f"trial {record['trial']:3d} rung {record['rung']} ({record['timesteps']} steps): "
+                      f"return {record['mean_return']:.2f}, success {record['success_rate']:.1%} "
+                      f"[{record['train_time']:.0f}s]")
+
+    elapsed = time.time() - start
+    ranked, table = leaderboard(store)
+    print(table)
+    print(f"{timesteps} timesteps trained in {elapsed:.0f}s with {workers} worker(s) "
+          f"(running every trial to the last rung: {len(settings['configs']) * budgets[-1]})")
+    if ranked:
+        best = ranked[0]
+        best_path = os.path.join(_trial_dir(out_dir, best["trial"]), "best_model.zip")
+        if os.path.exists(best_path):
+            print(f"Best trial: {best['trial']} -> {best_path}")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep with asynchronous successive halving (ASHA)")
+    parser.add_argument("--algo", choices=("ppo", "dqn"), default="ppo")
+    parser.add_argument("--trials", type=int, default=16)
+    parser.add_argument("--min-timesteps", type=int, default=10000, help="Budget of the first rung")
+    parser.add_argument("--max-timesteps", type=int, default=90000, help="Budget of the last rung")
+    parser.add_argument("--eta", type=int, default=3, help="Keep the top 1/eta of each rung")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel trials (default: all cores)")
+    parser.add_argument("--n-envs", type=int, default=8)
+    parser.add_argument("--vec-backend", choices=("dummy", "subproc", "batched"), default="batched")
+    parser.add_argument("--eval-episodes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Results directory (default sweeps/<algo>); re-run to resume")
+    parser.add_argument("--space", default=None, help="JSON file with the search space (see DEFAULT_SPACES)")
+    args = parser.parse_args()
+
+    space = None
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    sweep(args.algo, args.trials, args.min_timesteps, args.max_timesteps, args.eta, args.workers, args.n_envs,
+          args.vec_backend, args.eval_episodes, args.seed, args.out, space)
+
+
+if __name__ == "__main__":
+    main()
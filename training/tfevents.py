@@ -0,0 +1,235 @@
+# training/tfevents.py
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+import numpy as np
+
+CACHE_DIR = "scalars"
+SCALAR_DTYPE = np.dtype([("step", np.int64), ("wall_time", np.float64), ("value", np.float32)])
+_LENGTH = struct.Struct("<Q")
+
+
+def event_files(log_dir):
+    """events.out.tfevents.* files directly in `log_dir`, oldest first (their names start with a timestamp)."""
+    if not os.path.isdir(log_dir):
+        return []
+    return sorted(name for name in os.listdir(log_dir) if name.startswith("events.out.tfevents."))
+
+
+def read_records(path, offset=0):
+    """
+    (end offset, payload) of every complete TFRecord in `path` after `offset`.
+
+    A record is an 8-byte length, a 4-byte CRC of it, the payload and a 4-byte CRC of
+    the payload. CRCs are not checked; a record still being written is left out.
+    """
+    size = os.path.getsize(path)
+    if size - offset < 16:
+        return []
+    records = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while offset + 12 <= size:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            end = offset + 12 + length + 4
+            if end > size:
+                break
+            records.append((end, data[offset + 12:offset + 12 + length]))
+            offset = end
+    return records
+
+
+def _scalar(value):
+    """Float of a Summary.Value holding a scalar (TF1 simple_value or TF2 scalar tensor), else None."""
+    kind = value.WhichOneof("value")
+    if kind == "simple_value":
+        return value.simple_value
+    if kind == "tensor" and not value.tensor.tensor_shape.dim:
+        from tensorboard.util.tensor_util import make_ndarray
+        return float(make_ndarray(value.tensor))
+    return None
+
+
+class EventIndex:
+    """
+    Scalars of the TensorBoard event files in one log dir, parsed once and cached.
+
+    Each events file is read in a single streaming pass; every scalar tag gets an
+    append-only `<log_dir>/scalars/<file>/<n>.bin` of (step, wall_time, value) records,
+    and `index.json` keeps, per file, the byte offset parsed so far and per tag its
+    column file, record count and step / wall-time range. refresh() only parses the
+    bytes appended since (a file that shrank is parsed again from the start), so a
+    run can be queried while TensorBoard is still writing it.
+    """
+
+    def __init__(self, log_dir, cache_dir=None):
+        self.log_dir = log_dir
+        self.cache_dir = cache_dir or os.path.join(log_dir, CACHE_DIR)
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.files = {}  # events file name -> {"offset", "tags": {tag: {"column", "count", ...}}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.files = json.load(f)["files"]
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "files": self.files}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def _column_path(self, name, column):
+        return os.path.join(self.cache_dir, name, f"{column}.bin")
+
+    def refresh(self):
+        """Parses what was appended to the event files since the last call. Returns the new scalar count."""
+        names = event_files(self.log_dir)
+        changed = False
+        for name in set(self.files) - set(names):
+            self._forget(name)
+            changed = True
+        added = 0
+        for name in names:
+            entry = self.files.get(name)
+            size = os.path.getsize(os.path.join(self.log_dir, name))
+            if entry is not None and size < entry["offset"]:
+                self._forget(name)
+                entry = None
+            if entry is None:
+                entry = self.files[name] = {"offset": 0, "tags": {}}
+                changed = True
+            if size > entry["offset"]:
+                n = self._parse(name, entry)
+                added += n
+                changed = changed or n > 0
+        if changed:
+            self.save()
+        return added
+
+    def _forget(self, name):
+        entry = self.files.pop(name, None)
+        for tag in (entry or {}).get("tags", {}).values():
+            path = self._column_path(name, tag["column"])
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _parse(self, name, entry):
+        from tensorboard.compat.proto.event_pb2 import Event
+
+        records = read_records(os.path.join(self.log_dir, name), entry["offset"])
+        if not records:
+            return 0
+        columns = {}  # tag -> (steps, wall_times, values)
+        for _, payload in records:
+            event = Event.FromString(payload)
+            for value in event.summary.value:
+                scalar = _scalar(value)
+                if scalar is not None:
+                    column = columns.setdefault(value.tag, ([], [], []))
+                    column[0].append(event.step)
+                    column[1].append(event.wall_time)
+                    column[2].append(scalar)
+
+        os.makedirs(os.path.join(self.cache_dir, name), exist_ok=True)
+        added = 0
+        for tag, (steps, wall_times, values) in columns.items():
+            meta = entry["tags"].get(tag)
+            if meta is None:
+                meta = entry["tags"][tag] = {"column": len(entry["tags"]), "count": 0}
+            rows = np.empty(len(steps), dtype=SCALAR_DTYPE)
+            rows["step"], rows["wall_time"], rows["value"] = steps, wall_times, values
+            path = self._column_path(name, meta["column"])
+            with open(path, "ab") as f:
+                # Rows past the saved count were appended by a refresh that never saved its index
+                f.truncate(meta["count"] * SCALAR_DTYPE.itemsize)
+                f.write(rows.tobytes())
+            if not meta["count"]:
+                meta["first_step"], meta["first_wall_time"] = int(steps[0]), float(wall_times[0])
+            meta["count"] += len(rows)
+            meta["last_step"], meta["last_wall_time"] = int(steps[-1]), float(wall_times[-1])
+            added += len(rows)
+        entry["offset"] = records[-1][0]
+        return added
+
+    def tags(self):
+        """tag -> {"count", "first_step", "last_step", "files"} over every events file of the dir."""
+        summary = {}
+        for name, entry in sorted(self.files.items()):
+            for tag, meta in entry["tags"].items():
+                item = summary.setdefault(tag, {"count": 0, "first_step": meta["first_step"],
+                                                "last_step": meta["last_step"], "files": 0})
+                item["count"] += meta["count"]
+                item["first_step"] = min(item["first_step"], meta["first_step"])
+                item["last_step"] = max(item["last_step"], meta["last_step"])
+                item["files"] += 1
+        return summary
+
+    def scalars(self, tag):
+        """
+        (step, wall_time, value) records of `tag`, from every events file oldest first.
+        A read-only memmap when a single file logged the tag, otherwise a concatenated copy.
+        """
+        parts = []
+        for name, entry in sorted(self.files.items()):
+            meta = entry["tags"].get(tag)
+            if meta is not None and meta["count"]:
+                parts.append(np.memmap(self._column_path(name, meta["column"]), dtype=SCALAR_DTYPE, mode="r",
+                                       shape=(meta["count"],)))
+        if not parts:
+            return np.zeros(0, dtype=SCALAR_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def read_scalars(log_dir, tag):
+    """Records of one scalar tag of a log dir, refreshing its cache first."""
+    index = EventIndex(log_dir)
+    index.refresh()
+    return index.scalars(tag)
+
+
+def export_npz(indexes, tags, out_path):
+    """Writes `<run>/<tag>/{step,wall_time,value}` columns of every run and tag to one .npz."""
+    arrays = {}
+    for run, index in indexes.items():
+        for tag in tags:
+            records = index.scalars(tag)
+            if len(records):
+                for field in SCALAR_DTYPE.names:
+                    arrays[f"{run}/{tag}/{field}"] = np.asarray(records[field])
+    np.savez(out_path, **arrays)
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and cache the scalars of TensorBoard event files")
+    parser.add_argument("log_dirs", nargs="+", help="Directories holding events.out.tfevents.* files")
+    parser.add_argument("--tag", action="append", default=[], help="Print (or export) this tag; repeatable")
+    parser.add_argument("--export", default=None, metavar="NPZ", help="Write the --tag columns of every run here")
+    args = parser.parse_args()
+
+    indexes = {}
+    for log_dir in args.log_dirs:
+        start = time.perf_counter()
+        index = indexes[log_dir.rstrip("/")] = EventIndex(log_dir)
+        added = index.refresh()
+        print(f"{log_dir}: {len(index.files)} event file(s), {added} new scalars in "
+              f"{1e3 * (time.perf_counter() - start):.1f} ms")
+        for tag, item in sorted(index.tags().items()):
+            if not args.tag or tag in args.tag:
+                print(f"  {tag:<32} {item['count']:>8} points, steps {item['first_step']}-{item['last_step']}")
+    for tag in args.tag:
+        for run, index in indexes.items():
+            records = index.scalars(tag)
+            if len(records):
+                print(f"{run} {tag}: last {records['value'][-1]:.4g} at step {records['step'][-1]}, "
+                      f"min {records['value'].min():.4g}, max {records['value'].max():.4g}")
+    if args.export:
+        arrays = export_npz(indexes, args.tag or sorted({t for index in indexes.values() for t in index.tags()}),
+                            args.export)
+        print(f"Saved {len(arrays)} arrays to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
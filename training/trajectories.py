@@ -0,0 +1,384 @@
+# training/trajectories.py
+import argparse
+import json
+import os
+import gymnasium as gym
+import numpy as np
+
+from environment.custom_env import WasteCollectionEnv
+from environment.vec_env import BatchedWasteCollectionEnv
+from training.replay import FIELDS
+
+# One record per episode; its actions and rewards are steps [start, start + length) of the step streams
+EPISODE_DTYPE = np.dtype([("seed", np.uint64), ("start", np.int64), ("length", np.int32),
+                          ("return", np.float32), ("success", np.bool_)])
+STREAMS = {"episodes": EPISODE_DTYPE, "actions": np.dtype(np.uint8), "rewards": np.dtype(np.float32)}
+
+
+class TrajectoryWriter:
+    """
+    Appends episodes to a trajectory store: a directory holding `meta.json` and one
+    raw .bin file per stream (episodes, actions, rewards).
+
+    An episode is stored as its reset seed, a uint8 action per step and a float32
+    reward per step (5 bytes a step plus 25 per episode); observations are rebuilt
+    by re-simulating the environment. Episodes are buffered until `chunk_size` steps
+    are pending, and steps are written before the episode records pointing at them,
+    so a crash loses at most the buffered episodes. Opening an existing store appends
+    to it (dropping steps a crash left without an episode record); its grid size and
+    step limit must match.
+    """
+
+    def __init__(self, path, grid_size=5, max_steps=100, chunk_size=65536):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.grid_size = grid_size
+        self.max_steps = max_steps
+        self.chunk_size = chunk_size
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if (meta["grid_size"], meta["max_steps"]) != (grid_size, max_steps):
+                raise ValueError(f"{path} holds {meta['grid_size']}x{meta['grid_size']} episodes of at most "
+                                 f"{meta['max_steps']} steps")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"version": 1, "grid_size": grid_size, "max_steps": max_steps,
+                           "episode_fields": EPISODE_DTYPE.descr}, f)
+        self.n_steps = self._truncate_partial_writes()
+        self._files = {name: open(os.path.join(path, f"{name}.bin"), "ab") for name in STREAMS}
+        self._pending = []  # (seed, actions, rewards, success)
+        self._pending_steps = 0
+
+    def _truncate_partial_writes(self):
+        """Cuts what an interrupted flush left behind: steps without an episode record. Returns the step count."""
+        paths = {name: os.path.join(self.path, f"{name}.bin") for name in STREAMS}
+        for path in paths.values():
+            open(path, "ab").close()
+        n_episodes = os.path.getsize(paths["episodes"]) // EPISODE_DTYPE.itemsize
+        n_steps = 0
+        if n_episodes:
+            last = np.fromfile(paths["episodes"], dtype=EPISODE_DTYPE, count=1,
+                               offset=(n_episodes - 1) * EPISODE_DTYPE.itemsize)[0]
+            n_steps = int(last["start"] + last["length"])
+        os.truncate(paths["episodes"], n_episodes * EPISODE_DTYPE.itemsize)
+        for name in ("actions", "rewards"):
+            if os.path.getsize(paths[name]) > n_steps * STREAMS[name].itemsize:
+                os.truncate(paths[name], n_steps * STREAMS[name].itemsize)
+        return n_steps
+
+    def add_episode(self, seed, actions, rewards, success):
+        actions = np.asarray(actions, dtype=np.uint8)
+        rewards = np.asarray(rewards, dtype=np.float32)
+        if len(actions) != len(rewards) or not 0 < len(actions) <= self.max_steps:
+            raise ValueError(f"Episode of {len(actions)} actions and {len(rewards)} rewards")
+        self._pending.append((seed, actions, rewards, success))
+        self._pending_steps += len(actions)
+        if self._pending_steps >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        lengths = np.array([len(episode[1]) for episode in self._pending], dtype=np.int64)
+        records = np.zeros(len(self._pending), dtype=EPISODE_DTYPE)
+        records["seed"] = [episode[0] for episode in self._pending]
+        records["start"] = self.n_steps + np.cumsum(lengths) - lengths
+        records["length"] = lengths
+        records["return"] = [episode[2].sum(dtype=np.float64) for episode in self._pending]
+        records["success"] = [episode[3] for episode in self._pending]
+        for name in ("actions", "rewards"):
+            column = 1 if name == "actions" else 2
+            self._files[name].write(np.concatenate([episode[column] for episode in self._pending]).tobytes())
+            self._files[name].flush()
+        self._files["episodes"].write(records.tobytes())
+        self._files["episodes"].flush()
+        self.n_steps += int(lengths.sum())
+        self._pending = []
+        self._pending_steps = 0
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TrajectoryStore:
+    """
+    Read-only view of a trajectory store. The streams are memory-mapped, so opening
+    a store of millions of steps is instant, and episodes appended by a running
+    writer show up after refresh().
+
+    Observations are not stored: observations() re-simulates episodes side by side
+    in a BatchedWasteCollectionEnv, each reset with its recorded seed, and checks that
+    the recorded rewards and episode ends come out again, so a store recorded before
+    an environment change fails loudly instead of serving wrong states.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.grid_size = meta["grid_size"]
+        self.max_steps = meta["max_steps"]
+        self.refresh()
+
+    def _map(self, name, n_records):
+        if n_records == 0:
+            return np.zeros(0, dtype=STREAMS[name])
+        return np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=STREAMS[name], mode="r", shape=(n_records,))
+
+    def refresh(self):
+        sizes = {name: os.path.getsize(os.path.join(self.path, f"{name}.bin")) // dtype.itemsize
+                 for name, dtype in STREAMS.items()}
+        self.actions = self._map("actions", sizes["actions"])
+        self.rewards = self._map("rewards", min(sizes["rewards"], sizes["actions"]))
+        self.episodes = self._map("episodes", sizes["episodes"])
+        # Leave out an episode whose steps are still being written
+        end = self.episodes["start"] + self.episodes["length"]
+        self.episodes = self.episodes[:np.searchsorted(end, len(self.rewards), side="right")]
+
+    def __len__(self):
+        return len(self.episodes)
+
+    @property
+    def n_steps(self):
+        return int(self.episodes["length"].sum())
+
+    def episode(self, i):
+        """Seed, actions, rewards, return and success of episode i."""
+        record = self.episodes[i]
+        steps = slice(int(record["start"]), int(record["start"] + record["length"]))
+        return {"seed": int(record["seed"]), "actions": np.asarray(self.actions[steps]),
+                "rewards": np.asarray(self.rewards[steps]), "return": float(record["return"]),
+                "success": bool(record["success"])}
+
+    def observations(self, indices):
+        """
+        Re-simulates the given episodes together. Returns (T + 1, n, 7) int32 observation
+        rows in FastWasteCollectionEnv's flat layout, T being the longest episode; episode
+        j fills rows 0 to length_j, and its last row is the final observation.
+        """
+        records = self.episodes[np.asarray(indices)]
+        lengths = records["length"].astype(np.int64)
+        n, horizon = len(records), int(lengths.max()) if len(records) else 0
+        actions = np.zeros((horizon, n), dtype=np.int64)
+        rewards = np.zeros((horizon, n), dtype=np.float32)
+        for j, record in enumerate(records):
+            steps = slice(int(record["start"]), int(record["start"] + record["length"]))
+            actions[:lengths[j], j] = self.actions[steps]
+            rewards[:lengths[j], j] = self.rewards[steps]
+
+        env = BatchedWasteCollectionEnv(n, grid_size=self.grid_size, max_steps=self.max_steps)
+        env.set_seeds(records["seed"])
+        rows = np.zeros((horizon + 1, n, 7), dtype=np.int32)
+        rows[0] = _obs_rows(env.reset())
+        for t in range(horizon):
+            obs, step_rewards, dones, infos = env.step(actions[t])
+            rows[t + 1] = _obs_rows(obs)
+            live = np.flatnonzero(t < lengths)
+            ends = np.flatnonzero((t == lengths - 1) & dones)
+            for j in ends:
+                rows[t + 1, j] = _obs_rows(infos[j]["terminal_observation"])
+            if len(ends) != np.count_nonzero(t == lengths - 1) or (dones[live] & (t < lengths[live] - 1)).any() \
+                    or not np.allclose(step_rewards[live], rewards[t, live], atol=1e-5):
+                raise RuntimeError(f"{self.path}: re-simulated episodes diverge from the recording at step {t}; "
+                                   "was it recorded with a different version of the environment?")
+        return rows
+
+    def replay(self, i, render_mode=None):
+        """
+        Plays episode i back in a WasteCollectionEnv (e.g. with render_mode="human"),
+        yielding (obs, action, reward, terminated, truncated) after every step.
+        """
+        episode = self.episode(i)
+        env = WasteCollectionEnv(grid_size=self.grid_size, max_steps=self.max_steps, render_mode=render_mode)
+        env.reset(seed=episode["seed"])
+        try:
+            for action in episode["actions"]:
+                obs, reward, terminated, truncated, _ = env.step(int(action))
+                if render_mode is not None:
+                    env.render()
+                yield obs, int(action), reward, terminated, truncated
+        finally:
+            env.close()
+
+    def iter_batches(self, batch_size=256, shuffle=True, seed=0, episodes_per_chunk=4096):
+        """
+        Transition batches for behavior cloning or offline RL: dicts of obs and next_obs
+        (Dict observations as the SB3 policies take them), actions, rewards and the
+        terminated / truncated flags of each transition's step.
+
+        Episodes are re-simulated `episodes_per_chunk` at a time and every chunk is
+        served in shuffled batches, so memory stays bounded whatever the store size.
+        """
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self)) if shuffle else np.arange(len(self))
+        for chunk_start in range(0, len(order), episodes_per_chunk):
+            chunk = np.sort(order[chunk_start:chunk_start + episodes_per_chunk])
+            rows = self.observations(chunk)
+            records = self.episodes[chunk]
+            lengths = records["length"].astype(np.int64)
+            # (t, episode) of every recorded step in the chunk
+            t = np.concatenate([np.arange(length) for length in lengths])
+            j = np.repeat(np.arange(len(chunk)), lengths)
+            steps = records["start"][j] + t
+            last = t == lengths[j] - 1
+            terminated = last & records["success"][j]
+            transitions = rng.permutation(len(t)) if shuffle else np.arange(len(t))
+            for batch_start in range(0, len(transitions), batch_size):
+                batch = transitions[batch_start:batch_start + batch_size]
+                yield {
+                    "obs": _rows_to_dict(rows[t[batch], j[batch]]),
+                    "actions": self.actions[steps[batch]].astype(np.int64),
+                    "rewards": self.rewards[steps[batch]],
+                    "next_obs": _rows_to_dict(rows[t[batch] + 1, j[batch]]),
+                    "terminated": terminated[batch],
+                    "truncated": last[batch] & ~terminated[batch],
+                }
+
+
+def _obs_rows(obs):
+    """Dict observation (batched or single) -> (n, 7) flat rows."""
+    carrying = np.reshape(obs["carrying"], (-1, 1))
+    return np.concatenate([np.reshape(obs[key], (-1, 2)) for key in ("agent", "waste", "bin")] + [carrying], axis=1)
+
+
+def _rows_to_dict(rows):
+    return {key: rows[:, columns] for key, columns in FIELDS.items()}
+
+
+class RecordEpisodes(gym.Wrapper):
+    """
+    Records every episode played through a WasteCollectionEnv (or FastWasteCollectionEnv)
+    into a TrajectoryWriter. Each reset without a seed gets a fresh one from the
+    wrapper's own generator, so every recorded episode can be replayed from its seed.
+    """
+
+    def __init__(self, env, writer, seed=None):
+        super(RecordEpisodes, self).__init__(env)
+        self.writer = writer
+        self._seeds = np.random.default_rng(seed)
+        self._episode_seed = None
+        self._actions, self._rewards = [], []
+
+    def reset(self, seed=None, options=None):
+        self._episode_seed = int(self._seeds.integers(2**63)) if seed is None else seed
+        self._actions, self._rewards = [], []
+        return self.env.reset(seed=self._episode_seed, options=options)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self._actions.append(int(action))
+        self._rewards.append(reward)
+        if terminated or truncated:
+            self.writer.add_episode(self._episode_seed, self._actions, self._rewards, terminated)
+            self._actions, self._rewards = [], []
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.writer.flush()
+        super(RecordEpisodes, self).close()
+
+
+def record_policy(predict, writer, n_episodes, seed=0, batch_size=4096, deterministic=True):
+    """
+    Plays `n_episodes` episodes of a policy side by side and writes them to `writer`.
+    Episode i is reset with seed + i, like evaluate_policy_batched's episodes.
+    """
+    for first in range(0, n_episodes, batch_size):
+        n = min(batch_size, n_episodes - first)
+        env = BatchedWasteCollectionEnv(n, grid_size=writer.grid_size, max_steps=writer.max_steps)
+        env.seed(seed + first)
+        obs = env.reset()
+        actions = np.zeros((writer.max_steps, n), dtype=np.uint8)
+        rewards = np.zeros((writer.max_steps, n), dtype=np.float32)
+        lengths = np.zeros(n, dtype=np.int64)
+        success = np.zeros(n, dtype=bool)
+        live = np.ones(n, dtype=bool)
+        step_actions = np.zeros(n, dtype=np.int64)
+        t = 0
+        while live.any():
+            idx = np.flatnonzero(live)
+            live_obs = obs if len(idx) == n else {key: value[idx] for key, value in obs.items()}
+            step_actions[:] = 0  # Finished episodes keep stepping with a no-op; nothing is recorded for them
+            step_actions[idx], _ = predict(live_obs, deterministic=deterministic)
+            obs, step_rewards, dones, infos = env.step(step_actions)
+            actions[t, idx] = step_actions[idx]
+            rewards[t, idx] = step_rewards[idx]
+            lengths[idx] += 1
+            for i in np.flatnonzero(live & dones):
+                success[i] = not infos[i]["TimeLimit.truncated"]
+            live &= ~dones
+            t += 1
+        for i in range(n):
+            writer.add_episode(seed + first + i, actions[:lengths[i], i], rewards[:lengths[i], i], success[i])
+    writer.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, inspect and verify seed-and-actions trajectory stores")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Append episodes played by a checkpoint")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--model", default="models/numpy/ppo_collection(2).npz",
+                               help="Checkpoint path, registry hash prefix or name")
+    record_parser.add_argument("--episodes", type=int, default=10000)
+    record_parser.add_argument("--grid-size", type=int, default=5)
+    record_parser.add_argument("--max-steps", type=int, default=100)
+    record_parser.add_argument("--seed", type=int, default=None, help="Seed of the first episode (default: after "
+                                                                      "the largest seed already stored)")
+    record_parser.add_argument("--stochastic", action="store_true", help="Sample actions instead of the argmax (PPO exports and SB3 checkpoints)")
+    info_parser = subparsers.add_parser("info", help="Summarize a store")
+    info_parser.add_argument("path")
+    verify_parser = subparsers.add_parser("verify", help="Re-simulate every episode and check it")
+    verify_parser.add_argument("path")
+    show_parser = subparsers.add_parser("show", help="Print one episode step by step")
+    show_parser.add_argument("path")
+    show_parser.add_argument("episode", type=int)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from policies.registry import get_registry
+        policy = get_registry().get(args.model)
+        if args.stochastic and not getattr(policy, "can_sample", True):
+            parser.error(f"--stochastic: {args.model} only acts deterministically (sampling needs a PPO export "
+                         f"or an SB3 checkpoint)")
+        seed = args.seed
+        if seed is None:
+            existing = TrajectoryStore(args.path) if os.path.exists(os.path.join(args.path, "meta.json")) else None
+            seed = int(existing.episodes["seed"].max()) + 1 if existing is not None and len(existing) else 0
+        with TrajectoryWriter(args.path, args.grid_size, args.max_steps) as writer:
+            record_policy(policy.predict, writer, args.episodes, seed, deterministic=not args.stochastic)
+    store = TrajectoryStore(args.path)
+    if args.command == "verify":
+        for first in range(0, len(store), 4096):
+            store.observations(np.arange(first, min(first + 4096, len(store))))
+        print(f"{len(store)} episodes re-simulated, all match")
+    elif args.command == "show":
+        episode = store.episode(args.episode)
+        rows = store.observations([args.episode])[:, 0]
+        print(f"episode {args.episode}: seed {episode['seed']}, return {episode['return']:.2f}, "
+              f"{'delivered' if episode['success'] else 'truncated'}")
+        print(f"{'t':>4}  {'agent':>7} {'waste':>8} {'bin':>7} carrying  action  reward")
+        for t, (action, reward) in enumerate(zip(episode["actions"], episode["rewards"])):
+            row = rows[t].tolist()
+            print(f"{t:>4}  {tuple(row[0:2])!s:>7} {tuple(row[2:4])!s:>8} {tuple(row[4:6])!s:>7} {row[6]:>8}  "
+                  f"{action:>6} {reward:>7.1f}")
+    else:
+        size = sum(os.path.getsize(os.path.join(args.path, f"{name}.bin")) for name in STREAMS)
+        print(f"{len(store)} episodes, {store.n_steps} steps, {size / 2**20:.1f} MiB "
+              f"({size / max(store.n_steps, 1):.1f} bytes/step) | grid {store.grid_size}, max steps {store.max_steps}")
+        if len(store):
+            print(f"mean return {store.episodes['return'].mean():.2f}, success {store.episodes['success'].mean():.1%}")
+
+
+if __name__ == "__main__":
+    main()